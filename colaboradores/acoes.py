@@ -0,0 +1,98 @@
+# Ações em Massa (Ativar / Inativar / Excluir vários colaboradores)
+# =================================================================
+# Cada ação é UM único comando SQL sobre o conjunto selecionado:
+#   - ativar/inativar: UPDATE colaboradores_colaborador SET status = ... WHERE id IN (...)
+#   - excluir:         DELETE FROM colaboradores_colaborador WHERE id IN (...)
+# em vez de um .save() / .delete() por colaborador. Inativar 5 mil colaboradores
+# custa uma requisição e um comando, e não 5 mil idas e voltas ao banco.
+#
+# Os gatilhos do SQLite (contadores de status, índice de busca, versão da tabela e
+# feed de alterações) continuam funcionando, pois são executados pelo próprio banco
+# para cada linha.
+#
+# 'apagar' é o DELETE sem sinais usado aqui, no arquivo de inativos (arquivo.py) e na
+# mudança de obra de banco (shards.py).
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import auditoria, cache_lista, feed
+
+# Ação -> novo status (None = excluir).
+ACOES = {
+    'ativar': 'Ativo',
+    'inativar': 'Inativo',
+    'excluir': None,
+}
+
+# Máximo de ids enviados de uma vez (o SQLite limita a quantidade de parâmetros
+# por comando). Para conjuntos maiores, use o filtro de pesquisa ('q').
+LIMITE_IDS = 10_000
+
+
+def apagar(queryset):
+    # Apaga as linhas do QuerySet com UM comando
+    #   DELETE FROM <tabela> WHERE id IN (SELECT id ... do QuerySet)
+    # Retorna a quantidade de linhas apagadas.
+    # [IMPORTANTE] O .delete() do QuerySet busca as linhas e dispara o sinal
+    # 'post_delete' (ver signals.py) uma vez por colaborador; aqui, nenhum sinal é
+    # disparado e nenhuma linha é lida.
+    # [ATENÇÃO] Não apaga em cascata: se outro modelo passar a apontar para
+    # Colaborador (ForeignKey), trate essas linhas antes. As de EPIs ('MovimentacaoEpi'
+    # e 'SaldoEpi') não têm restrição no banco e ficam guardadas de propósito: são o
+    # histórico dos empréstimos.
+    try:
+        sql, params = queryset.order_by().values('pk').query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        # Ex: .none() ou 'id__in' vazio: não há o que apagar.
+        return 0
+    conexao = connections[queryset.db]
+    tabela = conexao.ops.quote_name(queryset.model._meta.db_table)
+    chave = conexao.ops.quote_name(queryset.model._meta.pk.column)
+    with conexao.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {tabela} WHERE {chave} IN ({sql})', params)
+        return cursor.rowcount
+
+
+def aplicar(queryset, acao):
+    # Executa a ação sobre todos os colaboradores do QuerySet, em uma transação.
+    # Retorna a quantidade de colaboradores afetados.
+    # A transação é a do banco do QuerySet (com as obras em bancos separados, cada
+    # banco recebe o seu próprio comando; ver shards.py).
+    novo_status = ACOES[acao]
+    with transaction.atomic(using=queryset.db):
+        if novo_status is not None:
+            # O 'exclude' deixa de fora quem já está com o status pedido, então o
+            # número retornado é o de colaboradores que realmente mudaram.
+            queryset = queryset.exclude(status=novo_status)
+
+        # Valores atuais dos afetados, para a auditoria: um SELECT antes da alteração
+        # (que continua sendo um único comando UPDATE/DELETE).
+        campos = auditoria.CAMPOS if novo_status is None else ['status']
+        antes = list(queryset.values('id', *campos)) if auditoria.ativa() else []
+        # Sem os gatilhos do feed (fora do SQLite ou nos bancos das obras), o feed de
+        # alterações precisa dos ids.
+        ids = [] if feed.pelos_gatilhos(queryset.db) else list(queryset.values_list('id', flat=True))
+
+        if novo_status is None:
+            afetados = apagar(queryset)
+        else:
+            # O .update() não passa pelo .save(), então o 'updated_at' é informado aqui.
+            afetados = queryset.update(status=novo_status, updated_at=timezone.now())
+
+        # update() e apagar() não disparam os sinais do Django: o cache da lista
+        # e a auditoria são tratados aqui.
+        if afetados:
+            cache_lista.invalidar()
+            feed.registrar(ids, excluido=novo_status is None, banco=queryset.db)
+            depois = {} if novo_status is None else {'status': novo_status}
+            auditoria.registrar([
+                auditoria.evento(
+                    linha['id'],
+                    'excluido' if novo_status is None else 'alterado',
+                    auditoria.diferencas(linha, depois),
+                )
+                for linha in antes
+            ])
+    return afetados
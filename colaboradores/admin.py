@@ -1,3 +1,129 @@
+# Painel de Administração (Django Admin)
+# =====================================
+# O admin padrão do Django foi pensado para tabelas pequenas: a lista de um modelo
+# conta a tabela inteira (duas vezes!) a cada página, pesquisa com LIKE '%...%' em
+# todas as linhas e exclui em massa carregando cada objeto. 'ColaboradorAdmin' faz
+# a mesma lista do jeito do dashboard, para continuar rápida com 1 milhão de linhas:
+#   - pesquisa pelo índice FTS5 (busca.py), e não com LIKE;
+#   - filtro por status e ordenação pelo índice (status, data_cadastro)/(data_cadastro, id);
+#   - sem a contagem completa ('show_full_result_count = False') e com um paginador
+#     que usa os contadores prontos (contadores.py) ou uma contagem limitada;
+#   - SELECT só das colunas exibidas ('only');
+#   - ações em massa com UM comando UPDATE/DELETE (acoes.py).
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from . import acoes, busca, contadores
+from .models import Colaborador, Epi
+
+# Acima disso a contagem de uma pesquisa para de contar (e o total exibido é este).
+LIMITE_CONTAGEM = 10_000
+
+
+class PaginadorEstimado(Paginator):
+    # Paginador que não conta a tabela inteira.
+    #   - 'total' informado: número já conhecido (ex: lido dos contadores de status).
+    #   - sem 'total': conta no máximo LIMITE_CONTAGEM linhas
+    #     (SELECT COUNT(*) FROM (... LIMIT 10000)); com mais resultados que isso, a
+    #     paginação mostra só as primeiras páginas — refine a pesquisa.
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, total=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.total = total
+
+    @cached_property
+    def count(self):
+        if self.total is not None:
+            return self.total
+        return self.object_list.order_by()[:LIMITE_CONTAGEM].count()
+
+
+@admin.register(Colaborador)
+class ColaboradorAdmin(admin.ModelAdmin):
+    list_display = ('nome_completo', 'cpf', 'funcao', 'status', 'data_cadastro')
+    list_filter = ('status',)
+    # Os campos pesquisados (pelo índice FTS5, ver 'get_search_results').
+    search_fields = ('nome_completo', 'cpf', 'funcao')
+    search_help_text = 'Nome, CPF ou função (sem acentos, CPF com ou sem máscara).'
+    # A mesma ordem da lista do dashboard, entregue pelo índice (data_cadastro, id).
+    ordering = ('-data_cadastro', '-id')
+    # Só a data de cadastro pode ser reordenada: ordenar 1 milhão de linhas por nome
+    # ou função exigiria ordenar a tabela inteira a cada página.
+    sortable_by = ('data_cadastro',)
+    list_per_page = 100
+    show_full_result_count = False
+    paginator = PaginadorEstimado
+    actions = ['ativar', 'inativar', 'excluir']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # Na lista, busca só as colunas exibidas. No formulário de edição o objeto é
+        # carregado inteiro (senão cada campo adiado seria uma consulta a mais).
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.only(*self.list_display)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        # Retorna (queryset, pode_ter_duplicados). A pesquisa é um 'id IN (...)' com os
+        # ids do índice FTS5, então nunca gera linhas duplicadas.
+        if not search_term:
+            return queryset, False
+        # Na ordem padrão (mais novos primeiro = ids maiores primeiro), o índice entrega
+        # só os LIMITE_CONTAGEM ids mais novos — os mesmos que o paginador alcança —
+        # em vez de todos os que casam com uma pesquisa genérica ("joao").
+        # Com outro filtro (ex: status), o limite fica para depois dele, no paginador:
+        # os ids mais novos da pesquisa poderiam não ter nenhum do status pedido.
+        limite = None if request.GET.get('o') or self.filtros(request) - {'q'} else LIMITE_CONTAGEM
+        return busca.filtrar(queryset, search_term, limite=limite), False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, total=self.total_conhecido(request),
+        )
+
+    def total_conhecido(self, request):
+        # Sem pesquisa, o total (geral ou de um status) vem pronto de 'ContadorStatus'.
+        # Retorna None quando é preciso contar (pesquisa ou outros filtros).
+        filtros = self.filtros(request)
+        if not filtros:
+            return contadores.totais()['total_colaboradores']
+        if filtros == {'status__exact'}:
+            chave = {'Ativo': 'colaboradores_ativos', 'Inativo': 'colaboradores_inativos'}
+            status = request.GET['status__exact']
+            return contadores.totais()[chave[status]] if status in chave else None
+        return None
+
+    def filtros(self, request):
+        # Parâmetros da lista que filtram as linhas (pesquisa 'q' incluída).
+        return set(request.GET) - {'p', 'o', '_popup', '_to_field'}
+
+    def get_actions(self, request):
+        # Remove o 'delete_selected' padrão, que carrega e exclui um colaborador por vez.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def aplicar(self, request, queryset, acao):
+        afetados = acoes.aplicar(queryset, acao)
+        self.message_user(request, f'{afetados} colaborador(es) afetado(s).')
+
+    @admin.action(description='Ativar selecionados', permissions=['change'])
+    def ativar(self, request, queryset):
+        self.aplicar(request, queryset, 'ativar')
+
+    @admin.action(description='Inativar selecionados', permissions=['change'])
+    def inativar(self, request, queryset):
+        self.aplicar(request, queryset, 'inativar')
+
+    @admin.action(description='Excluir selecionados', permissions=['delete'])
+    def excluir(self, request, queryset):
+        self.aplicar(request, queryset, 'excluir')
+
 
-# Register your models here.
+@admin.register(Epi)
+class EpiAdmin(admin.ModelAdmin):
+    # O catálogo de EPIs é pequeno: o admin padrão serve.
+    list_display = ('nome', 'ca')
+    search_fields = ('nome', 'ca')
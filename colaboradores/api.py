@@ -0,0 +1,46 @@
+# Funções Auxiliares da API JSON
+# ==============================
+# Compartilhadas entre as views síncronas (views.py) e assíncronas (views_async.py),
+# para que as duas versões da API respondam exatamente do mesmo jeito.
+
+import hashlib
+
+from django.http import JsonResponse
+
+# Campos que podem ser pedidos via '?fields=' (projeção).
+CAMPOS = ['id', 'nome_completo', 'cpf', 'funcao', 'status', 'obra', 'data_cadastro']
+
+
+def campos_pedidos(request):
+    # Lê '?fields=id,nome_completo'. Retorna (campos, resposta_de_erro).
+    # Sem o parâmetro, todos os campos são devolvidos.
+    campos = [c for c in request.GET.get('fields', '').split(',') if c] or CAMPOS
+    invalidos = set(campos) - set(CAMPOS)
+    if invalidos:
+        return None, json_compacto({'erro': f'Campos inválidos: {", ".join(sorted(invalidos))}'}, status=400)
+    return campos, None
+
+
+def json_compacto(dados, status=200):
+    # Separadores sem espaços: JSON mais compacto.
+    return JsonResponse(dados, status=status,
+                        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False})
+
+
+def serializar(colaborador, campos):
+    return {campo: getattr(colaborador, campo) for campo in campos}
+
+
+def resposta_pagina(pagina, campos):
+    return json_compacto({
+        'resultados': [serializar(colab, campos) for colab in pagina['linhas']],
+        'cursor_anterior': pagina['cursor_anterior'],
+        'cursor_proxima': pagina['cursor_proxima'],
+    })
+
+
+def etag(request, versao_atual):
+    # O ETag combina a versão da tabela com o caminho e os parâmetros da URL
+    # (q, fields, cursores...), pois cada combinação gera uma resposta diferente.
+    parametros = sorted(request.GET.lists())
+    return hashlib.md5(f'{versao_atual}|{request.path}|{parametros}'.encode(), usedforsecurity=False).hexdigest()
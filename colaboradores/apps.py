@@ -17,6 +17,12 @@ class ColaboradoresConfig(AppConfig):
     # É como o Django identifica este aplicativo internamente. 
     # Deve corresponder ao nome da pasta do seu aplicativo ('colaboradores').
     name = "colaboradores"
+
+    # [SINAIS] O método 'ready' é chamado pelo Django quando o aplicativo termina de
+    # ser carregado. Importar o módulo 'signals' aqui registra os receptores
+    # (ex: invalidação do cache da lista a cada cadastro/edição/exclusão).
+    def ready(self):
+        from . import signals  # noqa: F401
     
     # [NOTA] Geralmente, você não precisa modificar muito este arquivo, a menos que 
     # precise adicionar configurações específicas do aplicativo, como sinais (signals) 
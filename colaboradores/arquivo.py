@@ -0,0 +1,132 @@
+# Arquivo de Colaboradores Inativos (tabela "quente" x tabela "fria")
+# ==================================================================
+# A rotatividade nas obras é alta: com o tempo, a maior parte das linhas de
+# 'colaboradores_colaborador' passa a ser de colaboradores inativos há meses, que
+# ainda assim entram em toda consulta, contagem e pesquisa do dashboard.
+# 'arquivar' move os inativos há mais de N dias para 'ColaboradorArquivado'
+# (comando 'python manage.py arquivar_inativos'), em lotes, cada lote em uma
+# transação: o colaborador está sempre em UMA das duas tabelas, nunca nas duas
+# nem em nenhuma.
+#
+# - Os gatilhos da tabela principal (contadores, busca, versão e feed) tratam a
+#   saída de cada colaborador como uma exclusão; no feed ele aparece como 'arquivado'.
+# - O CPF continua único nas duas tabelas: no SQLite, pelos gatilhos da migração
+#   0009; nos outros bancos, por 'conferir_cpf' (chamado antes de cada .save(), ver
+#   signals.py). O importador de CSV rejeita as linhas com CPF arquivado ('cpfs_arquivados').
+# - 'buscar' pesquisa no arquivo (índice FTS5 próprio), para a lista mostrar os
+#   arquivados quando pedido; 'restaurar' traz colaboradores de volta.
+# - Com as obras em bancos separados (shards.py), 'arquivar' percorre todos os bancos,
+#   e o arquivo continua um só, no banco principal. Um lote vindo de um banco de obra
+#   é confirmado primeiro no arquivo e depois no banco da obra: se algo falhar entre
+#   os dois, o colaborador fica nas duas tabelas (e é arquivado de novo na próxima
+#   execução), nunca em nenhuma. 'restaurar' o devolve ao banco da obra dele.
+
+from datetime import timedelta
+
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from . import acoes, busca, cache_lista, feed, shards
+from .models import Colaborador, ColaboradorArquivado
+
+TABELA_BUSCA = 'colaboradores_colaboradorarquivado_busca'
+CAMPOS = ['id', 'nome_completo', 'cpf', 'funcao', 'status', 'obra', 'data_cadastro', 'updated_at']
+
+# Quantos arquivados a pesquisa mostra (a lista do arquivo não é paginada).
+LIMITE_BUSCA = 50
+
+
+def candidatos(dias, agora=None, banco=shards.PRINCIPAL):
+    # Inativos de 'banco' sem nenhuma alteração há mais de 'dias' dias.
+    limite = (agora or timezone.now()) - timedelta(days=dias)
+    return Colaborador.objects.using(banco).filter(status='Inativo', updated_at__lt=limite)
+
+
+def arquivar(dias, lote=1000, progresso=None):
+    # Move os candidatos de cada banco para o arquivo, 'lote' colaboradores por transação.
+    # Retorna quantos foram arquivados. 'progresso' (opcional) recebe o total até agora.
+    total = 0
+    for banco in shards.bancos():
+        consulta = candidatos(dias, banco=banco)
+        ultimo_id = 0
+        while True:
+            # O cursor pelo id (e não OFFSET) faz cada lote continuar de onde o anterior parou.
+            # A transação de dentro (a do arquivo, no banco principal) é confirmada primeiro.
+            with transaction.atomic(using=banco), transaction.atomic(using=shards.PRINCIPAL):
+                linhas = list(consulta.filter(id__gt=ultimo_id).order_by('id').values(*CAMPOS)[:lote])
+                if not linhas:
+                    break
+                _mover(linhas, banco)
+            ultimo_id = linhas[-1]['id']
+            total += len(linhas)
+            if progresso:
+                progresso(total)
+    if total:
+        cache_lista.invalidar()
+    return total
+
+
+def _mover(linhas, banco):
+    # Primeiro grava no arquivo, depois apaga da tabela de 'banco'.
+    agora = timezone.now()
+    # Vindos de um banco de obra, parte do lote pode já estar no arquivo (ver acima).
+    ColaboradorArquivado.objects.bulk_create(
+        [ColaboradorArquivado(**linha, arquivado_em=agora) for linha in linhas],
+        ignore_conflicts=banco != shards.PRINCIPAL,
+    )
+    ids = [linha['id'] for linha in linhas]
+    # Um único DELETE ... WHERE id IN (...), sem os sinais, como nas ações em massa.
+    acoes.apagar(Colaborador.objects.using(banco).filter(id__in=ids))
+    feed.registrar(ids, excluido=True, banco=banco)
+
+
+def restaurar(cpfs):
+    # Traz de volta, cada um para o banco da sua obra, os arquivados com estes CPFs.
+    # Retorna quantos foram restaurados.
+    linhas = list(ColaboradorArquivado.objects.filter(cpf__in=cpfs).values(*CAMPOS))
+    por_banco = {}
+    for linha in linhas:
+        por_banco.setdefault(shards.banco_da_obra(linha['obra']), []).append(linha)
+    for banco, linhas_banco in por_banco.items():
+        # A transação de dentro (a do banco da obra) é confirmada primeiro: se algo
+        # falhar entre as duas, o colaborador continua no arquivo.
+        with transaction.atomic(using=shards.PRINCIPAL), transaction.atomic(using=banco):
+            # Ordem inversa à de '_mover': o gatilho da tabela principal recusaria um CPF
+            # que ainda estivesse no arquivo.
+            ColaboradorArquivado.objects.filter(id__in=[linha['id'] for linha in linhas_banco]).delete()
+            restaurados = [Colaborador(**linha) for linha in linhas_banco]
+            Colaborador.objects.using(banco).bulk_create(restaurados)
+            # O bulk_create preenche 'data_cadastro' com a hora atual (auto_now_add):
+            # a data original é gravada de volta (o bulk_update não passa pelo auto_now_add).
+            for colaborador, linha in zip(restaurados, linhas_banco):
+                colaborador.data_cadastro = linha['data_cadastro']
+            Colaborador.objects.using(banco).bulk_update(restaurados, ['data_cadastro'])
+            feed.registrar([colaborador.id for colaborador in restaurados], banco=banco)
+    if linhas:
+        cache_lista.invalidar()
+    return len(linhas)
+
+
+def conferir_cpf(colaborador, banco):
+    # Fora do SQLite (sem os gatilhos da migração 0009): recusa, na tabela principal,
+    # um CPF que já está no arquivo — com a mesma mensagem do UNIQUE, para quem salva
+    # receber o mesmo IntegrityError nos dois casos. Só consulta quando o colaborador
+    # é novo ou o CPF mudou ('_valores_carregados', ver models.py).
+    if connections[banco].vendor == 'sqlite':
+        return
+    carregados = getattr(colaborador, '_valores_carregados', {})
+    if not colaborador._state.adding and carregados.get('cpf') == colaborador.cpf:
+        return
+    if ColaboradorArquivado.objects.using(banco).filter(cpf=colaborador.cpf).exists():
+        raise IntegrityError('UNIQUE constraint failed: colaboradores_colaborador.cpf')
+
+
+def cpfs_arquivados(cpfs):
+    # Quais destes CPFs estão no arquivo (uma consulta pelo índice único do CPF).
+    return set(ColaboradorArquivado.objects.filter(cpf__in=list(cpfs)).values_list('cpf', flat=True))
+
+
+def buscar(query, limite=LIMITE_BUSCA):
+    # Pesquisa no arquivo com a mesma regra da lista (busca.py), mais recentes primeiro.
+    arquivados = ColaboradorArquivado.objects.order_by('-id')
+    return list(busca.filtrar(arquivados, query, limite=limite, tabela=TABELA_BUSCA)[:limite])
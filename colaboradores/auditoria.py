@@ -0,0 +1,218 @@
+# Auditoria das Alterações de Colaboradores (gravação em segundo plano)
+# ====================================================================
+# Cada cadastro, edição ou exclusão gera um EventoAuditoria com os valores antes e
+# depois. Gravar o evento na própria requisição dobraria o custo das escritas no
+# SQLite, então os eventos vão para uma FILA em memória (com tamanho máximo) e uma
+# thread em segundo plano os grava em lotes, com um único 'bulk_create' por lote
+# ("write-behind").
+#
+# - Os eventos só entram na fila depois do COMMIT (transaction.on_commit): uma
+#   alteração desfeita não deixa rastro.
+# - Ao encerrar o processo, a fila é descarregada (atexit).
+# - Fila cheia (o banco não está dando conta): a política é escolhida em
+#   settings.COLABORADORES_AUDITORIA_FILA_CHEIA:
+#     'gravar'    (padrão) grava o evento na própria requisição — nada se perde;
+#     'bloquear'  a requisição espera até haver espaço na fila;
+#     'descartar' o evento é descartado (e contado em 'descartados').
+# - settings.COLABORADORES_AUDITORIA: 'fila' (padrão), 'sincrono' (grava na hora,
+#   usado nos testes) ou 'desligada'.
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from .models import EventoAuditoria
+
+logger = logging.getLogger('colaboradores.auditoria')
+
+# Campos do colaborador acompanhados pela auditoria.
+CAMPOS = ['nome_completo', 'cpf', 'funcao', 'status']
+
+# Requisição atual (guardada pelo AuditoriaMiddleware), para saber quem fez a alteração.
+_requisicao_atual = ContextVar('colaboradores_requisicao', default=None)
+
+
+class FilaEscrita:
+    # Fila limitada + thread que grava os itens em lotes usando a função 'gravar'
+    # (que recebe uma lista). Independente do Django, para poder ser testada sozinha.
+
+    def __init__(self, gravar, tamanho=10_000, lote=500, politica='gravar', espera=0.5):
+        self.gravar = gravar
+        self.lote = lote
+        self.politica = politica
+        self.espera = espera  # segundos sem itens antes de a thread conferir se deve parar
+        self.fila = queue.Queue(maxsize=tamanho)
+        self.descartados = 0
+        self.gravados = 0
+        self._parar = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._trava = threading.Lock()
+
+    def adicionar(self, itens):
+        self._iniciar()
+        for item in itens:
+            try:
+                self.fila.put_nowait(item)
+            except queue.Full:
+                if self.politica == 'bloquear':
+                    self.fila.put(item)
+                elif self.politica == 'descartar':
+                    self.descartados += 1
+                    logger.warning('Fila de auditoria cheia: evento descartado (%d no total).', self.descartados)
+                else:
+                    self.gravar([item])
+                    self.gravados += 1
+
+    def _iniciar(self):
+        # A thread é criada no primeiro uso e recriada após um 'fork' (ex: workers do
+        # gunicorn com --preload), pois threads não são copiadas para o processo filho.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._trava:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._parar.clear()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._executar, name='auditoria', daemon=True)
+                self._thread.start()
+
+    def _proximo_lote(self):
+        # Espera o primeiro item e junta os que já estiverem na fila, até 'lote' itens.
+        try:
+            itens = [self.fila.get(timeout=self.espera)]
+        except queue.Empty:
+            return []
+        while len(itens) < self.lote:
+            try:
+                itens.append(self.fila.get_nowait())
+            except queue.Empty:
+                break
+        return itens
+
+    def _executar(self):
+        while not (self._parar.is_set() and self.fila.empty()):
+            itens = self._proximo_lote()
+            if not itens:
+                continue
+            try:
+                self._gravar_com_novas_tentativas(itens)
+            finally:
+                for _ in itens:
+                    self.fila.task_done()
+
+    def _gravar_com_novas_tentativas(self, itens, tentativas=3):
+        for tentativa in range(1, tentativas + 1):
+            try:
+                self.gravar(itens)
+                self.gravados += len(itens)
+                return
+            except Exception:
+                if tentativa == tentativas:
+                    logger.exception('Falha ao gravar %d evento(s) de auditoria.', len(itens))
+                    return
+                time.sleep(0.1 * tentativa)
+
+    def descarregar(self, timeout=None):
+        # Espera a fila esvaziar (todos os itens gravados). Retorna False se o tempo acabar.
+        if self._thread is None:
+            return True
+        limite = None if timeout is None else time.monotonic() + timeout
+        while self.fila.unfinished_tasks:
+            if limite is not None and time.monotonic() > limite:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def encerrar(self, timeout=5.0):
+        # Para a thread depois de gravar o que restou na fila (chamado no atexit).
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._parar.set()
+        self._thread.join(timeout)
+
+
+def _gravar_eventos(eventos):
+    # Executado na thread da fila (que tem a sua própria conexão com o banco) ou,
+    # com a fila cheia e a política 'gravar', na própria requisição.
+    try:
+        EventoAuditoria.objects.bulk_create(eventos)
+    except OperationalError:
+        # Conexão com problema: fecha, e a próxima tentativa abre uma nova.
+        connection.close()
+        raise
+
+
+fila = FilaEscrita(
+    _gravar_eventos,
+    tamanho=getattr(settings, 'COLABORADORES_AUDITORIA_TAMANHO_FILA', 10_000),
+    lote=getattr(settings, 'COLABORADORES_AUDITORIA_LOTE', 500),
+    politica=getattr(settings, 'COLABORADORES_AUDITORIA_FILA_CHEIA', 'gravar'),
+)
+atexit.register(fila.encerrar)
+
+
+def guardar_requisicao(request):
+    # Usado pelo AuditoriaMiddleware. Retorna o token para 'esquecer_requisicao'.
+    return _requisicao_atual.set(request)
+
+
+def esquecer_requisicao(token):
+    _requisicao_atual.reset(token)
+
+
+def _autor():
+    # Quem está fazendo a alteração: (usuário, ip). Fora de uma requisição (shell,
+    # comandos), o autor fica vazio.
+    request = _requisicao_atual.get()
+    if request is None:
+        return '', None
+    usuario = getattr(request, 'user', None)
+    nome = usuario.get_username() if usuario is not None and usuario.is_authenticated else 'anônimo'
+    return nome, request.META.get('REMOTE_ADDR')
+
+
+def evento(colaborador_id, acao, alteracoes):
+    # Monta (sem salvar) um evento com o autor e o momento atuais.
+    usuario, ip = _autor()
+    return EventoAuditoria(
+        colaborador_id=colaborador_id, acao=acao, alteracoes=alteracoes,
+        usuario=usuario, ip=ip, momento=timezone.now(),
+    )
+
+
+def diferencas(antes, depois):
+    # {campo: [antes, depois]} apenas para os campos que mudaram.
+    return {
+        campo: [antes.get(campo), depois.get(campo)]
+        for campo in CAMPOS
+        if antes.get(campo) != depois.get(campo)
+    }
+
+
+def ativa():
+    return getattr(settings, 'COLABORADORES_AUDITORIA', 'fila') != 'desligada'
+
+
+def registrar(eventos):
+    # Envia os eventos para gravação depois do COMMIT da transação atual.
+    modo = getattr(settings, 'COLABORADORES_AUDITORIA', 'fila')
+    if not eventos or modo == 'desligada':
+        return
+    if modo == 'sincrono':
+        transaction.on_commit(lambda: EventoAuditoria.objects.bulk_create(eventos))
+    else:
+        transaction.on_commit(lambda: fila.adicionar(eventos))
+
+
+def historico(colaborador_id):
+    # Eventos de um colaborador, do mais recente para o mais antigo
+    # (usa o índice (colaborador_id, momento)).
+    return EventoAuditoria.objects.filter(colaborador_id=colaborador_id).order_by('-momento')
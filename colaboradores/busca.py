@@ -0,0 +1,93 @@
+# Busca Indexada de Colaboradores
+# ===============================
+# A pesquisa original fazia três filtros '__icontains' unidos por OR, o que no
+# SQLite significa uma varredura completa da tabela a cada busca. Aqui usamos uma
+# tabela virtual FTS5 ('colaboradores_colaborador_busca'), criada na migração
+# 0002, que funciona como um índice invertido sobre nome, CPF e função.
+#
+#   - O tokenizador 'unicode61 remove_diacritics 2' ignora acentos e maiúsculas,
+#     então "Joao" encontra "João" e "ELETRICISTA" encontra "Eletricista".
+#   - Gatilhos (triggers) no banco mantêm o índice sincronizado em qualquer
+#     INSERT, UPDATE ou DELETE — inclusive operações em lote do ORM.
+#   - Em bancos que não são SQLite, cai no filtro '__icontains' antigo.
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Nome da tabela virtual FTS5 criada na migração.
+TABELA_BUSCA = 'colaboradores_colaborador_busca'
+
+# Uma busca formada apenas por dígitos e pela máscara do CPF (ex: "123.456" ou "123.456.789-01").
+PADRAO_CPF = re.compile(r'[\d.\-/\s]+')
+# Separa a busca em palavras (letras e números), descartando pontuação.
+PADRAO_PALAVRA = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    # Remove acentos e converte para minúsculas: "João" -> "joao".
+    # NFKD separa a letra do acento; depois descartamos as marcas combinantes.
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def termos_busca(query):
+    # Converte o texto digitado em uma lista de termos normalizados.
+    #   - "123.456.789-01" -> ['12345678901'] (o CPF é salvo sem máscara no banco)
+    #   - "João Pedreiro"  -> ['joao', 'pedreiro']
+    query = query.strip()
+    if PADRAO_CPF.fullmatch(query):
+        digitos = ''.join(filter(str.isdigit, query))
+        return [digitos] if digitos else []
+    return PADRAO_PALAVRA.findall(normalizar(query))
+
+
+def expressao_fts(termos):
+    # Monta a expressão MATCH do FTS5: cada termo vira uma busca por prefixo
+    # ("joao"* encontra "joao" e "joaozinho") e todos os termos precisam aparecer (AND).
+    # As aspas duplas impedem que o texto do usuário seja interpretado como operador do FTS5.
+    return ' '.join(f'"{termo}"*' for termo in termos)
+
+
+def filtrar(queryset, query, limite=None, id_abaixo_de=None, id_acima_de=None, tabela=TABELA_BUSCA):
+    # Aplica a pesquisa ao QuerySet, mantendo a ordenação definida pela view.
+    # Os parâmetros opcionais permitem que a paginação (paginacao.py) peça ao
+    # índice apenas os 'limite' ids seguintes a um cursor, em vez de todos:
+    #   - id_abaixo_de: ids menores que o cursor, do maior para o menor (próxima página);
+    #   - id_acima_de: ids maiores que o cursor, do menor para o maior (página anterior).
+    # 'tabela' é o índice FTS5 usado (o do arquivo de inativos é outro; ver arquivo.py).
+    termos = termos_busca(query)
+    if not termos:
+        return queryset.none()
+
+    if connection.vendor != 'sqlite':
+        # Fallback para outros bancos: o mesmo comportamento da versão original.
+        # (A paginação continua aplicando o cursor e o LIMIT na consulta principal.)
+        condicao = Q()
+        for termo in termos:
+            condicao &= (
+                Q(nome_completo__icontains=termo) |
+                Q(cpf__icontains=termo) |
+                Q(funcao__icontains=termo)
+            )
+        return queryset.filter(condicao)
+
+    # [IMPORTANTE] O FTS5 devolve os 'rowid' (que são os 'id' dos colaboradores)
+    # que casam com a busca usando o índice invertido, sem varrer a tabela principal.
+    sql = f'SELECT rowid FROM {tabela} WHERE {tabela} MATCH %s'
+    parametros = [expressao_fts(termos)]
+    if id_abaixo_de is not None:
+        sql += ' AND rowid < %s'
+        parametros.append(id_abaixo_de)
+    if id_acima_de is not None:
+        sql += ' AND rowid > %s'
+        parametros.append(id_acima_de)
+    if limite is not None:
+        # O FTS5 percorre o índice já na ordem do rowid e para após 'limite' linhas,
+        # então buscas muito genéricas ("Pedreiro") custam o mesmo que as específicas.
+        sql += ' ORDER BY rowid ' + ('ASC' if id_acima_de is not None else 'DESC') + ' LIMIT %s'
+        parametros.append(limite)
+    return queryset.filter(id__in=RawSQL(sql, parametros))
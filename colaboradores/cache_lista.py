@@ -0,0 +1,204 @@
+# Cache da Página de Lista (Dashboard / Pesquisa)
+# ===============================================
+# A lista de colaboradores é lida muito mais vezes do que é alterada. Este módulo
+# guarda o HTML já renderizado de cada combinação de parâmetros (pesquisa
+# normalizada, tamanho da página, cursores e inclusão do arquivo) no backend configurado em
+# settings.CACHES (memória local, arquivo ou Redis).
+#
+# Invalidação por "geração": todas as chaves incluem um número de geração. Cada
+# cadastro, edição ou exclusão incrementa esse número (ver signals.py), e a partir
+# daí nenhuma chave antiga é mais consultada — não é preciso apagar entrada por
+# entrada; as antigas simplesmente expiram.
+#
+# Quando a página não está no cache, requisições idênticas que chegam ao mesmo tempo
+# (mesma chave) montam a página UMA vez e compartilham o resultado (voo_unico.py).
+
+import hashlib
+import re
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from .busca import termos_busca
+from .paginacao import tamanho_pagina
+from .voo_unico import VooUnico
+
+PREFIXO = 'colaboradores:lista'
+CHAVE_GERACAO = f'{PREFIXO}:geracao'
+CHAVE_ACERTOS = f'{PREFIXO}:acertos'
+CHAVE_FALHAS = f'{PREFIXO}:falhas'
+
+# O formulário de ações em massa da lista leva o token CSRF do usuário ('{% csrf_token %}').
+# Esse token não pode ir para o cache (seria servido a outros usuários): ele é trocado
+# por um marcador ao guardar e substituído pelo token de quem pediu ao servir.
+MARCADOR_CSRF = b'__colaboradores_csrf__'
+CAMPO_CSRF = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+# Páginas em montagem, compartilhadas entre as requisições idênticas deste processo.
+# O resultado fica também alguns instantes na memória do processo (útil quando o
+# cache compartilhado é lento ou está desligado com COLABORADORES_CACHE=nenhum).
+VOO = VooUnico(
+    ttl=lambda: getattr(settings, 'COLABORADORES_VOO_UNICO_TTL', 1.0),
+    maximo=getattr(settings, 'COLABORADORES_VOO_UNICO_MAXIMO', 256),
+)
+
+
+def _cache():
+    # Alias do cache usado (settings.COLABORADORES_CACHE_ALIAS, padrão 'default').
+    return caches[getattr(settings, 'COLABORADORES_CACHE_ALIAS', 'default')]
+
+
+def _incrementar(chave):
+    # 'incr' é atômico nos backends de memória e Redis; se a chave ainda não
+    # existe (cache vazio ou expirado), ela é criada com o valor 1.
+    cache = _cache()
+    try:
+        return cache.incr(chave)
+    except ValueError:
+        if cache.add(chave, 1, timeout=None):
+            return 1
+        return cache.incr(chave)
+
+
+def geracao():
+    # Geração atual; começa em 0 quando o cache está vazio.
+    return _cache().get(CHAVE_GERACAO, 0)
+
+
+def invalidar():
+    # Incrementa a geração agora E depois do COMMIT da transação atual.
+    # O segundo incremento garante que uma página renderizada por outra requisição
+    # enquanto a transação ainda não tinha sido confirmada (com dados antigos)
+    # também fique para trás.
+    _nova_geracao()
+    transaction.on_commit(_nova_geracao)
+
+
+def _nova_geracao():
+    _incrementar(CHAVE_GERACAO)
+    VOO.esquecer()
+
+
+def chave(request):
+    # Monta a chave a partir dos parâmetros NORMALIZADOS: "João", " joao " e "JOAO"
+    # produzem a mesma pesquisa e, portanto, a mesma entrada no cache.
+    parametros = '|'.join([
+        ' '.join(termos_busca(request.GET.get('q', ''))),
+        str(tamanho_pagina(request.GET.get('tamanho'))),
+        request.GET.get('apos', ''),
+        request.GET.get('antes', ''),
+        request.GET.get('arquivados', ''),
+        request.GET.get('obra', '').strip(),
+    ])
+    resumo = hashlib.md5(parametros.encode(), usedforsecurity=False).hexdigest()
+    return f'{PREFIXO}:{geracao()}:{resumo}'
+
+
+def estatisticas():
+    # Acertos (página servida do cache) e falhas (página renderizada do zero).
+    cache = _cache()
+    acertos = cache.get(CHAVE_ACERTOS, 0)
+    falhas = cache.get(CHAVE_FALHAS, 0)
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': round(acertos / total, 4) if total else 0.0,
+        'geracao': geracao(),
+    }
+
+
+def _resposta_do_cache(request, guardado, origem='HIT'):
+    conteudo, content_type = guardado
+    if MARCADOR_CSRF in conteudo:
+        # 'get_token' também garante que o cookie CSRF seja enviado ao navegador.
+        conteudo = conteudo.replace(MARCADOR_CSRF, get_token(request).encode())
+    resposta = HttpResponse(conteudo, content_type=content_type)
+    resposta['X-Cache'] = origem
+    return resposta
+
+
+def _guardar(cache, chave_pagina, resposta):
+    # Guarda a página e retorna o que foi guardado (None se não foi).
+    # Só respostas de sucesso vão para o cache.
+    resposta['X-Cache'] = 'MISS'
+    if resposta.status_code != 200:
+        return None
+    guardado = (CAMPO_CSRF.sub(rb'\1' + MARCADOR_CSRF + rb'\2', resposta.content), resposta['Content-Type'])
+    cache.set(chave_pagina, guardado, getattr(settings, 'COLABORADORES_CACHE_TIMEOUT', 300))
+    return guardado
+
+
+def em_cache(view):
+    # Decorador para a view da lista: devolve o HTML do cache quando existir,
+    # ou executa a view e guarda o resultado. Só requisições GET são cacheadas.
+    # Funciona tanto com a view síncrona (views.py) quanto com a assíncrona (views_async.py).
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def view_com_cache_async(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await view(request, *args, **kwargs)
+            # As operações de cache são rápidas (memória/Redis) e não tocam no banco,
+            # então podem ser chamadas diretamente dentro do código assíncrono.
+            cache = _cache()
+            chave_pagina = chave(request)
+            guardado = cache.get(chave_pagina)
+            if guardado is not None:
+                _incrementar(CHAVE_ACERTOS)
+                return _resposta_do_cache(request, guardado)
+
+            lider = []
+
+            async def montar():
+                _incrementar(CHAVE_FALHAS)
+                lider.append(await view(request, *args, **kwargs))
+                return _guardar(cache, chave_pagina, lider[0])
+
+            guardado = await VOO.aexecutar(chave_pagina, montar)
+            if lider:
+                return lider[0]
+            if guardado is None:
+                # A página da líder não era um sucesso (200): esta requisição monta a sua.
+                return await view(request, *args, **kwargs)
+            _incrementar(CHAVE_ACERTOS)
+            return _resposta_do_cache(request, guardado, origem='COALESCED')
+
+        return view_com_cache_async
+
+    @wraps(view)
+    def view_com_cache(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view(request, *args, **kwargs)
+
+        cache = _cache()
+        chave_pagina = chave(request)
+        guardado = cache.get(chave_pagina)
+        if guardado is not None:
+            _incrementar(CHAVE_ACERTOS)
+            return _resposta_do_cache(request, guardado)
+
+        # Página fora do cache: só uma das requisições idênticas simultâneas (a líder)
+        # executa a view; as outras recebem a página dela (com o próprio token CSRF).
+        lider = []
+
+        def montar():
+            _incrementar(CHAVE_FALHAS)
+            lider.append(view(request, *args, **kwargs))
+            return _guardar(cache, chave_pagina, lider[0])
+
+        guardado = VOO.executar(chave_pagina, montar)
+        if lider:
+            return lider[0]
+        if guardado is None:
+            # A página da líder não era um sucesso (200): esta requisição monta a sua.
+            return view(request, *args, **kwargs)
+        _incrementar(CHAVE_ACERTOS)
+        return _resposta_do_cache(request, guardado, origem='COALESCED')
+
+    return view_com_cache
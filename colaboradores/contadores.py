@@ -0,0 +1,101 @@
+# Contadores dos Cards de Estatística (Total / Ativos / Inativos)
+# ===============================================================
+# O dashboard sem pesquisa lê os números prontos da tabela de resumo
+# 'ContadorStatus' (no máximo uma linha por status, custo O(1)).
+# Com pesquisa, os números dependem do filtro, então fazemos UMA única
+# consulta de agregação condicional em vez de duas contagens separadas.
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Count, Q
+
+from .models import Colaborador, ContadorStatus
+
+
+def _montar(total, ativos):
+    # Formato usado pela view para preencher os três cards.
+    return {
+        'total_colaboradores': total,
+        'colaboradores_ativos': ativos,
+        'colaboradores_inativos': total - ativos,
+    }
+
+
+def agregar(queryset):
+    # Uma única passada no banco: COUNT(*) e COUNT(*) FILTER (WHERE status = 'Ativo').
+    resultado = queryset.order_by().aggregate(
+        total=Count('id'),
+        ativos=Count('id', filter=Q(status='Ativo')),
+    )
+    return _montar(resultado['total'], resultado['ativos'])
+
+
+def totais(queryset=None, banco=DEFAULT_DB_ALIAS):
+    # Retorna os números dos cards.
+    #   - queryset=None: dashboard sem filtro -> lê a tabela de resumo.
+    #   - queryset filtrado (pesquisa): agregação condicional sobre o filtro.
+    # Os gatilhos que mantêm a tabela de resumo só existem no SQLite; nos outros
+    # bancos o dashboard também usa a agregação condicional.
+    # 'banco': de qual banco ler, com as obras em bancos separados (shards.py).
+    if queryset is not None:
+        return agregar(queryset)
+    if connections[banco].vendor != 'sqlite':
+        return agregar(Colaborador.objects.using(banco))
+    por_status = dict(ContadorStatus.objects.using(banco).values_list('status', 'total'))
+    return _montar(sum(por_status.values()), por_status.get('Ativo', 0))
+
+
+def somar(lista):
+    # Junta os números de vários bancos (ex: o dashboard de todas as obras).
+    return _montar(
+        sum(estatisticas['total_colaboradores'] for estatisticas in lista),
+        sum(estatisticas['colaboradores_ativos'] for estatisticas in lista),
+    )
+
+
+async def aagregar(queryset):
+    # Versão assíncrona de 'agregar' (ORM assíncrono: 'aaggregate').
+    resultado = await queryset.order_by().aaggregate(
+        total=Count('id'),
+        ativos=Count('id', filter=Q(status='Ativo')),
+    )
+    return _montar(resultado['total'], resultado['ativos'])
+
+
+async def atotais(queryset=None):
+    # Versão assíncrona de 'totais', com as mesmas regras.
+    if queryset is not None:
+        return await aagregar(queryset)
+    if connection.vendor != 'sqlite':
+        return await aagregar(Colaborador.objects.all())
+    por_status = {status: total async for status, total in ContadorStatus.objects.values_list('status', 'total')}
+    return _montar(sum(por_status.values()), por_status.get('Ativo', 0))
+
+
+def contar_por_status(banco=DEFAULT_DB_ALIAS):
+    # Contagem "real", direto da tabela de colaboradores (usada para reconstruir/verificar).
+    return dict(
+        Colaborador.objects.using(banco).order_by().values_list('status').annotate(total=Count('id'))
+    )
+
+
+def recalcular(banco=DEFAULT_DB_ALIAS):
+    # Reconstrói a tabela de resumo de 'banco' a partir da contagem real, numa única transação.
+    with transaction.atomic(using=banco):
+        reais = contar_por_status(banco)
+        ContadorStatus.objects.using(banco).all().delete()
+        ContadorStatus.objects.using(banco).bulk_create(
+            ContadorStatus(status=status, total=total) for status, total in reais.items()
+        )
+    return reais
+
+
+def divergencias(banco=DEFAULT_DB_ALIAS):
+    # Compara a tabela de resumo de 'banco' com a contagem real.
+    # Retorna {status: (valor_guardado, valor_real)} apenas para os status que não batem.
+    guardados = dict(ContadorStatus.objects.using(banco).values_list('status', 'total'))
+    reais = contar_por_status(banco)
+    return {
+        status: (guardados.get(status, 0), reais.get(status, 0))
+        for status in set(guardados) | set(reais)
+        if guardados.get(status, 0) != reais.get(status, 0)
+    }
@@ -0,0 +1,39 @@
+# Funções auxiliares para CPF
+# ===========================
+# Centraliza o tratamento do CPF para que as views, a importação em lote e
+# qualquer outro ponto de entrada salvem o CPF exatamente do mesmo jeito.
+
+
+def limpar(cpf):
+    # Remove a máscara (pontos, traço, espaços) e mantém apenas os dígitos.
+    # filter(str.isdigit, cpf) pega apenas os caracteres que são dígitos.
+    # ''.join(...) junta esses dígitos de volta em uma string.
+    # Ex: '123.456.789-01' -> '12345678901'
+    return ''.join(filter(str.isdigit, cpf or ''))
+
+
+def digitos_verificadores(base):
+    # Calcula os dois dígitos verificadores de um CPF a partir dos 9 primeiros dígitos.
+    # Cada dígito é a soma ponderada dos anteriores (pesos 10..2 e depois 11..2),
+    # multiplicada por 10, com o resto da divisão por 11 (resto 10 vira 0).
+    numeros = [int(d) for d in base]
+    for peso_inicial in (10, 11):
+        soma = sum(n * peso for n, peso in zip(numeros, range(peso_inicial, 1, -1)))
+        numeros.append(soma * 10 % 11 % 10)
+    return f'{numeros[-2]}{numeros[-1]}'
+
+
+def valido(cpf):
+    # True se o CPF (com ou sem máscara) tem 11 dígitos e os verificadores corretos.
+    # CPFs com todos os dígitos iguais (ex: 111.111.111-11) passam na conta, mas não existem.
+    numeros = limpar(cpf)
+    if len(numeros) != 11 or len(set(numeros)) == 1:
+        return False
+    return numeros[9:] == digitos_verificadores(numeros[:9])
+
+
+def gerar(numero):
+    # Gera um CPF válido (apenas dígitos) a partir de um número de 0 a 999.999.999,
+    # usado como os 9 primeiros dígitos. Útil para massas de dados sintéticas.
+    base = f'{numero:09d}'
+    return base + digitos_verificadores(base)
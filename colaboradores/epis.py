@@ -0,0 +1,124 @@
+# Empréstimo e Devolução de EPIs (livro-registro + saldo por colaborador)
+# =====================================================================
+# Cada empréstimo ou devolução vira UMA linha nova em 'MovimentacaoEpi' (nada é
+# alterado nem apagado: o histórico completo fica guardado). O total de itens que
+# cada colaborador ainda tem em mãos fica pronto em 'SaldoEpi', atualizado a cada
+# movimentação — a lista do dashboard mostra esse número com um LEFT JOIN na mesma
+# consulta dos colaboradores, sem somar o livro-registro (que pode ter milhões de
+# linhas) e sem uma consulta por linha.
+#
+# No SQLite o saldo é mantido pelos gatilhos da migração 0010 (então um
+# bulk_create de movimentações também atualiza os saldos). Nos outros bancos,
+# 'movimentar' atualiza o saldo na mesma transação.
+# 'python manage.py recalcular_saldos_epi' reconstrói e verifica os saldos.
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Sum, When
+
+from . import cache_lista, shards
+from .models import Colaborador, Epi, MovimentacaoEpi, SaldoEpi
+
+# Quanto cada movimentação muda o saldo: + no empréstimo, - na devolução.
+DELTA = Case(When(tipo='emprestimo', then=F('quantidade')), default=-F('quantidade'))
+
+
+def emprestar(colaborador_id, epi_id, quantidade=1):
+    return movimentar(colaborador_id, epi_id, 'emprestimo', quantidade)
+
+
+def devolver(colaborador_id, epi_id, quantidade=1):
+    return movimentar(colaborador_id, epi_id, 'devolucao', quantidade)
+
+
+def movimentar(colaborador_id, epi_id, tipo, quantidade):
+    # Registra a movimentação e retorna o novo saldo do colaborador.
+    # Levanta ValueError (com a mensagem para o usuário) se ela não for permitida.
+    if tipo not in dict(MovimentacaoEpi.TIPOS):
+        raise ValueError('Tipo inválido. Use "emprestimo" ou "devolucao".')
+    if quantidade < 1:
+        raise ValueError('A quantidade deve ser maior que zero.')
+
+    with transaction.atomic():
+        # Trava o saldo do colaborador até o fim da transação (nos bancos que
+        # suportam; o SQLite já tem um único escritor por vez), para que duas
+        # devoluções ao mesmo tempo não passem ambas pela conferência abaixo.
+        list(SaldoEpi.objects.select_for_update().filter(colaborador_id=colaborador_id))
+        if not Epi.objects.filter(id=epi_id).exists():
+            raise ValueError('EPI não encontrado.')
+        if tipo == 'emprestimo':
+            # O colaborador pode estar no banco de outra obra (shards.py); o livro-registro
+            # e os saldos ficam sempre no banco principal.
+            colaborador = shards.obter(colaborador_id, Colaborador.objects.only('status'))
+            if colaborador is None or colaborador.status != 'Ativo':
+                raise ValueError('Só colaboradores ativos podem receber EPIs.')
+        elif quantidade > pendentes_do_epi(colaborador_id, epi_id):
+            raise ValueError('A devolução é maior que a quantidade emprestada deste EPI.')
+
+        MovimentacaoEpi.objects.create(
+            colaborador_id=colaborador_id, epi_id=epi_id, tipo=tipo, quantidade=quantidade,
+        )
+        if connection.vendor != 'sqlite':
+            _somar_saldo(colaborador_id, quantidade if tipo == 'emprestimo' else -quantidade)
+        saldo = SaldoEpi.objects.get(colaborador_id=colaborador_id).pendentes
+
+    # O número de pendentes aparece na lista: a página em cache fica desatualizada.
+    cache_lista.invalidar()
+    return saldo
+
+
+def _somar_saldo(colaborador_id, delta):
+    # Fora do SQLite (sem os gatilhos): UPDATE ... SET pendentes = pendentes + delta.
+    if not SaldoEpi.objects.filter(colaborador_id=colaborador_id).update(pendentes=F('pendentes') + delta):
+        SaldoEpi.objects.create(colaborador_id=colaborador_id, pendentes=delta)
+
+
+def pendentes_do_epi(colaborador_id, epi_id):
+    # Quantos itens deste EPI o colaborador tem em mãos (pelo índice (colaborador, epi)).
+    total = MovimentacaoEpi.objects.filter(
+        colaborador_id=colaborador_id, epi_id=epi_id,
+    ).aggregate(total=Sum(DELTA))['total']
+    return total or 0
+
+
+def pendentes_por_epi(colaborador_id):
+    # Lista [{'epi_id', 'epi__nome', 'pendentes'}] dos EPIs ainda não devolvidos.
+    return list(
+        MovimentacaoEpi.objects.filter(colaborador_id=colaborador_id)
+        .values('epi_id', 'epi__nome')
+        .annotate(pendentes=Sum(DELTA))
+        .filter(pendentes__gt=0)
+        .order_by('epi__nome')
+    )
+
+
+def saldos_reais():
+    # Saldo "real" de cada colaborador, somando o livro-registro inteiro
+    # (usado para reconstruir/verificar; nunca na exibição da lista).
+    return dict(
+        MovimentacaoEpi.objects.order_by().values_list('colaborador_id').annotate(total=Sum(DELTA))
+    )
+
+
+@transaction.atomic
+def recalcular():
+    # Reconstrói a tabela de saldos a partir do livro-registro, numa única transação.
+    reais = saldos_reais()
+    SaldoEpi.objects.all().delete()
+    SaldoEpi.objects.bulk_create(
+        (SaldoEpi(colaborador_id=colaborador_id, pendentes=total) for colaborador_id, total in reais.items()),
+        batch_size=5_000,
+    )
+    cache_lista.invalidar()
+    return len(reais)
+
+
+def divergencias():
+    # Compara os saldos guardados com a soma do livro-registro.
+    # Retorna {colaborador_id: (valor_guardado, valor_real)} só para os que não batem.
+    guardados = dict(SaldoEpi.objects.values_list('colaborador_id', 'pendentes'))
+    reais = saldos_reais()
+    return {
+        colaborador_id: (guardados.get(colaborador_id, 0), reais.get(colaborador_id, 0))
+        for colaborador_id in set(guardados) | set(reais)
+        if guardados.get(colaborador_id, 0) != reais.get(colaborador_id, 0)
+    }
@@ -0,0 +1,87 @@
+# Exportação em Streaming (CSV / JSON Lines)
+# ==========================================
+# Gera o arquivo de exportação aos poucos, em blocos, em vez de montar tudo na
+# memória. O banco é lido com '.values_list(...).iterator()', que busca as linhas
+# em lotes (chunk_size) sem criar objetos Colaborador, e cada bloco de texto é
+# enviado ao navegador assim que fica pronto (StreamingHttpResponse na view).
+# Recebe uma lista de QuerySets (um por banco, com as obras em bancos separados; ver
+# shards.py), exportados um depois do outro.
+
+import csv
+import io
+import json
+import zlib
+
+# Colunas exportadas, na ordem em que aparecem no arquivo.
+CAMPOS = ['id', 'nome_completo', 'cpf', 'funcao', 'status', 'obra', 'data_cadastro']
+
+# Quantas linhas o banco entrega por vez e quantas linhas formam cada bloco enviado.
+TAMANHO_LOTE = 2000
+
+FORMATOS = {
+    # formato: (content_type, extensão do arquivo)
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+
+def _linhas(querysets):
+    # Percorre cada QuerySet em lotes, devolvendo tuplas simples (sem instanciar o modelo).
+    # A ordem por 'id' usa a própria chave primária, sem ordenação em memória no banco.
+    for queryset in querysets:
+        yield from queryset.order_by('id').values_list(*CAMPOS).iterator(chunk_size=TAMANHO_LOTE)
+
+
+def _em_blocos(linhas, formatar_linha):
+    # Junta TAMANHO_LOTE linhas formatadas em um único texto antes de enviar,
+    # o que reduz bastante o número de pedaços (e o custo) da resposta.
+    bloco = []
+    for linha in linhas:
+        bloco.append(formatar_linha(linha))
+        if len(bloco) >= TAMANHO_LOTE:
+            yield ''.join(bloco)
+            bloco = []
+    if bloco:
+        yield ''.join(bloco)
+
+
+def gerar_csv(querysets):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def formatar(linha):
+        # O csv.writer escreve no buffer; pegamos o texto e esvaziamos o buffer.
+        *valores, data_cadastro = linha
+        escritor.writerow([*valores, data_cadastro.isoformat()])
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+
+    # O BOM ('\ufeff') faz o Excel reconhecer os acentos como UTF-8.
+    yield '\ufeff' + ','.join(CAMPOS) + '\r\n'
+    yield from _em_blocos(_linhas(querysets), formatar)
+
+
+def gerar_jsonl(querysets):
+    def formatar(linha):
+        registro = dict(zip(CAMPOS, linha))
+        registro['data_cadastro'] = registro['data_cadastro'].isoformat()
+        return json.dumps(registro, ensure_ascii=False) + '\n'
+
+    yield from _em_blocos(_linhas(querysets), formatar)
+
+
+def gerar(querysets, formato):
+    return gerar_csv(querysets) if formato == 'csv' else gerar_jsonl(querysets)
+
+
+def comprimir(blocos):
+    # Compacta os blocos em gzip "no caminho": cada bloco é comprimido assim que é
+    # gerado, sem precisar do arquivo inteiro. wbits=31 gera o formato .gz padrão.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for bloco in blocos:
+        dados = compressor.compress(bloco.encode('utf-8'))
+        if dados:
+            yield dados
+    yield compressor.flush()
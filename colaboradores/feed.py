@@ -0,0 +1,107 @@
+# Feed de Alterações dos Colaboradores (sincronização incremental)
+# ================================================================
+# Sistemas externos guardam o último 'cursor' recebido e pedem só o que mudou depois
+# dele: GET /api/colaboradores/alteracoes/?since=<cursor>. O custo de cada
+# sincronização depende da quantidade de alterações, e não do tamanho da tabela:
+# a consulta é uma faixa do índice da chave primária de 'Alteracao' (id > cursor).
+#
+# Cada item traz o tipo ('criado', 'alterado', 'excluido' ou 'arquivado' — movido
+# para o arquivo de inativos, ver arquivo.py) e, para quem não foi excluído, os
+# dados atuais do colaborador. Um colaborador alterado várias vezes
+# aparece UMA vez, com os dados mais recentes.
+#
+# No SQLite a tabela 'Alteracao' é mantida pelos gatilhos da migração 0008. Nos outros
+# bancos, 'registrar' é chamado pelos sinais (signals.py) e pelas ações em massa.
+#
+# Com as obras em bancos separados (shards.py), o feed continua UM só, no banco
+# principal: as alterações feitas nos bancos das obras (que não têm esses gatilhos,
+# ver migração 0013) e as mudanças de banco também passam por 'registrar'.
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from . import api, shards
+from .models import Alteracao, Colaborador, ColaboradorArquivado
+
+# Campos do colaborador enviados no feed (os da API + o momento da última alteração).
+CAMPOS = api.CAMPOS + ['updated_at']
+
+# Quantidade de alterações por resposta: padrão e máximo.
+TAMANHO_PADRAO = 500
+TAMANHO_MAXIMO = 5000
+
+
+def tamanho_lote(valor):
+    try:
+        tamanho = int(valor)
+    except (TypeError, ValueError):
+        return TAMANHO_PADRAO
+    return max(1, min(tamanho, TAMANHO_MAXIMO))
+
+
+def alteracoes(desde, tamanho=TAMANHO_PADRAO):
+    # Retorna um dicionário com as alterações depois do cursor 'desde', no máximo
+    # 'tamanho' por vez. 'cursor' é o valor a enviar no próximo pedido, e 'tem_mais'
+    # indica que já existem mais alterações esperando (é só pedir de novo).
+    # Duas consultas, ambas pelo índice: a faixa do feed e os colaboradores dela.
+    linhas = list(Alteracao.objects.filter(id__gt=desde).order_by('id')[:tamanho + 1])
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+
+    vivos = shards.em_lote([linha.colaborador_id for linha in linhas if not linha.excluido])
+    # Só quando há exclusões: quais delas foram, na verdade, para o arquivo.
+    excluidos = [linha.colaborador_id for linha in linhas if linha.excluido]
+    arquivados = ColaboradorArquivado.objects.in_bulk(excluidos) if excluidos else {}
+    itens = []
+    for linha in linhas:
+        colaborador = vivos.get(linha.colaborador_id) or arquivados.get(linha.colaborador_id)
+        if linha.colaborador_id in arquivados:
+            tipo = 'arquivado'
+        elif linha.excluido or colaborador is None:
+            tipo = 'excluido'
+        elif linha.cursor_criacao is not None and linha.cursor_criacao > desde:
+            tipo = 'criado'
+        else:
+            tipo = 'alterado'
+        itens.append({
+            'cursor': linha.id,
+            'tipo': tipo,
+            'id': linha.colaborador_id,
+            'momento': linha.momento,
+            'colaborador': api.serializar(colaborador, CAMPOS) if tipo != 'excluido' else None,
+        })
+
+    return {
+        'alteracoes': itens,
+        'cursor': linhas[-1].id if linhas else desde,
+        'tem_mais': tem_mais,
+    }
+
+
+def pelos_gatilhos(banco):
+    # As alterações feitas em 'banco' já entram no feed pelos gatilhos da migração 0008?
+    return banco == DEFAULT_DB_ALIAS and connections[banco].vendor == 'sqlite'
+
+
+def registrar(ids, excluido=False, banco=DEFAULT_DB_ALIAS):
+    # Troca a linha de cada colaborador no feed por uma nova, quando os gatilhos não
+    # fazem isso: fora do SQLite, ou para alterações em outro banco ('banco').
+    # [NOTA] Em bancos com vários escritores simultâneos (ex: PostgreSQL), os ids podem
+    # ser gravados fora da ordem dos COMMITs; lá o ideal é recriar estes gatilhos.
+    if pelos_gatilhos(banco) or not ids:
+        return
+    with transaction.atomic():
+        anteriores = dict(
+            Alteracao.objects.filter(colaborador_id__in=ids).values_list('colaborador_id', 'cursor_criacao')
+        )
+        Alteracao.objects.filter(colaborador_id__in=ids).delete()
+        agora = timezone.now()
+        novas = Alteracao.objects.bulk_create([
+            Alteracao(colaborador_id=i, excluido=excluido, cursor_criacao=anteriores.get(i), momento=agora)
+            for i in ids
+        ])
+        # Colaborador novo no feed: o cursor de criação é o id da própria linha.
+        sem_criacao = [nova for nova in novas if nova.cursor_criacao is None]
+        for nova in sem_criacao:
+            nova.cursor_criacao = nova.id
+        Alteracao.objects.bulk_update(sem_criacao, ['cursor_criacao'])
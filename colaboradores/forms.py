@@ -1,6 +1,8 @@
 # Importa o módulo 'forms' do Django, que contém as classes e funcionalidades 
 # para criar formulários HTML e validar dados.
 from django import forms
+# Importa o módulo das obras em bancos separados (usado na validação do CPF).
+from . import shards
 # Importa o modelo 'Colaborador' do arquivo models.py deste mesmo app (indicado pelo '.').
 from .models import Colaborador
 
@@ -57,4 +59,16 @@ class ColaboradorForm(forms.ModelForm):
         # [NOTA] Embora este Form não esteja sendo usado ativamente na sua view 'colaborador_novo'
         # (que pega os dados diretamente do request.POST), ele é útil para validação automática
         # e seria essencial se você quisesse usar a renderização de formulário do Django 
-        # com {{ form.as_p }} ou {{ form.nome_completo }}, etc., no template HTML.
\ No newline at end of file
+        # com {{ form.as_p }} ou {{ form.nome_completo }}, etc., no template HTML.
+
+    # Validação do CPF
+    # ================
+    # O Django chama 'clean_<campo>' depois da validação padrão de cada campo.
+    # O UNIQUE do CPF só vale dentro de cada banco; com as obras em bancos separados
+    # (shards.py), o CPF também pode estar em outro banco ou no arquivo de inativos.
+    def clean_cpf(self):
+        cpf = self.cleaned_data['cpf']
+        # 'self.instance.pk': o próprio colaborador, na edição (None no cadastro).
+        if shards.cpf_em_uso(cpf, exceto=self.instance.pk):
+            raise forms.ValidationError('Já existe um colaborador com este CPF.')
+        return cpf
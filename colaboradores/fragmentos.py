@@ -0,0 +1,74 @@
+# Cache das Linhas da Tabela de Colaboradores (fragmentos de template)
+# ===================================================================
+# Renderizar a tabela da lista custa, por linha, duas inversões de URL ({% url %}),
+# um 'escapejs' e a montagem do contexto do template. Aqui cada linha (<tr>) é
+# guardada já renderizada no cache, com a chave (id, updated_at, EPIs pendentes):
+# enquanto o colaborador (e o saldo de EPIs dele) não mudar, a linha não é renderizada de novo — nem quando a página
+# inteira sai do cache da lista (cache_lista.py) porque OUTRO colaborador mudou.
+#
+# - Todas as linhas da página são buscadas com UMA chamada (get_many), e as que
+#   faltavam são guardadas com UMA chamada (set_many) — importante com Redis.
+# - As URLs de editar/excluir são invertidas uma vez por página, e não por linha.
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+TEMPLATE_LINHA = 'linha_colaborador.html'
+PREFIXO = 'colaboradores:linha'
+# Aumente este número ao alterar linha_colaborador.html, para não servir linhas antigas.
+VERSAO_LINHA = 3
+# Número usado só para inverter a URL uma vez e depois trocar pelo id de cada linha.
+_ID_MODELO = 987654321
+
+
+def _cache():
+    return caches[getattr(settings, 'COLABORADORES_CACHE_ALIAS', 'default')]
+
+
+def chave(colaborador):
+    # O saldo de EPIs muda sem alterar o colaborador (epis.py), por isso entra na chave.
+    # [ATENÇÃO] Busque os colaboradores com .select_related('saldo_epi'), senão
+    # cada linha faz uma consulta a mais.
+    return (
+        f'{PREFIXO}:{VERSAO_LINHA}:{colaborador.id}:{colaborador.updated_at.timestamp()}'
+        f':{colaborador.epis_pendentes}'
+    )
+
+
+def modelo_url(nome):
+    # Ex: 'colaborador_editar' -> '/editar/{}/' (basta um .format(id) por linha).
+    return reverse(nome, args=[_ID_MODELO]).replace(str(_ID_MODELO), '{}')
+
+
+def renderizar(colaboradores):
+    # Renderiza as linhas sem usar o cache (usado para as linhas que faltam nele).
+    template = get_template(TEMPLATE_LINHA)
+    url_editar = modelo_url('colaborador_editar')
+    url_excluir = modelo_url('colaborador_excluir')
+    return [
+        template.render({
+            'colab': colab,
+            'url_editar': url_editar.format(colab.id),
+            'url_excluir': url_excluir.format(colab.id),
+        })
+        for colab in colaboradores
+    ]
+
+
+def linhas(colaboradores):
+    # Retorna o HTML de cada linha da tabela, na mesma ordem de 'colaboradores'.
+    cache = _cache()
+    chaves = [chave(colab) for colab in colaboradores]
+    guardadas = cache.get_many(chaves)
+
+    faltando = [(k, colab) for k, colab in zip(chaves, colaboradores) if k not in guardadas]
+    if faltando:
+        novas = dict(zip((k for k, _ in faltando), renderizar([colab for _, colab in faltando])))
+        cache.set_many(novas, getattr(settings, 'COLABORADORES_CACHE_TIMEOUT', 300))
+        guardadas.update(novas)
+
+    # 'mark_safe': o HTML já foi escapado ao renderizar a linha.
+    return [mark_safe(guardadas[k]) for k in chaves]
@@ -0,0 +1,53 @@
+# Comando: python manage.py arquivar_inativos [--dias 180] [--lote 1000] [--simular]
+#          python manage.py arquivar_inativos --restaurar 12345678901 [98765432100 ...]
+# ================================================================================
+# Move para o arquivo (ColaboradorArquivado) os colaboradores inativos há mais de
+# --dias dias sem nenhuma alteração, em lotes de --lote colaboradores, cada lote em
+# sua própria transação (ver arquivo.py). Pode ser interrompido e executado de novo
+# a qualquer momento — ideal para uma rotina agendada (cron) fora do horário de pico.
+#   - --simular: só mostra quantos seriam arquivados.
+#   - --restaurar CPF...: traz os colaboradores com estes CPFs de volta do arquivo
+#     (ex: um colaborador recontratado).
+# Com as obras em bancos separados (shards.py), todos os bancos são percorridos.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from colaboradores import arquivo, shards
+from colaboradores import cpf as cpf_util
+
+
+class Command(BaseCommand):
+    help = 'Arquiva os colaboradores inativos há mais de N dias (ou restaura do arquivo).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=180,
+                            help='Arquiva os inativos sem alteração há mais de N dias (padrão: 180).')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Colaboradores movidos por transação (padrão: 1000).')
+        parser.add_argument('--simular', action='store_true',
+                            help='Apenas conta quantos colaboradores seriam arquivados.')
+        parser.add_argument('--restaurar', nargs='+', metavar='CPF',
+                            help='Restaura do arquivo os colaboradores com estes CPFs.')
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            cpfs = [cpf_util.limpar(cpf) for cpf in options['restaurar']]
+            restaurados = arquivo.restaurar(cpfs)
+            self.stdout.write(self.style.SUCCESS(f'{restaurados} colaborador(es) restaurado(s).'))
+            return
+
+        if options['dias'] < 0:
+            raise CommandError('--dias não pode ser negativo.')
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+
+        if options['simular']:
+            total = sum(arquivo.candidatos(options['dias'], banco=banco).count() for banco in shards.bancos())
+            self.stdout.write(f'{total} colaborador(es) seriam arquivados.')
+            return
+
+        total = arquivo.arquivar(
+            options['dias'], lote=options['lote'],
+            progresso=lambda total: self.stdout.write(f'  {total} arquivado(s)...'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{total} colaborador(es) arquivado(s).'))
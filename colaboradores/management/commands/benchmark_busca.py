@@ -0,0 +1,70 @@
+# Comando: python manage.py benchmark_busca [--quantidade 100000] [--repeticoes 50]
+# ==============================================================================
+# Mede o tempo da pesquisa indexada (busca.py + paginacao.py) com uma massa de dados sintética.
+# Os colaboradores são criados dentro de uma transação que é DESFEITA no final,
+# então o comando pode ser executado sem sujar o banco.
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from colaboradores.models import Colaborador
+from colaboradores.paginacao import paginar
+from colaboradores.sintetico import FUNCOES, NOMES, SOBRENOMES
+
+# Consultas medidas: nomes sem acento, função em maiúsculas e CPF com máscara parcial.
+CONSULTAS = ['Joao', 'sebastiao silva', 'ELETRICISTA', 'Mestre', '123.456', '000.000.123-45']
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência da pesquisa de colaboradores com N registros sintéticos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quantidade', type=int, default=100_000)
+        parser.add_argument('--repeticoes', type=int, default=50)
+        parser.add_argument('--limite-ms', type=float, default=10.0,
+                            help='Latência p95 máxima aceitável por consulta.')
+
+    def handle(self, *args, **options):
+        quantidade = options['quantidade']
+        aleatorio = random.Random(42)
+
+        with transaction.atomic():
+            self.stdout.write(f'Criando {quantidade} colaboradores...')
+            cpfs = aleatorio.sample(range(10 ** 11), quantidade)
+            Colaborador.objects.bulk_create(
+                (
+                    Colaborador(
+                        nome_completo=f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}',
+                        cpf=f'{cpf:011d}',
+                        funcao=aleatorio.choice(FUNCOES),
+                    )
+                    for cpf in cpfs
+                ),
+                batch_size=5_000,
+            )
+
+            lentas = 0
+            for consulta in CONSULTAS:
+                tempos = []
+                for _ in range(options['repeticoes']):
+                    inicio = time.perf_counter()
+                    # Mesma consulta que a view faz: busca + ordenação + primeira página.
+                    paginar(Colaborador.objects.all(), tamanho=50, query=consulta)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                p50 = statistics.median(tempos)
+                p95 = statistics.quantiles(tempos, n=20)[-1]
+                if p95 > options['limite_ms']:
+                    lentas += 1
+                self.stdout.write(f'{consulta!r:24} p50={p50:7.2f}ms  p95={p95:7.2f}ms')
+
+            # Desfaz a transação: nenhum colaborador sintético fica no banco.
+            transaction.set_rollback(True)
+
+        if lentas:
+            self.stderr.write(self.style.ERROR(f'{lentas} consulta(s) acima de {options["limite_ms"]}ms no p95.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Todas as consultas dentro do limite.'))
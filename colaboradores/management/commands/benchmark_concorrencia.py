@@ -0,0 +1,130 @@
+# Comando: python manage.py benchmark_concorrencia [--clientes 50,200,1000] [--requisicoes 2000]
+# =============================================================================================
+# Compara a vazão (requisições por segundo) das views síncronas (WSGI) com a das
+# views assíncronas (ASGI) sob N clientes simultâneos.
+#
+# Cada modo roda em um subprocesso separado, com COLABORADORES_ASYNC=0 (WSGI) ou
+# COLABORADORES_ASYNC=1 (ASGI), porque as rotas são escolhidas quando as URLs são
+# carregadas. Dentro do subprocesso:
+#   - WSGI: um pool de N threads faz as requisições pelo handler WSGI do Django;
+#   - ASGI: N tarefas asyncio simultâneas fazem as requisições pelo handler ASGI.
+# O cache da lista é desligado (COLABORADORES_CACHE=nenhum, e COLABORADORES_VOO_UNICO_TTL=0
+# para a página não ficar na memória do processo) para medir o banco e o template, e não
+# o cache. Requisições idênticas que chegam juntas continuam montando a página uma vez
+# só (voo_unico.py), como no servidor real. O resultado final também é impresso em JSON.
+#
+# [NOTA] O benchmark usa o banco configurado (rode 'importar_colaboradores' antes
+# para ter uma massa de dados) e exercita os handlers em processo, sem rede.
+# Para medir com servidores reais, compare 'gunicorn setup.wsgi' com
+# 'uvicorn setup.asgi:application' usando qualquer gerador de carga HTTP.
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+
+
+def percentil(tempos, p):
+    ordenados = sorted(tempos)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+class Command(BaseCommand):
+    help = 'Compara a vazão WSGI x ASGI das views de leitura com vários níveis de concorrência.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', default='50,200,1000',
+                            help='Níveis de concorrência separados por vírgula.')
+        parser.add_argument('--requisicoes', type=int, default=2000,
+                            help='Total de requisições por nível de concorrência.')
+        parser.add_argument('--caminhos', default='/,/?q=pedreiro,/api/colaboradores/?q=silva',
+                            help='Caminhos requisitados (em rodízio), separados por vírgula.')
+        # Opção interna: executa um único modo neste processo (usada pelos subprocessos).
+        parser.add_argument('--modo', choices=['wsgi', 'asgi'], help='Executa apenas um modo.')
+
+    def handle(self, *args, **options):
+        niveis = [int(n) for n in options['clientes'].split(',')]
+        caminhos = options['caminhos'].split(',')
+        if options['modo']:
+            resultados = [self.medir(options['modo'], n, options['requisicoes'], caminhos) for n in niveis]
+            self.stdout.write(json.dumps(resultados))
+            return
+
+        resultados = []
+        for modo in ('wsgi', 'asgi'):
+            ambiente = {
+                **os.environ,
+                'COLABORADORES_ASYNC': '1' if modo == 'asgi' else '0',
+                'COLABORADORES_CACHE': 'nenhum',
+                'COLABORADORES_VOO_UNICO_TTL': '0',
+            }
+            processo = subprocess.run(
+                [sys.executable, sys.argv[0], 'benchmark_concorrencia', '--modo', modo,
+                 '--clientes', options['clientes'], '--requisicoes', str(options['requisicoes']),
+                 '--caminhos', options['caminhos']],
+                env=ambiente, capture_output=True, text=True,
+            )
+            if processo.returncode != 0:
+                raise CommandError(f'Falha no modo {modo}:\n{processo.stderr}')
+            resultados.extend(json.loads(processo.stdout.strip().splitlines()[-1]))
+
+        self.stdout.write(f'{"modo":6} {"clientes":>8} {"req/s":>10} {"p50 ms":>9} {"p99 ms":>9} {"erros":>6}')
+        for r in resultados:
+            self.stdout.write(
+                f'{r["modo"]:6} {r["clientes"]:>8} {r["req_s"]:>10.1f} '
+                f'{r["p50_ms"]:>9.2f} {r["p99_ms"]:>9.2f} {r["erros"]:>6}'
+            )
+        self.stdout.write(json.dumps(resultados))
+
+    def medir(self, modo, clientes, total, caminhos):
+        esperado = modo == 'asgi'
+        if settings.COLABORADORES_ASYNC != esperado:
+            raise CommandError(f'O modo {modo} exige COLABORADORES_ASYNC={int(esperado)}.')
+        alvos = [caminhos[i % len(caminhos)] for i in range(total)]
+
+        inicio = time.perf_counter()
+        if modo == 'wsgi':
+            tempos, erros = self.medir_wsgi(clientes, alvos)
+        else:
+            tempos, erros = asyncio.run(self.medir_asgi(clientes, alvos))
+        duracao = time.perf_counter() - inicio
+
+        return {
+            'modo': modo,
+            'clientes': clientes,
+            'requisicoes': total,
+            'req_s': round(total / duracao, 1),
+            'p50_ms': round(percentil(tempos, 0.50) * 1000, 2),
+            'p99_ms': round(percentil(tempos, 0.99) * 1000, 2),
+            'erros': erros,
+        }
+
+    def medir_wsgi(self, clientes, alvos):
+        def requisitar(caminho):
+            inicio = time.perf_counter()
+            status = Client().get(caminho).status_code
+            return time.perf_counter() - inicio, status
+
+        with ThreadPoolExecutor(max_workers=clientes) as executor:
+            respostas = list(executor.map(requisitar, alvos))
+        return [t for t, _ in respostas], sum(1 for _, s in respostas if s != 200)
+
+    async def medir_asgi(self, clientes, alvos):
+        limite = asyncio.Semaphore(clientes)
+        cliente = AsyncClient()
+
+        async def requisitar(caminho):
+            async with limite:
+                inicio = time.perf_counter()
+                status = (await cliente.get(caminho)).status_code
+                return time.perf_counter() - inicio, status
+
+        respostas = await asyncio.gather(*(requisitar(c) for c in alvos))
+        return [t for t, _ in respostas], sum(1 for _, s in respostas if s != 200)
@@ -0,0 +1,148 @@
+# Comando: python manage.py benchmark_epis [--movimentos 2000000] [--colaboradores 20000] [--repeticoes 20]
+# ==========================================================================================================
+# Mede o custo de mostrar os EPIs pendentes na lista com um livro-registro de milhões
+# de empréstimos/devoluções. A primeira página da lista (50 linhas) é montada de três formas:
+#   - saldo_join   a da lista: saldo pronto em 'SaldoEpi', no LEFT JOIN da própria consulta;
+#   - n_mais_1     uma soma do livro-registro por linha (51 consultas);
+#   - agregacao    uma consulta só, somando o livro-registro (JOIN + GROUP BY) na hora.
+# Mede também a latência de um empréstimo/devolução (epis.py, com a conferência do
+# saldo e os gatilhos) e, no final, confere os saldos com o livro-registro inteiro.
+# Tudo é criado dentro de uma transação DESFEITA no final: o banco não é alterado.
+
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Case, F, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from colaboradores import epis, sintetico
+from colaboradores.models import Colaborador, Epi, MovimentacaoEpi
+from colaboradores.paginacao import paginar
+
+NOMES_EPI = ['Capacete', 'Luva de raspa', 'Botina', 'Óculos de proteção', 'Protetor auricular',
+             'Cinto paraquedista', 'Máscara PFF2', 'Avental de raspa', 'Perneira', 'Protetor facial']
+LOTE = 20_000
+
+# Soma do livro-registro pela relação reversa (variação 'agregacao').
+DELTA_RELACAO = Case(
+    When(movimentacoes_epi__tipo='emprestimo', then=F('movimentacoes_epi__quantidade')),
+    default=-F('movimentacoes_epi__quantidade'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Mede a lista com os EPIs pendentes usando milhões de empréstimos/devoluções sintéticos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movimentos', type=int, default=2_000_000)
+        parser.add_argument('--colaboradores', type=int, default=20_000)
+        parser.add_argument('--repeticoes', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options['movimentos'] < 1 or options['colaboradores'] < 1:
+            raise CommandError('--movimentos e --colaboradores devem ser maiores que zero.')
+        if options['repeticoes'] < 2:
+            raise CommandError('--repeticoes deve ser pelo menos 2.')
+        aleatorio = random.Random(42)
+
+        with transaction.atomic():
+            sintetico.popular(options['colaboradores'])
+            ids = list(Colaborador.objects.values_list('id', flat=True))
+            ativos = list(Colaborador.objects.filter(status='Ativo').values_list('id', flat=True))
+            epis_ids = [epi.id for epi in Epi.objects.bulk_create(Epi(nome=nome) for nome in NOMES_EPI)]
+
+            self.stdout.write(f"Gravando {options['movimentos']} movimentações para {len(ids)} colaboradores...")
+            inicio = time.perf_counter()
+            movimentos = self.gerar(options['movimentos'], ids, epis_ids, aleatorio)
+            while lote := list(itertools.islice(movimentos, LOTE)):
+                MovimentacaoEpi.objects.bulk_create(lote)
+            segundos = time.perf_counter() - inicio
+            self.stdout.write(f"  {options['movimentos'] / segundos:,.0f} movimentações/s (saldos pelos gatilhos)")
+
+            variacoes = {
+                'saldo_join': lambda: [
+                    c.epis_pendentes for c in paginar(Colaborador.objects.select_related('saldo_epi'), tamanho=50)['linhas']
+                ],
+                'n_mais_1': lambda: [
+                    self.somar_livro(c.id) for c in paginar(Colaborador.objects.all(), tamanho=50)['linhas']
+                ],
+                'agregacao': lambda: [
+                    c.pendentes for c in paginar(
+                        Colaborador.objects.annotate(pendentes=Coalesce(Sum(DELTA_RELACAO), 0)), tamanho=50,
+                    )['linhas']
+                ],
+            }
+            resultados = {}
+            for nome, montar in variacoes.items():
+                resultados[nome], consultas = self.contar_consultas(montar)
+                self.medir(nome, montar, options['repeticoes'], f'{consultas} consulta(s)')
+            if len(set(map(tuple, resultados.values()))) != 1:
+                raise CommandError('As variações mostraram números diferentes de EPIs pendentes.')
+
+            self.medir(
+                'emprestar+devolver',
+                lambda: self.emprestar_e_devolver(aleatorio.choice(ativos), aleatorio.choice(epis_ids)),
+                options['repeticoes'],
+            )
+
+            divergentes = epis.divergencias()
+            # Desfaz a transação: nada do que foi criado fica no banco.
+            transaction.set_rollback(True)
+
+        if divergentes:
+            raise CommandError(f'{len(divergentes)} saldo(s) divergente(s) do livro-registro.')
+        self.stdout.write(self.style.SUCCESS('Saldos conferem com o livro-registro.'))
+
+    def gerar(self, quantidade, ids, epis_ids, aleatorio):
+        # Empréstimos e devoluções misturados; toda devolução é de um item emprestado antes.
+        agora = timezone.now()
+        abertos = []
+        for _ in range(quantidade):
+            if abertos and aleatorio.random() < 0.45:
+                # Tira um item aberto qualquer (troca com o último para o pop ser O(1)).
+                i = aleatorio.randrange(len(abertos))
+                abertos[i], abertos[-1] = abertos[-1], abertos[i]
+                colaborador_id, epi_id = abertos.pop()
+                tipo = 'devolucao'
+            else:
+                colaborador_id, epi_id = aleatorio.choice(ids), aleatorio.choice(epis_ids)
+                abertos.append((colaborador_id, epi_id))
+                tipo = 'emprestimo'
+            yield MovimentacaoEpi(colaborador_id=colaborador_id, epi_id=epi_id, tipo=tipo, momento=agora)
+
+    def contar_consultas(self, funcao):
+        # Conta os comandos SQL executados por 'funcao' (sem o registro de consultas do
+        # Django, que guarda só as 9000 últimas e já foi ocupado pelos lotes acima).
+        comandos = []
+
+        def contar(execute, sql, params, many, context):
+            comandos.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(contar):
+            resultado = funcao()
+        return resultado, len(comandos)
+
+    def somar_livro(self, colaborador_id):
+        # O jeito ingênuo: somar o livro-registro do colaborador a cada linha exibida.
+        total = MovimentacaoEpi.objects.filter(colaborador_id=colaborador_id).aggregate(total=Sum(epis.DELTA))['total']
+        return total or 0
+
+    def emprestar_e_devolver(self, colaborador_id, epi_id):
+        epis.emprestar(colaborador_id, epi_id)
+        epis.devolver(colaborador_id, epi_id)
+
+    def medir(self, nome, funcao, repeticoes, extra=''):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        p50 = statistics.median(tempos)
+        p95 = statistics.quantiles(tempos, n=20)[-1]
+        self.stdout.write(f'{nome:<20} p50={p50:9.2f}ms  p95={p95:9.2f}ms  {extra}')
@@ -0,0 +1,87 @@
+# Comando: python manage.py benchmark_escritas [--escritores 8] [--leitores 8] [--segundos 10]
+# =========================================================================================
+# Teste de carga de escritas concorrentes no SQLite: várias threads editam
+# colaboradores (como o 'colaborador_editar' faz) enquanto outras leem a lista.
+# Mostra operações por segundo e quantos erros "database is locked" ocorreram.
+#
+# Compare a configuração padrão com a camada de produção (setup/sqlite_producao):
+#   python manage.py benchmark_escritas
+#   COLABORADORES_DB=producao python manage.py benchmark_escritas
+#
+# [ATENÇÃO] As edições são gravadas de verdade (o status é alternado e depois
+# restaurado); use um banco de testes.
+
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from colaboradores.models import Colaborador
+from colaboradores.paginacao import paginar
+
+
+class Command(BaseCommand):
+    help = 'Mede escritas/leituras concorrentes e erros de banco bloqueado no SQLite.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escritores', type=int, default=8)
+        parser.add_argument('--leitores', type=int, default=8)
+        parser.add_argument('--segundos', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        ids = list(Colaborador.objects.values_list('id', flat=True)[:1000])
+        if not ids:
+            raise CommandError('Nenhum colaborador no banco; rode importar_colaboradores antes.')
+
+        fim = time.monotonic() + options['segundos']
+        resultado = {'escritas': 0, 'leituras': 0, 'bloqueios': 0}
+        trava = threading.Lock()
+
+        def contar(chave):
+            with trava:
+                resultado[chave] += 1
+
+        def escritor():
+            aleatorio = random.Random()
+            try:
+                while time.monotonic() < fim:
+                    try:
+                        with transaction.atomic():
+                            colaborador = Colaborador.objects.get(id=aleatorio.choice(ids))
+                            colaborador.status = 'Inativo' if colaborador.status == 'Ativo' else 'Ativo'
+                            colaborador.save()
+                        contar('escritas')
+                    except OperationalError:
+                        contar('bloqueios')
+            finally:
+                connection.close()
+
+        def leitor():
+            try:
+                while time.monotonic() < fim:
+                    try:
+                        paginar(Colaborador.objects.all(), tamanho=50)
+                        contar('leituras')
+                    except OperationalError:
+                        contar('bloqueios')
+            finally:
+                connection.close()
+
+        threads = (
+            [threading.Thread(target=escritor) for _ in range(options['escritores'])]
+            + [threading.Thread(target=leitor) for _ in range(options['leitores'])]
+        )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        segundos = options['segundos']
+        self.stdout.write(
+            f"backend={connection.settings_dict['ENGINE']} "
+            f"escritas/s={resultado['escritas'] / segundos:.1f} "
+            f"leituras/s={resultado['leituras'] / segundos:.1f} "
+            f"bloqueios={resultado['bloqueios']}"
+        )
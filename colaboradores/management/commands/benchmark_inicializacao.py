@@ -0,0 +1,206 @@
+# Comando: python manage.py benchmark_inicializacao [--servidor wsgi|asgi] [--repeticoes 3]
+# ========================================================================================
+# Mede quanto custa iniciar um worker do servidor e quanto as primeiras requisições
+# esperam por ele, sem e com o aquecimento (setup/aquecimento.py, COLABORADORES_AQUECER).
+#
+# Cada medição roda em um processo Python novo (como um worker recém-reiniciado),
+# com 'python -X importtime'. O processo:
+#   1. importa setup.wsgi (ou setup.asgi) — 'inicializacao': Django, apps, middlewares
+#      e, quando ligado, o aquecimento (com a duração de cada etapa);
+#   2. faz DUAS requisições seguidas a cada caminho de --caminhos, direto pela
+#      'application' do módulo (sem rede). A primeira ("fria") mostra o que ficou para
+#      o usuário; a segunda ("quente") é a referência. Cada uma é dividida em banco
+#      (consultas SQL) e template, medidos pelas métricas (metricas.py), e 'outros'
+#      (rotas, middlewares, a view, abrir a conexão com o banco...).
+# Do '-X importtime' saem o tempo total de importação — antes das requisições e
+# DURANTE elas (importações atrasadas que caem em cima do usuário) — e os pacotes
+# que mais pesam na inicialização.
+#
+# Os valores exibidos são a mediana das repetições; o resultado também é impresso
+# em JSON. Use-o para perceber quando uma mudança deixa a inicialização mais lenta.
+# [NOTA] As requisições usam o banco configurado (só leitura).
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_concorrencia import percentil
+
+# Separa, na saída do '-X importtime', as importações da inicialização das feitas
+# durante as requisições.
+MARCA = '--- requisicoes ---'
+
+# Código executado no processo novo: argv = [servidor, caminhos em JSON].
+PROCESSO = '''
+import asyncio, importlib, io, json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+servidor, caminhos = sys.argv[1], json.loads(sys.argv[2])
+inicio = time.perf_counter()
+modulo = importlib.import_module('setup.' + servidor)
+resultado = {'inicializacao': (time.perf_counter() - inicio) * 1000}
+
+from django.urls import resolve
+from colaboradores import metricas
+from setup import aquecimento
+for etapa, ms in aquecimento.ultimo.items():
+    resultado['aquecimento_' + etapa] = ms
+
+
+def pedir_wsgi(caminho):
+    rota, _, consulta = caminho.partition('?')
+    ambiente = {'PATH_INFO': rota, 'QUERY_STRING': consulta, 'wsgi.input': io.BytesIO()}
+    setup_testing_defaults(ambiente)
+    status = []
+    corpo = modulo.application(ambiente, lambda s, cabecalhos, erro=None: status.append(s))
+    b''.join(corpo)
+    corpo.close()
+    return int(status[0].split()[0])
+
+
+async def pedir_asgi(caminho):
+    rota, _, consulta = caminho.partition('?')
+    escopo = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': rota, 'raw_path': rota.encode(), 'query_string': consulta.encode(),
+        'root_path': '', 'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+    }
+    mensagens = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = []
+
+    async def receber():
+        if mensagens:
+            return mensagens.pop()
+        await asyncio.Future()  # o cliente nunca desconecta
+
+    async def enviar(mensagem):
+        if mensagem['type'] == 'http.response.start':
+            status.append(mensagem['status'])
+
+    await modulo.application(escopo, receber, enviar)
+    return status[0]
+
+
+def pedir(caminho):
+    if servidor == 'wsgi':
+        return pedir_wsgi(caminho)
+    return asyncio.run(pedir_asgi(caminho))
+
+
+sys.stderr.write(MARCA + '\\n')
+sys.stderr.flush()
+for caminho in caminhos:
+    for vez in ('fria', 'quente'):
+        metricas.limpar()
+        inicio = time.perf_counter()
+        status = pedir(caminho)
+        total = (time.perf_counter() - inicio) * 1000
+        if status != 200:
+            raise SystemExit(f'{caminho}: status {status}')
+        somas = metricas.somas(resolve(caminho.partition('?')[0]).url_name)
+        banco, template = somas.get('banco', 0) * 1000, somas.get('template', 0) * 1000
+        prefixo = f'{caminho} {vez} '
+        resultado[prefixo + 'total'] = total
+        if vez == 'fria':
+            resultado[prefixo + 'banco'] = banco
+            resultado[prefixo + 'template'] = template
+            resultado[prefixo + 'outros'] = total - banco - template
+print(json.dumps(resultado))
+'''.replace('MARCA', repr(MARCA))
+
+
+def importacoes(saida):
+    # Lê a saída do '-X importtime' ("import time: self | cumulative | pacote", em
+    # microssegundos). Retorna (ms antes da MARCA, ms depois dela, {pacote: ms}).
+    antes = depois = 0.0
+    por_pacote = defaultdict(float)
+    durante = False
+    for linha in saida.splitlines():
+        if linha == MARCA:
+            durante = True
+            continue
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, _, pacote = linha[len('import time:'):].split('|')
+        ms = int(proprio) / 1000
+        if durante:
+            depois += ms
+        else:
+            antes += ms
+            por_pacote[pacote.strip().split('.')[0]] += ms
+    return antes, depois, por_pacote
+
+
+class Command(BaseCommand):
+    help = 'Mede a inicialização de um worker e as primeiras requisições, sem e com aquecimento.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servidor', choices=['wsgi', 'asgi'], default='wsgi',
+                            help='Módulo iniciado: setup.wsgi (padrão) ou setup.asgi.')
+        parser.add_argument('--caminhos', default='/,/cadastro/,/api/colaboradores/',
+                            help='Caminhos requisitados, separados por vírgula.')
+        parser.add_argument('--repeticoes', type=int, default=3,
+                            help='Processos iniciados por variação (padrão: 3).')
+        parser.add_argument('--pacotes', type=int, default=10,
+                            help='Quantos pacotes mostrar no tempo de importação (padrão: 10).')
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser maior que zero.')
+        caminhos = options['caminhos'].split(',')
+
+        medidas = {}  # variação -> {medida: [ms por repetição]}
+        pacotes = {}  # variação -> {pacote: [ms por repetição]}
+        for variacao, aquecer in (('sem_aquecimento', '0'), ('com_aquecimento', '1')):
+            medidas[variacao] = defaultdict(list)
+            pacotes[variacao] = defaultdict(list)
+            for _ in range(options['repeticoes']):
+                resultado, antes, depois, por_pacote = self.executar(options['servidor'], caminhos, aquecer)
+                for medida, ms in resultado.items():
+                    medidas[variacao][medida].append(ms)
+                medidas[variacao]['importacoes (inicializacao)'].append(antes)
+                medidas[variacao]['importacoes (requisicoes)'].append(depois)
+                for pacote, ms in por_pacote.items():
+                    pacotes[variacao][pacote].append(ms)
+
+        resultados = {
+            variacao: {medida: round(percentil(tempos, 0.5), 2) for medida, tempos in valores.items()}
+            for variacao, valores in medidas.items()
+        }
+        nomes = list(dict.fromkeys(medida for valores in medidas.values() for medida in valores))
+        largura = max(len(nome) for nome in nomes)
+        self.stdout.write(f'servidor={options["servidor"]}  (mediana de {options["repeticoes"]} processo(s), ms)')
+        self.stdout.write(f'{"":<{largura}}  {"sem_aquecimento":>16}  {"com_aquecimento":>16}')
+        for nome in nomes:
+            colunas = [resultados[variacao].get(nome) for variacao in resultados]
+            self.stdout.write(
+                f'{nome:<{largura}}  ' + '  '.join('-'.rjust(16) if ms is None else f'{ms:>16.2f}' for ms in colunas)
+            )
+
+        self.stdout.write('Importações na inicialização, por pacote (sem_aquecimento, ms):')
+        medianas = {pacote: percentil(tempos, 0.5) for pacote, tempos in pacotes['sem_aquecimento'].items()}
+        for pacote, ms in sorted(medianas.items(), key=lambda item: item[1], reverse=True)[:options['pacotes']]:
+            self.stdout.write(f'  {pacote:<30} {ms:>9.2f}')
+
+        self.stdout.write(json.dumps(resultados, ensure_ascii=False, indent=2))
+
+    def executar(self, servidor, caminhos, aquecer):
+        ambiente = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'setup.settings'),
+            'COLABORADORES_AQUECER': aquecer,
+        }
+        processo = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROCESSO, servidor, json.dumps(caminhos)],
+            cwd=settings.BASE_DIR, env=ambiente, capture_output=True, text=True,
+        )
+        if processo.returncode != 0:
+            raise CommandError(f'Falha no processo ({servidor}, COLABORADORES_AQUECER={aquecer}):\n'
+                               f'{processo.stderr[-3000:]}')
+        return (json.loads(processo.stdout.strip().splitlines()[-1]), *importacoes(processo.stderr))
@@ -0,0 +1,112 @@
+# Comando: python manage.py benchmark_render [--linhas 1000,10000] [--repeticoes 5]
+# ================================================================================
+# Mede o tempo de renderização da tabela de colaboradores (só o template, sem banco):
+#   - antes              o laço antigo do index.html: {% url %} e |escapejs em cada linha;
+#   - fragmentos_frio    fragmentos.linhas() com o cache vazio (renderiza e guarda tudo);
+#   - fragmentos_quente  fragmentos.linhas() com as linhas já no cache (só get_many).
+#
+# Os colaboradores são montados em memória com os dados de sintetico.py (nada é
+# gravado no banco) e o cache usado é uma memória local própria do comando.
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from colaboradores import fragmentos, sintetico
+
+from .benchmark_concorrencia import percentil
+
+# O laço da tabela como era antes do cache de fragmentos.
+TEMPLATE_ANTIGO = '''{% for colab in colaboradores_lista %}
+<tr>
+    <td class="select"><input type="checkbox" name="ids" value="{{ colab.id }}" aria-label="Selecionar {{ colab.nome_completo }}"></td>
+    <td>{{ colab.nome_completo }}</td>
+    <td>{{ colab.cpf }}</td>
+    <td>{{ colab.funcao }}</td>
+    <td>{{ colab.status }}</td>
+    <td class="actions">
+        <a href="{% url 'colaborador_editar' colab.id %}">Editar</a>
+        <a href="{% url 'colaborador_excluir' colab.id %}"
+           onclick="return confirm('Tem certeza que deseja excluir {{ colab.nome_completo|escapejs }}?');"
+           style="color: #E53E3E;">Excluir</a>
+    </td>
+</tr>
+{% endfor %}'''
+
+CACHE_BENCHMARK = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-render',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Compara o tempo de renderização da tabela com e sem o cache de linhas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', default='1000,10000',
+                            help='Quantidades de linhas, separadas por vírgula.')
+        parser.add_argument('--repeticoes', type=int, default=5,
+                            help='Renderizações medidas por variação e quantidade.')
+
+    def handle(self, *args, **options):
+        try:
+            quantidades = [int(q) for q in options['linhas'].split(',')]
+        except ValueError:
+            raise CommandError('--linhas deve ser uma lista de números separados por vírgula.')
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser maior que zero.')
+
+        antigo = engines.all()[0].from_string(TEMPLATE_ANTIGO)
+        resultados = []
+        with override_settings(CACHES=CACHE_BENCHMARK, COLABORADORES_CACHE_ALIAS='default',
+                               COLABORADORES_CACHE_TIMEOUT=None):
+            cache = fragmentos._cache()
+            for quantidade in quantidades:
+                colaboradores = self.montar(quantidade)
+                variacoes = {
+                    'antes': lambda: antigo.render({'colaboradores_lista': colaboradores}),
+                    'fragmentos_frio': lambda: ''.join(fragmentos.linhas(colaboradores)),
+                    'fragmentos_quente': lambda: ''.join(fragmentos.linhas(colaboradores)),
+                }
+                for nome, renderizar in variacoes.items():
+                    tempos = []
+                    for _ in range(options['repeticoes']):
+                        if nome == 'fragmentos_frio':
+                            cache.clear()
+                        inicio = time.perf_counter()
+                        renderizar()
+                        tempos.append((time.perf_counter() - inicio) * 1000)
+                    resultado = {
+                        'linhas': quantidade,
+                        'variacao': nome,
+                        'p50_ms': round(percentil(tempos, 0.5), 2),
+                        'max_ms': round(max(tempos), 2),
+                    }
+                    resultados.append(resultado)
+                    self.stdout.write(
+                        f"{quantidade:>7} linhas  {nome:<18} p50={resultado['p50_ms']:>9.2f}ms  "
+                        f"max={resultado['max_ms']:>9.2f}ms"
+                    )
+            cache.clear()
+
+        self.stdout.write(json.dumps(resultados, ensure_ascii=False, indent=2))
+
+    def montar(self, quantidade):
+        # Colaboradores em memória, com id e 'updated_at' (usados na chave do cache).
+        agora = timezone.now()
+        colaboradores = []
+        for numero in range(quantidade):
+            colab = sintetico.colaborador(numero)
+            colab.id = numero + 1
+            colab.updated_at = agora
+            # Sem saldo de EPIs (como o LEFT JOIN da lista sem linha em 'SaldoEpi'):
+            # evita que a chave do cache faça uma consulta por linha.
+            colab.saldo_epi = None
+            colaboradores.append(colab)
+        return colaboradores
@@ -0,0 +1,227 @@
+# Comando: python manage.py benchmark_views [--escalas 1000,10000,100000,1000000] [--repeticoes 50]
+#                                           [--saida resultado.json] [--comparar base.json]
+# ================================================================================================
+# Mede as views do app pelo cliente de testes do Django (o caminho completo: URL,
+# middleware, view, banco e template) em várias escalas de dados:
+#   - lista            GET /                  (dashboard sem pesquisa)
+#   - lista_pesquisa   GET /?q=...            (pesquisa indexada)
+#   - novo             POST /cadastro/
+#   - editar           POST /editar/<id>/
+#   - excluir          GET /excluir/<id>/
+#   - admin_lista      GET /admin/colaboradores/colaborador/        (lista do admin, ver admin.py)
+#   - admin_pesquisa   GET /admin/colaboradores/colaborador/?q=...
+#
+# Para cada escala e operação são registrados: latência p50/p95/p99, quantidade de
+# consultas SQL e o pico de memória alocada (tracemalloc) durante a requisição.
+# O resultado é um JSON (impresso no final e, com --saida, gravado em arquivo).
+#
+# Verificação de regressão: com --comparar base.json, o comando falha (código de
+# saída diferente de zero) se alguma operação ficar mais lenta que a base além da
+# tolerância no p95, ou se passar a fazer mais consultas SQL.
+#
+# Os dados sintéticos (sintetico.py) são criados dentro de uma transação DESFEITA
+# no final, como no benchmark_busca; use --manter para mantê-los no banco.
+# O cache da lista é desligado durante a medição, senão mediríamos o cache.
+
+import json
+import platform
+import sqlite3
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from colaboradores import sintetico
+from colaboradores.models import Colaborador
+
+from .benchmark_concorrencia import percentil
+
+OPERACOES = ['lista', 'lista_pesquisa', 'novo', 'editar', 'excluir', 'admin_lista', 'admin_pesquisa']
+CONSULTAS = ['joao', 'sebastiao silva', 'ELETRICISTA', 'Mestre', 'Souza Leão']
+# Números dos colaboradores criados pela operação 'novo': bem acima de qualquer
+# escala, para que os CPFs nunca coincidam com os da massa sintética.
+NUMERO_NOVOS = 900_000_000
+VERSAO_FORMATO = 1
+
+
+class Command(BaseCommand):
+    help = 'Mede latência, consultas SQL e memória das views em várias escalas de dados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escalas', default='1000,10000,100000',
+                            help='Quantidades de colaboradores, separadas por vírgula '
+                                 '(ex: 1000,10000,100000,1000000).')
+        parser.add_argument('--repeticoes', type=int, default=50,
+                            help='Requisições medidas por operação e escala.')
+        parser.add_argument('--saida', type=Path, help='Grava o resultado (JSON) neste arquivo.')
+        parser.add_argument('--comparar', type=Path, help='Resultado anterior (JSON) usado como base.')
+        parser.add_argument('--tolerancia', type=float, default=0.25,
+                            help='Aumento máximo aceito no p95 em relação à base (0.25 = 25%%).')
+        parser.add_argument('--folga-ms', type=float, default=1.0,
+                            help='Diferenças de p95 menores que isso são tratadas como ruído.')
+        parser.add_argument('--manter', action='store_true',
+                            help='Mantém os colaboradores sintéticos no banco.')
+
+    def handle(self, *args, **options):
+        try:
+            escalas = sorted(int(e) for e in options['escalas'].split(','))
+        except ValueError:
+            raise CommandError('--escalas deve ser uma lista de números separados por vírgula.')
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser maior que zero.')
+        base = self.carregar_base(options['comparar']) if options['comparar'] else None
+
+        # Um cache "que não guarda nada" no lugar do cache da lista (e sem guardar a
+        # página montada na memória do processo, ver voo_unico.py).
+        sem_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        resultados = []
+        with override_settings(CACHES=sem_cache, COLABORADORES_VOO_UNICO_TTL=0), transaction.atomic():
+            for escala in escalas:
+                self.stdout.write(f'Preparando {escala} colaboradores...')
+                sintetico.popular(escala)
+                for operacao in OPERACOES:
+                    resultado = self.medir(escala, operacao, options['repeticoes'])
+                    resultados.append(resultado)
+                    self.stdout.write(
+                        f'{escala:>9} {operacao:15} p50={resultado["p50_ms"]:8.2f}ms '
+                        f'p95={resultado["p95_ms"]:8.2f}ms p99={resultado["p99_ms"]:8.2f}ms '
+                        f'consultas={resultado["consultas"]:3} memoria={resultado["pico_memoria_kb"]:8.1f}KB'
+                    )
+            if not options['manter']:
+                # Desfaz a transação: nenhum colaborador sintético fica no banco.
+                transaction.set_rollback(True)
+
+        documento = {
+            'versao': VERSAO_FORMATO,
+            'ambiente': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'banco': connection.settings_dict['ENGINE'],
+            },
+            'resultados': resultados,
+        }
+        if options['saida']:
+            options['saida'].write_text(json.dumps(documento, indent=2), encoding='utf-8')
+        self.stdout.write(json.dumps(documento))
+
+        if base is not None:
+            regressoes = self.comparar(base, resultados, options['tolerancia'], options['folga_ms'])
+            for regressao in regressoes:
+                self.stderr.write(self.style.ERROR(regressao))
+            if regressoes:
+                raise CommandError(f'{len(regressoes)} regressão(ões) em relação a {options["comparar"]}.')
+            self.stdout.write(self.style.SUCCESS('Nenhuma regressão em relação à base.'))
+
+    def carregar_base(self, caminho):
+        try:
+            documento = json.loads(caminho.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as erro:
+            raise CommandError(f'Não foi possível ler a base {caminho}: {erro}')
+        return {(r['escala'], r['operacao']): r for r in documento.get('resultados', [])}
+
+    def requisicoes(self, operacao, quantidade):
+        # Monta a lista de requisições (funções que recebem o Client) de uma operação.
+        # 'novo' cria colaboradores que depois são editados e excluídos, então a massa
+        # sintética não muda de tamanho durante a medição.
+        novos = [sintetico.colaborador(NUMERO_NOVOS + i) for i in range(quantidade)]
+        if operacao == 'lista':
+            return [lambda cliente: cliente.get(reverse('index'))] * quantidade
+        if operacao == 'lista_pesquisa':
+            return [
+                lambda cliente, q=CONSULTAS[i % len(CONSULTAS)]: cliente.get(reverse('index'), {'q': q})
+                for i in range(quantidade)
+            ]
+        if operacao.startswith('admin'):
+            url = reverse('admin:colaboradores_colaborador_changelist')
+            if operacao == 'admin_lista':
+                return [lambda cliente: cliente.get(url)] * quantidade
+            return [
+                lambda cliente, q=CONSULTAS[i % len(CONSULTAS)]: cliente.get(url, {'q': q})
+                for i in range(quantidade)
+            ]
+        if operacao == 'novo':
+            return [
+                lambda cliente, c=c: cliente.post(reverse('cadastro'), {
+                    'nome_completo': c.nome_completo, 'cpf': c.cpf, 'funcao': c.funcao, 'status': c.status,
+                })
+                for c in novos
+            ]
+
+        por_cpf = dict(Colaborador.objects.filter(cpf__in=[c.cpf for c in novos]).values_list('cpf', 'id'))
+        ids = [por_cpf.get(c.cpf) for c in novos]
+        if None in ids:
+            raise CommandError(f'A operação {operacao} precisa dos colaboradores criados pela operação novo.')
+        if operacao == 'editar':
+            return [
+                lambda cliente, c=c, id=id: cliente.post(reverse('colaborador_editar', args=[id]), {
+                    'nome_completo': c.nome_completo, 'cpf': c.cpf, 'funcao': 'Servente', 'status': 'Inativo',
+                })
+                for c, id in zip(novos, ids)
+            ]
+        return [lambda cliente, id=id: cliente.get(reverse('colaborador_excluir', args=[id])) for id in ids]
+
+    def medir(self, escala, operacao, repeticoes):
+        cliente = Client()
+        if operacao.startswith('admin'):
+            # Um administrador criado na mesma transação (desfeita no final).
+            usuario, _ = get_user_model().objects.get_or_create(
+                username='benchmark_admin', defaults={'is_staff': True, 'is_superuser': True},
+            )
+            cliente.force_login(usuario)
+        # A primeira requisição (aquecimento) mede o pico de memória com o tracemalloc,
+        # que deixa o Python mais lento; as outras 'repeticoes' medem o tempo.
+        aquecimento, *medidas = self.requisicoes(operacao, repeticoes + 1)
+        esperado = 200 if operacao.startswith(('lista', 'admin')) else 302
+
+        tracemalloc.start()
+        resposta = aquecimento(cliente)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        erros = int(resposta.status_code != esperado)
+
+        tempos = []
+        consultas = 0
+        for requisicao in medidas:
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                resposta = requisicao(cliente)
+                tempos.append(time.perf_counter() - inicio)
+            consultas = max(consultas, len(capturadas))
+            erros += int(resposta.status_code != esperado)
+
+        return {
+            'escala': escala,
+            'operacao': operacao,
+            'repeticoes': repeticoes,
+            'p50_ms': round(percentil(tempos, 0.50) * 1000, 3),
+            'p95_ms': round(percentil(tempos, 0.95) * 1000, 3),
+            'p99_ms': round(percentil(tempos, 0.99) * 1000, 3),
+            'consultas': consultas,
+            'pico_memoria_kb': round(pico / 1024, 1),
+            'erros': erros,
+        }
+
+    def comparar(self, base, resultados, tolerancia, folga_ms):
+        # Retorna a lista de regressões (textos) em relação à base.
+        regressoes = []
+        for atual in resultados:
+            anterior = base.get((atual['escala'], atual['operacao']))
+            if anterior is None:
+                continue
+            nome = f'{atual["operacao"]} ({atual["escala"]} colaboradores)'
+            limite = max(anterior['p95_ms'] * (1 + tolerancia), anterior['p95_ms'] + folga_ms)
+            if atual['p95_ms'] > limite:
+                regressoes.append(f'{nome}: p95 {atual["p95_ms"]:.2f}ms > limite {limite:.2f}ms')
+            if atual['consultas'] > anterior['consultas']:
+                regressoes.append(f'{nome}: {atual["consultas"]} consultas SQL (base: {anterior["consultas"]})')
+            if atual['erros']:
+                regressoes.append(f'{nome}: {atual["erros"]} resposta(s) com status inesperado')
+        return regressoes
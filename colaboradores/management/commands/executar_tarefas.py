@@ -0,0 +1,120 @@
+# Comando: python manage.py executar_tarefas [--processos 2] [--intervalo 2] [--uma-vez]
+# =====================================================================================
+# O executor das tarefas em segundo plano (ver tarefas.py). Deixe-o rodando ao lado
+# do servidor web (ex: como um serviço do systemd ou um processo do supervisor):
+#   - a cada --intervalo segundos procura tarefas pendentes (ou abandonadas por um
+#     executor que caiu) e as entrega a um pool de --processos processos;
+#   - cada tarefa roda em lotes, gravando um checkpoint a cada lote; se o executor
+#     for interrompido (Ctrl+C, reinício da máquina...), as tarefas em andamento são
+#     retomadas do último checkpoint quando um executor voltar a rodar.
+#   - --processos 0 executa as tarefas no próprio processo, uma de cada vez.
+#   - --uma-vez executa o que estiver pendente e termina (ex: para rodar pelo cron).
+#
+# Os processos do pool são iniciados do zero ('spawn'), e não como cópias deste
+# processo: cada um configura o Django e abre as próprias conexões com o banco.
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def iniciar_processo(modulo_settings):
+    # Executado uma vez em cada processo do pool, antes da primeira tarefa.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', modulo_settings)
+    import django
+
+    django.setup()
+
+
+def executar_tarefa(tarefa_id, executor, lote):
+    # Importado aqui: no processo do pool, o Django só está pronto depois de 'iniciar_processo'.
+    from colaboradores import tarefas
+
+    return tarefas.executar(tarefa_id, executor, lote)
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano (relatórios) com um pool de processos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=2,
+                            help='Tarefas executadas ao mesmo tempo (0 = neste processo).')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos entre as procuras por tarefas novas.')
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Colaboradores processados entre dois checkpoints.')
+        parser.add_argument('--uma-vez', action='store_true',
+                            help='Executa as tarefas pendentes e termina.')
+
+    def handle(self, *args, **options):
+        # Importado aqui, e não no topo: os processos do pool importam este arquivo
+        # (para achar 'iniciar_processo') antes de o Django estar configurado.
+        from colaboradores import tarefas
+
+        if options['processos'] < 0:
+            raise CommandError('--processos não pode ser negativo.')
+        lote = options['lote'] or tarefas.LOTE
+        if lote < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+        executor = tarefas.identificar()
+
+        if options['processos'] == 0:
+            while True:
+                tarefa = tarefas.reservar(executor)
+                if tarefa is None:
+                    if options['uma_vez']:
+                        return
+                    time.sleep(options['intervalo'])
+                    continue
+                self.relatar(tarefa, tarefas.executar(tarefa.id, executor, lote))
+
+        pool = self.novo_pool(options['processos'])
+        em_andamento = {}  # futuro -> tarefa
+        try:
+            while True:
+                while len(em_andamento) < options['processos']:
+                    tarefa = tarefas.reservar(executor)
+                    if tarefa is None:
+                        break
+                    self.stdout.write(f'Tarefa #{tarefa.id} ({tarefa.tipo}): iniciada.')
+                    em_andamento[pool.submit(executar_tarefa, tarefa.id, executor, lote)] = tarefa
+                if not em_andamento:
+                    if options['uma_vez']:
+                        return
+                    time.sleep(options['intervalo'])
+                    continue
+                prontos, _ = wait(em_andamento, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    tarefa = em_andamento.pop(futuro)
+                    try:
+                        self.relatar(tarefa, futuro.result())
+                    except BrokenProcessPool:
+                        # Um processo do pool morreu (ex: falta de memória) e o pool
+                        # inteiro parou: as tarefas dele ficam sem sinal de vida e são
+                        # retomadas depois de tarefas.ABANDONO. O pool é trocado por um novo.
+                        for perdida in [tarefa, *em_andamento.values()]:
+                            self.stderr.write(f'Tarefa #{perdida.id}: processo interrompido.')
+                        em_andamento.clear()
+                        pool.shutdown(wait=False)
+                        pool = self.novo_pool(options['processos'])
+                        break
+        except KeyboardInterrupt:
+            self.stderr.write('Interrompido: as tarefas em andamento serão retomadas do último checkpoint.')
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def novo_pool(self, processos):
+        return ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=iniciar_processo,
+            initargs=(os.environ['DJANGO_SETTINGS_MODULE'],),
+        )
+
+    def relatar(self, tarefa, estado):
+        mensagem = f'Tarefa #{tarefa.id} ({tarefa.tipo}): {estado}.'
+        self.stdout.write(self.style.SUCCESS(mensagem) if estado == 'concluida' else self.style.WARNING(mensagem))
@@ -0,0 +1,169 @@
+# Comando: python manage.py importar_colaboradores arquivo.csv [--lote 2000]
+# ========================================================================
+# Importa colaboradores em massa a partir de um CSV com as colunas:
+#   nome_completo, cpf, funcao, status, obra (status e obra são opcionais;
+#   padrão 'Ativo' e sem obra)
+#
+# - O arquivo é lido linha a linha (streaming), então a memória usada não
+#   depende do tamanho do arquivo: só um lote fica em memória por vez.
+# - Cada lote vira UM 'INSERT ... ON CONFLICT(cpf) DO UPDATE' (bulk_create com
+#   update_conflicts), ou seja, CPFs já cadastrados são atualizados (upsert).
+# - Linhas inválidas vão para um arquivo separado, com o motivo da rejeição.
+#   CPFs de colaboradores arquivados (arquivo.py) também são rejeitados: o CPF
+#   é único nas duas tabelas, e a volta ao trabalho é feita com
+#   'arquivar_inativos --restaurar'.
+# - Com as obras em bancos separados (shards.py), cada lote é dividido por banco:
+#   um CPF já cadastrado continua no banco onde está, e um novo vai para o banco da
+#   obra dele. Mudar de obra para uma que fica em outro banco é rejeitado: a mudança
+#   é feita pelo cadastro (shards.salvar), que move o colaborador entre os bancos.
+
+import csv
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from colaboradores import arquivo, cache_lista, feed, shards
+from colaboradores import cpf as cpf_util
+from colaboradores.models import Colaborador
+
+CAMPOS = ['nome_completo', 'cpf', 'funcao', 'status', 'obra']
+STATUS_VALIDOS = {valor for valor, _ in Colaborador.STATUS_CHOICES}
+
+
+def validar(linha):
+    # Normaliza uma linha do CSV. Retorna (colaborador, None) ou (None, motivo_da_rejeição).
+    nome = (linha.get('nome_completo') or '').strip()
+    funcao = (linha.get('funcao') or '').strip()
+    status = (linha.get('status') or '').strip() or 'Ativo'
+    obra = (linha.get('obra') or '').strip()
+    # Mesma limpeza de CPF usada nas views de cadastro e edição.
+    cpf = cpf_util.limpar(linha.get('cpf'))
+
+    if not nome:
+        return None, 'nome_completo vazio'
+    if len(nome) > Colaborador._meta.get_field('nome_completo').max_length:
+        return None, 'nome_completo muito longo'
+    if len(cpf) != 11:
+        return None, 'cpf deve ter 11 dígitos'
+    if not funcao:
+        return None, 'funcao vazia'
+    if len(funcao) > Colaborador._meta.get_field('funcao').max_length:
+        return None, 'funcao muito longa'
+    if status not in STATUS_VALIDOS:
+        return None, f'status inválido: {status}'
+    if len(obra) > Colaborador._meta.get_field('obra').max_length:
+        return None, 'obra muito longa'
+    return Colaborador(nome_completo=nome, cpf=cpf, funcao=funcao, status=status, obra=obra), None
+
+
+class Command(BaseCommand):
+    help = 'Importa colaboradores de um arquivo CSV em lotes, atualizando CPFs já existentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', type=Path, help='Caminho do arquivo CSV.')
+        parser.add_argument('--lote', type=int, default=2000,
+                            help='Quantidade de linhas gravadas por comando INSERT (padrão: 2000).')
+        parser.add_argument('--delimitador', default=',', help='Separador de colunas do CSV.')
+        parser.add_argument('--rejeitados', type=Path,
+                            help='Arquivo para as linhas rejeitadas (padrão: <arquivo>.rejeitados.csv).')
+
+    def handle(self, *args, **options):
+        arquivo = options['arquivo']
+        tamanho_lote = options['lote']
+        if tamanho_lote < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+        if not arquivo.exists():
+            raise CommandError(f'Arquivo não encontrado: {arquivo}')
+        caminho_rejeitados = options['rejeitados'] or arquivo.with_name(arquivo.name + '.rejeitados.csv')
+
+        gravados = rejeitados = 0
+        inicio = time.perf_counter()
+
+        # 'utf-8-sig' aceita arquivos salvos pelo Excel (que incluem o BOM no início).
+        with open(arquivo, newline='', encoding='utf-8-sig') as entrada, \
+                open(caminho_rejeitados, 'w', newline='', encoding='utf-8') as saida_rejeitados:
+            leitor = csv.DictReader(entrada, delimiter=options['delimitador'])
+            faltando = {'nome_completo', 'cpf', 'funcao'} - set(leitor.fieldnames or [])
+            if faltando:
+                raise CommandError(f'Colunas obrigatórias ausentes: {", ".join(sorted(faltando))}')
+            escritor = csv.DictWriter(saida_rejeitados, fieldnames=['linha', *CAMPOS, 'motivo'],
+                                      extrasaction='ignore')
+            escritor.writeheader()
+            # Sem a coluna 'obra', a obra dos CPFs já cadastrados não é alterada.
+            self.com_obra = 'obra' in leitor.fieldnames
+
+            # O lote é um dicionário indexado pelo CPF: se o mesmo CPF aparecer
+            # duas vezes no mesmo lote, vale a última ocorrência (como no upsert).
+            # Cada item guarda também a linha original, para o caso de rejeição.
+            lote = {}
+            for numero, linha in enumerate(leitor, start=2):
+                colaborador, motivo = validar(linha)
+                if motivo:
+                    rejeitados += 1
+                    escritor.writerow({**linha, 'linha': numero, 'motivo': motivo})
+                    continue
+                lote[colaborador.cpf] = (numero, linha, colaborador)
+                if len(lote) >= tamanho_lote:
+                    gravados_lote, rejeitados_lote = self.gravar(lote, escritor)
+                    gravados += gravados_lote
+                    rejeitados += rejeitados_lote
+                    lote = {}
+            if lote:
+                gravados_lote, rejeitados_lote = self.gravar(lote, escritor)
+                gravados += gravados_lote
+                rejeitados += rejeitados_lote
+
+        # O bulk_create não dispara os sinais do Django, então o cache da lista
+        # é invalidado aqui, uma única vez no final da importação.
+        if gravados:
+            cache_lista.invalidar()
+
+        duracao = time.perf_counter() - inicio
+        velocidade = gravados / duracao if duracao else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{gravados} colaborador(es) gravado(s) em {duracao:.1f}s ({velocidade:,.0f} linhas/s).'
+        ))
+        if rejeitados:
+            self.stdout.write(self.style.WARNING(
+                f'{rejeitados} linha(s) rejeitada(s): veja {caminho_rejeitados}'
+            ))
+
+    def gravar(self, lote, escritor):
+        # Cada lote é gravado em sua própria transação: se o processo for interrompido,
+        # os lotes anteriores já estão salvos e basta executar o comando de novo
+        # (o upsert pelo CPF torna a reimportação segura).
+        # Retorna (gravados, rejeitados).
+        arquivados = arquivo.cpfs_arquivados(lote)
+        for cpf in arquivados:
+            numero, linha, _ = lote.pop(cpf)
+            escritor.writerow({**linha, 'linha': numero,
+                               'motivo': 'cpf de colaborador arquivado (use arquivar_inativos --restaurar)'})
+        rejeitados = len(arquivados)
+        # Sem bancos extras, tudo vai para o principal (sem consultar os CPFs).
+        cadastrados = shards.bancos_dos_cpfs(lote) if shards.configurados() else {}
+        por_banco = {}
+        for cpf, (numero, linha, colaborador) in lote.items():
+            banco = cadastrados.get(cpf) or shards.banco_da_obra(colaborador.obra)
+            if self.com_obra and banco != shards.banco_da_obra(colaborador.obra):
+                rejeitados += 1
+                escritor.writerow({**linha, 'linha': numero,
+                                   'motivo': 'obra em outro banco (mude a obra pelo cadastro)'})
+                continue
+            por_banco.setdefault(banco, []).append(colaborador)
+
+        campos = ['nome_completo', 'funcao', 'status', *(['obra'] if self.com_obra else [])]
+        for banco, colaboradores in por_banco.items():
+            with transaction.atomic(using=banco):
+                Colaborador.objects.using(banco).bulk_create(
+                    colaboradores,
+                    update_conflicts=True,
+                    unique_fields=['cpf'],
+                    # 'updated_at' (auto_now) é preenchido pelo bulk_create e atualizado no upsert.
+                    update_fields=[*campos, 'updated_at'],
+                )
+                # O bulk_create não dispara os sinais: nos bancos sem os gatilhos do
+                # feed, as alterações são registradas aqui.
+                feed.registrar([colaborador.id for colaborador in colaboradores], banco=banco)
+        return sum(len(colaboradores) for colaboradores in por_banco.values()), rejeitados
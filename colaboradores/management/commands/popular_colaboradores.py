@@ -0,0 +1,41 @@
+# Comando: python manage.py popular_colaboradores 100000 [--lote 5000]
+# ===================================================================
+# Preenche o banco com colaboradores sintéticos (nomes fictícios e CPFs válidos)
+# até atingir a quantidade pedida. Escalas usadas nos benchmarks: 1000, 10000,
+# 100000 e 1000000.
+#
+# O comando é idempotente: rodar "popular_colaboradores 10000" duas vezes deixa o
+# banco com 10000 colaboradores, e "popular_colaboradores 100000" depois cria só
+# os 90000 que faltam.
+#
+# [ATENÇÃO] Os colaboradores são gravados de verdade; use um banco de testes.
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from colaboradores import sintetico
+
+
+class Command(BaseCommand):
+    help = 'Cria colaboradores sintéticos (com CPFs válidos) até atingir a quantidade pedida.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quantidade', type=int, help='Total de colaboradores desejado no banco.')
+        parser.add_argument('--lote', type=int, default=5_000,
+                            help='Quantidade de colaboradores por comando INSERT (padrão: 5000).')
+
+    def handle(self, *args, **options):
+        if options['quantidade'] < 0 or options['lote'] < 1:
+            raise CommandError('A quantidade não pode ser negativa e o --lote deve ser maior que zero.')
+
+        inicio = time.perf_counter()
+        criados = sintetico.popular(
+            options['quantidade'],
+            lote=options['lote'],
+            progresso=lambda total: self.stdout.write(f'  {total} colaboradores...'),
+        )
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{criados} colaborador(es) criado(s) em {duracao:.1f}s.'
+        ))
@@ -0,0 +1,84 @@
+# Comando: python manage.py rebalancear_obras [--listar]
+#          python manage.py rebalancear_obras --mover OBRA [OBRA ...] --para BANCO
+#          python manage.py rebalancear_obras --dividir BANCO --para BANCO
+# ==========================================================================
+# Administra as obras em bancos separados (ver shards.py):
+#   - --listar (padrão): quantos colaboradores cada obra tem em cada banco;
+#   - --mover OBRA... --para BANCO: leva as obras para o banco (também serve para
+#     dar a uma obra nova o seu próprio banco, antes do primeiro cadastro);
+#   - --dividir BANCO --para BANCO: leva para o outro banco cerca de metade dos
+#     colaboradores de um banco (obras inteiras, as maiores primeiro).
+#   - --simular: só mostra o que seria movido.
+# O banco de destino precisa estar em COLABORADORES_SHARDS e já ter as tabelas
+# ('python manage.py migrate --database BANCO'). Execute uma mudança por vez; se
+# ela for interrompida, basta executar o mesmo comando de novo.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from colaboradores import shards
+
+
+class Command(BaseCommand):
+    help = 'Lista, move ou divide as obras entre os bancos (COLABORADORES_SHARDS).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listar', action='store_true',
+                            help='Mostra as obras de cada banco (padrão).')
+        parser.add_argument('--mover', nargs='+', metavar='OBRA',
+                            help='Obras levadas para o banco --para.')
+        parser.add_argument('--dividir', metavar='BANCO',
+                            help='Leva cerca de metade dos colaboradores deste banco para o banco --para.')
+        parser.add_argument('--para', metavar='BANCO',
+                            help='Banco de destino (um de COLABORADORES_SHARDS).')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Colaboradores copiados por transação (padrão: 1000).')
+        parser.add_argument('--espera', type=float, default=shards.MAPA_TTL + 1,
+                            help='Segundos de espera para os outros processos verem a troca de banco.')
+        parser.add_argument('--simular', action='store_true',
+                            help='Apenas mostra o que seria movido.')
+
+    def handle(self, *args, **options):
+        if not shards.configurados():
+            raise CommandError('Nenhum banco de obras configurado (COLABORADORES_SHARDS).')
+        if options['dividir']:
+            if options['dividir'] not in shards.bancos():
+                raise CommandError(f'Banco desconhecido: "{options["dividir"]}".')
+            obras = shards.plano_divisao(options['dividir'])
+        elif options['mover']:
+            obras = options['mover']
+        else:
+            self.listar()
+            return
+
+        destino = options['para']
+        if destino not in shards.configurados():
+            raise CommandError('Informe em --para um dos bancos de COLABORADORES_SHARDS.')
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+
+        for obra in obras:
+            origem = shards.banco_da_obra(obra)
+            if options['simular']:
+                self.stdout.write(f'{obra}: {origem} -> {destino}')
+                continue
+            try:
+                movidos = shards.mover_obra(
+                    obra, destino, lote=options['lote'], espera=options['espera'],
+                    progresso=lambda total: self.stdout.write(f'  {total} copiado(s)...'),
+                )
+            except ValueError as erro:
+                raise CommandError(str(erro))
+            self.stdout.write(self.style.SUCCESS(f'{obra}: {movidos} colaborador(es) de {origem} para {destino}.'))
+
+    def listar(self):
+        obras = shards.mapa()
+        for banco in shards.bancos():
+            por_obra = shards.contar_por_obra(banco)
+            self.stdout.write(f'{banco}: {sum(por_obra.values())} colaborador(es)')
+            for obra, total in sorted(por_obra.items()):
+                # Uma linha fora do banco da obra indica uma mudança interrompida.
+                aviso = '' if shards.banco_da_obra(obra) == banco else '  (fora do banco da obra)'
+                self.stdout.write(f'  {obra or "(sem obra)"}: {total}{aviso}')
+        sem_banco = set(obras.values()) - set(shards.bancos())
+        if sem_banco:
+            self.stderr.write(f'Bancos do mapa fora de COLABORADORES_SHARDS: {", ".join(sorted(sem_banco))}')
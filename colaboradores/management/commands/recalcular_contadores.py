@@ -0,0 +1,41 @@
+# Comando: python manage.py recalcular_contadores [--apenas-verificar]
+# ==================================================================
+# Confere a tabela de resumo 'ContadorStatus' (usada nos cards do dashboard)
+# contra a contagem real de colaboradores e, se necessário, a reconstrói.
+#   - Sem opções: reconstrói os contadores e depois verifica o resultado.
+#   - --apenas-verificar: só compara; termina com erro se houver divergência
+#     (útil em rotinas de monitoramento/CI).
+# Com as obras em bancos separados (shards.py), cada banco tem os seus contadores:
+# todos são conferidos, e as linhas da saída levam o nome do banco.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from colaboradores import contadores, shards
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói e verifica os contadores de status dos colaboradores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apenas-verificar', action='store_true',
+            help='Apenas compara os contadores com a contagem real, sem alterar nada.',
+        )
+
+    def handle(self, *args, **options):
+        bancos = shards.bancos()
+        total_divergentes = 0
+        for banco in bancos:
+            prefixo = f'[{banco}] ' if len(bancos) > 1 else ''
+            if not options['apenas_verificar']:
+                reais = contadores.recalcular(banco)
+                for status, total in sorted(reais.items()):
+                    self.stdout.write(f'{prefixo}{status}: {total}')
+
+            divergentes = contadores.divergencias(banco)
+            for status, (guardado, real) in sorted(divergentes.items()):
+                self.stderr.write(f'{prefixo}{status}: contador={guardado} real={real}')
+            total_divergentes += len(divergentes)
+        if total_divergentes:
+            raise CommandError(f'{total_divergentes} contador(es) divergente(s).')
+        self.stdout.write(self.style.SUCCESS('Contadores conferem com a contagem real.'))
@@ -0,0 +1,33 @@
+# Comando: python manage.py recalcular_saldos_epi [--apenas-verificar]
+# ===================================================================
+# Confere a tabela 'SaldoEpi' (EPIs pendentes de cada colaborador, mostrados na lista)
+# contra a soma do livro-registro de empréstimos e devoluções e, se necessário, a
+# reconstrói — como o 'recalcular_contadores' faz com os cards do dashboard.
+#   - Sem opções: reconstrói os saldos e depois verifica o resultado.
+#   - --apenas-verificar: só compara; termina com erro se houver divergência.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from colaboradores import epis
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói e verifica os saldos de EPIs pendentes por colaborador.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apenas-verificar', action='store_true',
+            help='Apenas compara os saldos com o livro-registro, sem alterar nada.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['apenas_verificar']:
+            total = epis.recalcular()
+            self.stdout.write(f'{total} saldo(s) reconstruído(s).')
+
+        divergentes = epis.divergencias()
+        if divergentes:
+            for colaborador_id, (guardado, real) in sorted(divergentes.items())[:20]:
+                self.stderr.write(f'Colaborador {colaborador_id}: saldo={guardado} real={real}')
+            raise CommandError(f'{len(divergentes)} saldo(s) divergente(s).')
+        self.stdout.write(self.style.SUCCESS('Saldos conferem com o livro-registro.'))
@@ -0,0 +1,211 @@
+# Métricas de Desempenho por Requisição
+# =====================================
+# Guarda, para cada rota (nome da URL: 'index', 'cadastro', 'colaborador_editar'...),
+# histogramas de:
+#   - duração total da requisição (segundos);
+#   - tempo gasto no banco de dados (segundos);
+#   - quantidade de consultas SQL;
+#   - tempo de renderização dos templates (segundos).
+# Os valores ficam na memória do processo (cada worker tem os seus) e são expostos
+# no formato de texto do Prometheus pela view 'metricas' (rota /metrics).
+#
+# Como os números são coletados:
+#   - O middleware (middleware.py) abre uma 'Medicao' no início da requisição e a
+#     guarda em uma ContextVar — que acompanha a requisição inclusive nas views
+#     assíncronas (o 'sync_to_async' copia o contexto para a thread do banco).
+#   - Toda conexão com o banco recebe o 'medir_consulta' como execute_wrapper
+#     (ver signals.py), que soma o tempo e a quantidade de cada consulta.
+#   - O backend de templates 'TemplatesComMedicao' (settings.TEMPLATES) cronometra
+#     cada renderização.
+#   - As consultas feitas em threads de um pool (ex: os bancos das obras consultados
+#     ao mesmo tempo, shards.em_paralelo) não herdam a ContextVar: cada uma é medida
+#     em uma Medicao própria, somada à da requisição com 'somar'.
+# Fora de uma requisição (shell, comandos), não há Medicao ativa e nada é registrado.
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# Limites (em segundos) dos baldes dos histogramas de tempo e de consultas SQL.
+BALDES_TEMPO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BALDES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Máximo de comandos SQL guardados por requisição para o log de requisições lentas.
+LIMITE_SQL_GUARDADO = 50
+
+# (nome da métrica, descrição, baldes)
+METRICAS = {
+    'duracao': ('colaboradores_requisicao_duracao_segundos', 'Duração total da requisição.', BALDES_TEMPO),
+    'banco': ('colaboradores_requisicao_banco_segundos', 'Tempo gasto em consultas SQL.', BALDES_TEMPO),
+    'consultas': ('colaboradores_requisicao_consultas', 'Quantidade de consultas SQL.', BALDES_CONSULTAS),
+    'template': ('colaboradores_requisicao_template_segundos', 'Tempo de renderização de templates.', BALDES_TEMPO),
+}
+
+
+class Histograma:
+    # Histograma de baldes fixos, como o do Prometheus: cada observação incrementa
+    # um único contador (o do primeiro balde cujo limite é >= ao valor). O formato
+    # acumulado ('le') é calculado só na hora de exportar, então registrar custa O(log n).
+
+    def __init__(self, baldes):
+        self.baldes = baldes
+        self.contagens = [0] * (len(baldes) + 1)  # o último é o balde '+Inf'
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.baldes, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Medicao:
+    # Acumula os números de UMA requisição.
+    __slots__ = ('banco', 'consultas', 'template', 'sql')
+
+    def __init__(self, guardar_sql=False):
+        self.banco = 0.0
+        self.consultas = 0
+        self.template = 0.0
+        # Lista de (duração, sql) — só quando o log de requisições lentas está ligado.
+        self.sql = [] if guardar_sql else None
+
+
+_medicao_atual = ContextVar('colaboradores_medicao', default=None)
+
+# Histogramas por (métrica, rota). A trava protege o dicionário e as contagens,
+# pois várias threads do servidor registram ao mesmo tempo.
+_histogramas = {}
+_trava = threading.Lock()
+
+
+def iniciar(guardar_sql=False):
+    # Abre a medição da requisição atual. Retorna (medicao, token); o token
+    # é usado em 'encerrar' para restaurar o contexto anterior.
+    medicao = Medicao(guardar_sql)
+    return medicao, _medicao_atual.set(medicao)
+
+
+def encerrar(token):
+    _medicao_atual.reset(token)
+
+
+def atual():
+    # A medição da requisição atual (None fora de uma requisição).
+    return _medicao_atual.get()
+
+
+def somar(medicao, parcial):
+    # Soma na 'medicao' os números de uma 'parcial' medida em outra thread. O tempo
+    # de banco é a soma dos tempos de cada consulta, mesmo as que rodaram ao mesmo tempo.
+    medicao.banco += parcial.banco
+    medicao.consultas += parcial.consultas
+    medicao.template += parcial.template
+    if medicao.sql is not None and parcial.sql:
+        medicao.sql.extend(parcial.sql[:LIMITE_SQL_GUARDADO - len(medicao.sql)])
+
+
+def medir_consulta(execute, sql, params, many, context):
+    # 'execute_wrapper' do Django: envolve a execução de cada consulta SQL.
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracao = time.perf_counter() - inicio
+        medicao.banco += duracao
+        medicao.consultas += 1
+        if medicao.sql is not None and len(medicao.sql) < LIMITE_SQL_GUARDADO:
+            medicao.sql.append((duracao, sql))
+
+
+def registrar(rota, duracao, medicao):
+    # Registra os números de uma requisição encerrada nos histogramas da rota.
+    valores = {
+        'duracao': duracao,
+        'banco': medicao.banco,
+        'consultas': medicao.consultas,
+        'template': medicao.template,
+    }
+    with _trava:
+        for metrica, valor in valores.items():
+            histograma = _histogramas.get((metrica, rota))
+            if histograma is None:
+                histograma = _histogramas[(metrica, rota)] = Histograma(METRICAS[metrica][2])
+            histograma.observar(valor)
+
+
+def somas(rota):
+    # {métrica: soma} das requisições registradas para a rota (ex: para medir uma
+    # única requisição, chame 'limpar' antes dela).
+    with _trava:
+        return {metrica: h.soma for (metrica, r), h in _histogramas.items() if r == rota}
+
+
+def limpar():
+    # Zera todas as métricas (usado nos testes).
+    with _trava:
+        _histogramas.clear()
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar():
+    # Gera o texto no formato de exposição do Prometheus (text/plain; version=0.0.4).
+    with _trava:
+        copia = {
+            chave: (h.baldes, list(h.contagens), h.soma, h.total)
+            for chave, h in _histogramas.items()
+        }
+
+    linhas = []
+    for metrica, (nome, descricao, _) in METRICAS.items():
+        rotas = sorted(rota for (m, rota) in copia if m == metrica)
+        if not rotas:
+            continue
+        linhas.append(f'# HELP {nome} {descricao}')
+        linhas.append(f'# TYPE {nome} histogram')
+        for rota in rotas:
+            baldes, contagens, soma, total = copia[(metrica, rota)]
+            acumulado = 0
+            for limite, contagem in zip(baldes, contagens):
+                acumulado += contagem
+                linhas.append(f'{nome}_bucket{{rota="{rota}",le="{_numero(limite)}"}} {acumulado}')
+            linhas.append(f'{nome}_bucket{{rota="{rota}",le="+Inf"}} {total}')
+            linhas.append(f'{nome}_sum{{rota="{rota}"}} {_numero(soma)}')
+            linhas.append(f'{nome}_count{{rota="{rota}"}} {total}')
+    return '\n'.join(linhas) + '\n'
+
+
+class TemplateMedido(Template):
+    # Template do Django que soma o tempo de renderização na medição atual.
+    # Só a renderização "de fora" passa por aqui; {% include %} e {% extends %}
+    # ficam dentro dela, então o tempo não é contado duas vezes.
+
+    def render(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicao.template += time.perf_counter() - inicio
+
+
+class TemplatesComMedicao(DjangoTemplates):
+    # Backend de templates igual ao padrão do Django, mas que devolve TemplateMedido.
+    # Configurado em settings.TEMPLATES["BACKEND"].
+
+    def from_string(self, template_code):
+        return TemplateMedido(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TemplateMedido(super().get_template(template_name).template, self)
@@ -0,0 +1,114 @@
+# Middlewares do App Colaboradores
+# ================================
+# - MetricasMiddleware: métricas de desempenho por rota (abaixo).
+# - AuditoriaMiddleware: guarda a requisição atual para a auditoria (no final do arquivo).
+#
+# Middleware de Métricas de Desempenho
+# ------------------------------------
+# Mede cada requisição (duração total, tempo de banco, quantidade de consultas SQL
+# e tempo de template) e registra os números por rota em metricas.py.
+# Deve ser o PRIMEIRO item de settings.MIDDLEWARE, para que a duração inclua os
+# outros middlewares (em produção, só o EstaticosMiddleware de setup/estaticos.py
+# vem antes, para que os arquivos estáticos não entrem nas métricas).
+#
+# Log de requisições lentas (opcional): com settings.COLABORADORES_LENTO_MS definido,
+# as requisições que passarem desse tempo são registradas no logger
+# 'colaboradores.lentas', junto com os comandos SQL executados (os mais demorados
+# primeiro). Sem a configuração, o SQL nem é guardado.
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+
+from . import auditoria, metricas
+
+logger = logging.getLogger('colaboradores.lentas')
+
+# Quantos comandos SQL aparecem no log de uma requisição lenta.
+SQL_NO_LOG = 10
+
+
+class MetricasMiddleware:
+    # Funciona tanto com o servidor WSGI (síncrono) quanto com o ASGI (assíncrono).
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        limite_ms = getattr(settings, 'COLABORADORES_LENTO_MS', None)
+        medicao, token = metricas.iniciar(guardar_sql=limite_ms is not None)
+        inicio = time.perf_counter()
+        try:
+            resposta = self.get_response(request)
+        finally:
+            metricas.encerrar(token)
+        self.finalizar(request, time.perf_counter() - inicio, medicao, limite_ms)
+        return resposta
+
+    async def __acall__(self, request):
+        limite_ms = getattr(settings, 'COLABORADORES_LENTO_MS', None)
+        medicao, token = metricas.iniciar(guardar_sql=limite_ms is not None)
+        inicio = time.perf_counter()
+        try:
+            resposta = await self.get_response(request)
+        finally:
+            metricas.encerrar(token)
+        self.finalizar(request, time.perf_counter() - inicio, medicao, limite_ms)
+        return resposta
+
+    def finalizar(self, request, duracao, medicao, limite_ms):
+        # O nome da rota só é conhecido depois que a URL foi resolvida.
+        # URLs inexistentes (404) ou sem nome ficam agrupadas em 'desconhecida'.
+        correspondencia = getattr(request, 'resolver_match', None)
+        rota = (correspondencia and correspondencia.url_name) or 'desconhecida'
+        metricas.registrar(rota, duracao, medicao)
+
+        if limite_ms is not None and duracao * 1000 >= limite_ms:
+            mais_lentos = sorted(medicao.sql, key=lambda item: item[0], reverse=True)[:SQL_NO_LOG]
+            logger.warning(
+                'Requisição lenta: %s %s (rota=%s) %.1fms; banco %.1fms em %d consulta(s); template %.1fms\n%s',
+                request.method, request.get_full_path(), rota, duracao * 1000,
+                medicao.banco * 1000, medicao.consultas, medicao.template * 1000,
+                '\n'.join(f'  {tempo * 1000:.2f}ms  {sql}' for tempo, sql in mais_lentos),
+            )
+
+
+class AuditoriaMiddleware:
+    # Guarda a requisição atual para que a auditoria (auditoria.py) saiba QUEM fez
+    # cada alteração (usuário logado e IP). O usuário só é consultado quando um evento
+    # de auditoria é criado, então as requisições de leitura não pagam nada a mais.
+    # Deve ficar DEPOIS do AuthenticationMiddleware em settings.MIDDLEWARE.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        token = auditoria.guardar_requisicao(request)
+        try:
+            return self.get_response(request)
+        finally:
+            auditoria.esquecer_requisicao(token)
+
+    async def __acall__(self, request):
+        token = auditoria.guardar_requisicao(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            auditoria.esquecer_requisicao(token)
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+TABELA = "colaboradores_colaborador"
+BUSCA = "colaboradores_colaborador_busca"
+
+CRIAR_SQL = [
+    # Tabela virtual FTS5 de "conteúdo externo": o texto fica apenas na tabela
+    # principal e o FTS5 guarda só o índice invertido.
+    f"""
+    CREATE VIRTUAL TABLE {BUSCA} USING fts5(
+        nome_completo, cpf, funcao,
+        content='{TABELA}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {BUSCA}_ai AFTER INSERT ON {TABELA} BEGIN
+        INSERT INTO {BUSCA}(rowid, nome_completo, cpf, funcao)
+        VALUES (new.id, new.nome_completo, new.cpf, new.funcao);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {BUSCA}_ad AFTER DELETE ON {TABELA} BEGIN
+        INSERT INTO {BUSCA}({BUSCA}, rowid, nome_completo, cpf, funcao)
+        VALUES ('delete', old.id, old.nome_completo, old.cpf, old.funcao);
+    END
+    """,
+    # Só reindexa quando um campo pesquisável muda (mudar o status não mexe no índice).
+    f"""
+    CREATE TRIGGER {BUSCA}_au AFTER UPDATE OF nome_completo, cpf, funcao ON {TABELA} BEGIN
+        INSERT INTO {BUSCA}({BUSCA}, rowid, nome_completo, cpf, funcao)
+        VALUES ('delete', old.id, old.nome_completo, old.cpf, old.funcao);
+        INSERT INTO {BUSCA}(rowid, nome_completo, cpf, funcao)
+        VALUES (new.id, new.nome_completo, new.cpf, new.funcao);
+    END
+    """,
+    # Indexa os colaboradores que já existiam antes desta migração.
+    f"INSERT INTO {BUSCA}({BUSCA}) VALUES ('rebuild')",
+]
+
+REMOVER_SQL = [
+    f"DROP TRIGGER IF EXISTS {BUSCA}_ai",
+    f"DROP TRIGGER IF EXISTS {BUSCA}_ad",
+    f"DROP TRIGGER IF EXISTS {BUSCA}_au",
+    f"DROP TABLE IF EXISTS {BUSCA}",
+]
+
+
+def executar(comandos):
+    # O FTS5 só existe no SQLite; em outros bancos a busca usa o fallback '__icontains'.
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(CRIAR_SQL), executar(REMOVER_SQL)),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:32
+
+from django.db import migrations, models
+
+TABELA = "colaboradores_colaborador"
+CONTADOR = "colaboradores_contadorstatus"
+
+CRIAR_SQL = [
+    # Cada gatilho roda dentro da mesma transação da escrita em Colaborador,
+    # então os contadores nunca ficam "no meio do caminho".
+    f"""
+    CREATE TRIGGER {CONTADOR}_ai AFTER INSERT ON {TABELA} BEGIN
+        INSERT INTO {CONTADOR}(status, total) VALUES (new.status, 1)
+        ON CONFLICT(status) DO UPDATE SET total = total + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {CONTADOR}_ad AFTER DELETE ON {TABELA} BEGIN
+        UPDATE {CONTADOR} SET total = total - 1 WHERE status = old.status;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {CONTADOR}_au AFTER UPDATE OF status ON {TABELA}
+    WHEN old.status IS NOT new.status BEGIN
+        UPDATE {CONTADOR} SET total = total - 1 WHERE status = old.status;
+        INSERT INTO {CONTADOR}(status, total) VALUES (new.status, 1)
+        ON CONFLICT(status) DO UPDATE SET total = total + 1;
+    END
+    """,
+    # Preenche os contadores com os colaboradores que já existiam.
+    f"""
+    INSERT INTO {CONTADOR}(status, total)
+    SELECT status, COUNT(*) FROM {TABELA} GROUP BY status
+    """,
+]
+
+REMOVER_SQL = [
+    f"DROP TRIGGER IF EXISTS {CONTADOR}_ai",
+    f"DROP TRIGGER IF EXISTS {CONTADOR}_ad",
+    f"DROP TRIGGER IF EXISTS {CONTADOR}_au",
+]
+
+
+def executar(comandos):
+    # Os gatilhos só são criados no SQLite; nos outros bancos o dashboard usa
+    # uma agregação condicional (ver contadores.py).
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0002_busca_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContadorStatus",
+            fields=[
+                ("status", models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ("total", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(executar(CRIAR_SQL), executar(REMOVER_SQL)),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:34
+
+from django.db import migrations, models
+
+TABELA = "colaboradores_colaborador"
+VERSAO = "colaboradores_versaotabela"
+
+# Mesmo formato de data/hora que o Django usa para DateTimeField no SQLite (UTC).
+AGORA = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+INCREMENTAR = (
+    f"UPDATE {VERSAO} SET versao = versao + 1, atualizado_em = {AGORA} "
+    f"WHERE nome = 'colaborador';"
+)
+
+CRIAR_SQL = [
+    f"INSERT INTO {VERSAO}(nome, versao, atualizado_em) VALUES ('colaborador', 0, {AGORA})",
+    f"CREATE TRIGGER {VERSAO}_ai AFTER INSERT ON {TABELA} BEGIN {INCREMENTAR} END",
+    f"CREATE TRIGGER {VERSAO}_au AFTER UPDATE ON {TABELA} BEGIN {INCREMENTAR} END",
+    f"CREATE TRIGGER {VERSAO}_ad AFTER DELETE ON {TABELA} BEGIN {INCREMENTAR} END",
+]
+
+REMOVER_SQL = [
+    f"DROP TRIGGER IF EXISTS {VERSAO}_ai",
+    f"DROP TRIGGER IF EXISTS {VERSAO}_au",
+    f"DROP TRIGGER IF EXISTS {VERSAO}_ad",
+]
+
+
+def executar(comandos):
+    # Os gatilhos só são criados no SQLite; nos outros bancos a API calcula a
+    # versão com uma agregação (ver versao.py).
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0003_contador_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersaoTabela",
+            fields=[
+                ("nome", models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ("versao", models.BigIntegerField(default=0)),
+                ("atualizado_em", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(executar(CRIAR_SQL), executar(REMOVER_SQL)),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0004_versao_tabela"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="colaborador",
+            index=models.Index(
+                fields=["data_cadastro", "id"], name="colab_data_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="colaborador",
+            index=models.Index(
+                fields=["status", "data_cadastro"], name="colab_status_data_idx"
+            ),
+        ),
+    ]
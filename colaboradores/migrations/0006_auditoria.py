@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0005_indices_colaborador"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventoAuditoria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("colaborador_id", models.BigIntegerField()),
+                (
+                    "acao",
+                    models.CharField(
+                        choices=[
+                            ("criado", "Criado"),
+                            ("alterado", "Alterado"),
+                            ("excluido", "Excluído"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("alteracoes", models.JSONField(default=dict)),
+                ("usuario", models.CharField(blank=True, max_length=150)),
+                ("ip", models.GenericIPAddressField(blank=True, null=True)),
+                ("momento", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["colaborador_id", "momento"],
+                        name="auditoria_colab_momento_idx",
+                    )
+                ],
+            },
+        ),
+    ]
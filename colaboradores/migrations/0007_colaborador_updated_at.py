@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18
+
+from django.db import migrations, models
+from django.utils import timezone
+
+TABELA = "colaboradores_colaborador"
+
+# [IMPORTANTE] Um AddField comum de um campo NOT NULL faz o Django RECRIAR a tabela
+# no SQLite (cria uma cópia, copia as linhas e apaga a original), e isso apaga os
+# gatilhos das migrações 0002 (busca), 0003 (contadores) e 0004 (versão).
+# Por isso a coluna é criada com 'ALTER TABLE ... ADD COLUMN' (permitido no SQLite
+# para NOT NULL com um valor padrão constante), que mantém a tabela e os gatilhos.
+# Para o Django (estado dos modelos), é um AddField normal.
+ADICIONAR_SQL = [
+    f"ALTER TABLE {TABELA} ADD COLUMN updated_at datetime NOT NULL DEFAULT '1970-01-01 00:00:00'",
+    # Os colaboradores já existentes começam com 'atualizado em' = data de cadastro.
+    f"UPDATE {TABELA} SET updated_at = data_cadastro",
+]
+
+REMOVER_SQL = [
+    f"ALTER TABLE {TABELA} DROP COLUMN updated_at",
+]
+
+
+def campo_updated_at():
+    campo = models.DateTimeField(default=timezone.now)
+    campo.set_attributes_from_name("updated_at")
+    return campo
+
+
+def adicionar_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in ADICIONAR_SQL:
+            schema_editor.execute(sql)
+        return
+    # Nos outros bancos, o AddField comum não recria a tabela.
+    schema_editor.add_field(apps.get_model("colaboradores", "Colaborador"), campo_updated_at())
+    schema_editor.execute(ADICIONAR_SQL[1])
+
+
+def remover_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in REMOVER_SQL:
+            schema_editor.execute(sql)
+        return
+    schema_editor.remove_field(apps.get_model("colaboradores", "Colaborador"), campo_updated_at())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0006_auditoria"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="colaborador",
+                    name="updated_at",
+                    field=models.DateTimeField(auto_now=True),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(adicionar_coluna, remover_coluna),
+            ],
+        ),
+    ]
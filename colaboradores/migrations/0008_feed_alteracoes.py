@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+TABELA = "colaboradores_colaborador"
+FEED = "colaboradores_alteracao"
+
+# Mesmo formato de data/hora que o Django usa para DateTimeField no SQLite (UTC).
+AGORA = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+# A cada alteração, o colaborador ganha uma linha NOVA no feed, que recebe um id MAIOR
+# (AUTOINCREMENT nunca reaproveita números), e a linha anterior dele é apagada.
+# [NOTA] Não dá para usar 'INSERT OR REPLACE' aqui: quando o comando que dispara o
+# gatilho tem o seu próprio ON CONFLICT (o upsert do importar_colaboradores), o SQLite
+# usa o dele no lugar do REPLACE.
+# Como o SQLite aceita um único escritor por vez, os ids seguem a ordem dos COMMITs:
+# quem já leu até o cursor N nunca vai "perder" uma alteração com id menor que N.
+
+
+def substituir(colaborador, excluido):
+    # Comandos do gatilho: nova linha (mantendo o 'cursor_criacao' da anterior) e
+    # remoção das anteriores do mesmo colaborador.
+    return f"""
+        INSERT INTO {FEED}(colaborador_id, excluido, cursor_criacao, momento)
+            VALUES (
+                {colaborador}, {excluido},
+                (SELECT cursor_criacao FROM {FEED} WHERE colaborador_id = {colaborador}
+                 ORDER BY id DESC LIMIT 1),
+                {AGORA}
+            );
+        DELETE FROM {FEED} WHERE colaborador_id = {colaborador}
+            AND id < (SELECT MAX(id) FROM {FEED} WHERE colaborador_id = {colaborador});"""
+
+
+CRIAR_SQL = [
+    # Cadastro: a linha nova guarda o próprio id como 'cursor_criacao'.
+    f"""CREATE TRIGGER {FEED}_ai AFTER INSERT ON {TABELA} BEGIN {substituir('NEW.id', 0)}
+        UPDATE {FEED} SET cursor_criacao = id
+            WHERE colaborador_id = NEW.id AND cursor_criacao IS NULL;
+    END""",
+    # Edição: nova linha.
+    f"CREATE TRIGGER {FEED}_au AFTER UPDATE ON {TABELA} BEGIN {substituir('NEW.id', 0)} END",
+    # Exclusão: a nova linha é a lápide.
+    f"CREATE TRIGGER {FEED}_ad AFTER DELETE ON {TABELA} BEGIN {substituir('OLD.id', 1)} END",
+    # Colaboradores já cadastrados entram no feed na ordem da última alteração.
+    f"""INSERT INTO {FEED}(colaborador_id, excluido, cursor_criacao, momento)
+        SELECT id, 0, NULL, updated_at FROM {TABELA} ORDER BY updated_at, id""",
+    f"UPDATE {FEED} SET cursor_criacao = id",
+]
+
+REMOVER_SQL = [
+    f"DROP TRIGGER IF EXISTS {FEED}_ai",
+    f"DROP TRIGGER IF EXISTS {FEED}_au",
+    f"DROP TRIGGER IF EXISTS {FEED}_ad",
+]
+
+
+def executar(comandos):
+    # Os gatilhos só são criados no SQLite; nos outros bancos o feed é alimentado
+    # pelos sinais e pelas ações em massa (ver feed.py).
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0007_colaborador_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Alteracao",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("colaborador_id", models.BigIntegerField(db_index=True)),
+                ("excluido", models.BooleanField(default=False)),
+                ("cursor_criacao", models.BigIntegerField(blank=True, null=True)),
+                ("momento", models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(executar(CRIAR_SQL), executar(REMOVER_SQL)),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+TABELA = "colaboradores_colaborador"
+ARQUIVO = "colaboradores_colaboradorarquivado"
+BUSCA = "colaboradores_colaboradorarquivado_busca"
+
+# O CPF precisa ser único nas duas tabelas. O UNIQUE de cada tabela cuida dela mesma;
+# estes gatilhos recusam, na tabela principal, um CPF que já está no arquivo (a mesma
+# mensagem do UNIQUE, para que o Django levante o mesmo IntegrityError).
+# O arquivo só recebe colaboradores vindos da tabela principal (arquivo.py), cujo CPF
+# já é único lá.
+RECUSAR_CPF_ARQUIVADO = (
+    f"SELECT RAISE(ABORT, 'UNIQUE constraint failed: {TABELA}.cpf') "
+    f"WHERE EXISTS (SELECT 1 FROM {ARQUIVO} WHERE cpf = NEW.cpf);"
+)
+
+CRIAR_SQL = [
+    f"CREATE TRIGGER {TABELA}_cpf_bi BEFORE INSERT ON {TABELA} BEGIN {RECUSAR_CPF_ARQUIVADO} END",
+    f"CREATE TRIGGER {TABELA}_cpf_bu BEFORE UPDATE OF cpf ON {TABELA} BEGIN {RECUSAR_CPF_ARQUIVADO} END",
+    # Pesquisa no arquivo: o mesmo índice FTS5 da tabela principal (migração 0002).
+    f"""
+    CREATE VIRTUAL TABLE {BUSCA} USING fts5(
+        nome_completo, cpf, funcao,
+        content='{ARQUIVO}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {BUSCA}_ai AFTER INSERT ON {ARQUIVO} BEGIN
+        INSERT INTO {BUSCA}(rowid, nome_completo, cpf, funcao)
+        VALUES (new.id, new.nome_completo, new.cpf, new.funcao);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {BUSCA}_ad AFTER DELETE ON {ARQUIVO} BEGIN
+        INSERT INTO {BUSCA}({BUSCA}, rowid, nome_completo, cpf, funcao)
+        VALUES ('delete', old.id, old.nome_completo, old.cpf, old.funcao);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {BUSCA}_au AFTER UPDATE OF nome_completo, cpf, funcao ON {ARQUIVO} BEGIN
+        INSERT INTO {BUSCA}({BUSCA}, rowid, nome_completo, cpf, funcao)
+        VALUES ('delete', old.id, old.nome_completo, old.cpf, old.funcao);
+        INSERT INTO {BUSCA}(rowid, nome_completo, cpf, funcao)
+        VALUES (new.id, new.nome_completo, new.cpf, new.funcao);
+    END
+    """,
+]
+
+REMOVER_SQL = [
+    f"DROP TRIGGER IF EXISTS {TABELA}_cpf_bi",
+    f"DROP TRIGGER IF EXISTS {TABELA}_cpf_bu",
+    f"DROP TRIGGER IF EXISTS {BUSCA}_ai",
+    f"DROP TRIGGER IF EXISTS {BUSCA}_ad",
+    f"DROP TRIGGER IF EXISTS {BUSCA}_au",
+    f"DROP TABLE IF EXISTS {BUSCA}",
+]
+
+
+def executar(comandos):
+    # Gatilhos e FTS5 só no SQLite; nos outros bancos, arquivo.conferir_cpf (chamado
+    # pelo 'pre_save', ver signals.py) confere o CPF e a pesquisa no arquivo usa '__icontains'.
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0008_feed_alteracoes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ColaboradorArquivado",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("nome_completo", models.CharField(max_length=150)),
+                ("cpf", models.CharField(max_length=11, unique=True)),
+                ("funcao", models.CharField(max_length=50)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("Ativo", "Ativo"), ("Inativo", "Inativo")],
+                        max_length=10,
+                    ),
+                ),
+                ("data_cadastro", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("arquivado_em", models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(executar(CRIAR_SQL), executar(REMOVER_SQL)),
+    ]
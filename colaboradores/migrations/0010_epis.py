@@ -0,0 +1,151 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+MOVIMENTACAO = "colaboradores_movimentacaoepi"
+SALDO = "colaboradores_saldoepi"
+
+
+def delta(linha):
+    # Quanto a movimentação muda o saldo: + no empréstimo, - na devolução.
+    return f"(CASE {linha}.tipo WHEN 'emprestimo' THEN {linha}.quantidade ELSE -{linha}.quantidade END)"
+
+
+def somar(linha):
+    return f"""
+        INSERT INTO {SALDO}(colaborador_id, pendentes) VALUES ({linha}.colaborador_id, {delta(linha)})
+        ON CONFLICT(colaborador_id) DO UPDATE SET pendentes = pendentes + excluded.pendentes;
+    """
+
+
+def subtrair(linha):
+    return f"""
+        UPDATE {SALDO} SET pendentes = pendentes - {delta(linha)}
+        WHERE colaborador_id = {linha}.colaborador_id;
+    """
+
+
+CRIAR_SQL = [
+    # Como em 'ContadorStatus' (migração 0003): o saldo muda na mesma transação da
+    # movimentação, inclusive nas gravações em massa (bulk_create).
+    f"CREATE TRIGGER {SALDO}_ai AFTER INSERT ON {MOVIMENTACAO} BEGIN {somar('new')} END",
+    f"CREATE TRIGGER {SALDO}_ad AFTER DELETE ON {MOVIMENTACAO} BEGIN {subtrair('old')} END",
+    f"""
+    CREATE TRIGGER {SALDO}_au AFTER UPDATE OF colaborador_id, tipo, quantidade ON {MOVIMENTACAO}
+    BEGIN {subtrair('old')} {somar('new')} END
+    """,
+]
+
+REMOVER_SQL = [
+    f"DROP TRIGGER IF EXISTS {SALDO}_ai",
+    f"DROP TRIGGER IF EXISTS {SALDO}_ad",
+    f"DROP TRIGGER IF EXISTS {SALDO}_au",
+]
+
+
+def executar(comandos):
+    # Os gatilhos só são criados no SQLite; nos outros bancos, epis.py atualiza o
+    # saldo junto com cada movimentação.
+    def operacao(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0009_arquivo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Epi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nome", models.CharField(max_length=100)),
+                ("ca", models.CharField(blank=True, max_length=20)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SaldoEpi",
+            fields=[
+                (
+                    "colaborador",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="saldo_epi",
+                        serialize=False,
+                        to="colaboradores.colaborador",
+                    ),
+                ),
+                ("pendentes", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MovimentacaoEpi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("emprestimo", "Empréstimo"),
+                            ("devolucao", "Devolução"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("quantidade", models.PositiveIntegerField(default=1)),
+                ("momento", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "colaborador",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="movimentacoes_epi",
+                        to="colaboradores.colaborador",
+                    ),
+                ),
+                (
+                    "epi",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="movimentacoes",
+                        to="colaboradores.epi",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["colaborador", "epi"], name="mov_epi_colab_epi_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(executar(CRIAR_SQL), executar(REMOVER_SQL)),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:34
+
+from django.db import migrations, models
+
+TABELA = "colaboradores_colaborador"
+
+# Como na migração 0007: a coluna é criada com 'ALTER TABLE ... ADD COLUMN' para o
+# SQLite não recriar a tabela (o que apagaria os gatilhos de busca, contadores,
+# versão, feed e CPF). Para o Django (estado dos modelos), é um AddField normal.
+ADICIONAR_SQL = [
+    f"ALTER TABLE {TABELA} ADD COLUMN obra varchar(80) NOT NULL DEFAULT ''",
+]
+
+REMOVER_SQL = [
+    f"ALTER TABLE {TABELA} DROP COLUMN obra",
+]
+
+
+def campo_obra():
+    campo = models.CharField(blank=True, default="", max_length=80)
+    campo.set_attributes_from_name("obra")
+    return campo
+
+
+def adicionar_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in ADICIONAR_SQL:
+            schema_editor.execute(sql)
+        return
+    schema_editor.add_field(
+        apps.get_model("colaboradores", "Colaborador"), campo_obra()
+    )
+
+
+def remover_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in REMOVER_SQL:
+            schema_editor.execute(sql)
+        return
+    schema_editor.remove_field(
+        apps.get_model("colaboradores", "Colaborador"), campo_obra()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0010_epis"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ObraBanco",
+            fields=[
+                (
+                    "obra",
+                    models.CharField(max_length=80, primary_key=True, serialize=False),
+                ),
+                ("banco", models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="colaborador",
+                    name="obra",
+                    field=models.CharField(blank=True, default="", max_length=80),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(adicionar_coluna, remover_coluna),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="colaborador",
+            index=models.Index(
+                fields=["obra", "data_cadastro", "id"], name="colab_obra_data_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="colaborador",
+            index=models.Index(fields=["obra", "status"], name="colab_obra_status_idx"),
+        ),
+    ]
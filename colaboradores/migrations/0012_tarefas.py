@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0011_obras"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tarefa",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tipo", models.CharField(max_length=30)),
+                ("parametros", models.JSONField(default=dict)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("executando", "Executando"),
+                            ("concluida", "Concluída"),
+                            ("falhou", "Falhou"),
+                        ],
+                        default="pendente",
+                        max_length=12,
+                    ),
+                ),
+                ("processados", models.BigIntegerField(default=0)),
+                ("total", models.BigIntegerField(blank=True, null=True)),
+                ("checkpoint", models.JSONField(default=dict)),
+                ("arquivo", models.CharField(blank=True, max_length=255)),
+                ("erro", models.TextField(blank=True)),
+                ("tentativas", models.PositiveIntegerField(default=0)),
+                ("executor", models.CharField(blank=True, max_length=100)),
+                ("criada_em", models.DateTimeField(default=django.utils.timezone.now)),
+                ("iniciada_em", models.DateTimeField(blank=True, null=True)),
+                ("concluida_em", models.DateTimeField(blank=True, null=True)),
+                ("sinal_em", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["estado", "criada_em"], name="tarefa_estado_criada_idx"
+                    )
+                ],
+            },
+        ),
+    ]
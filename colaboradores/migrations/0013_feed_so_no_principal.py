@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:05
+
+from importlib import import_module
+
+from django.db import DEFAULT_DB_ALIAS, migrations
+
+# O feed de alterações fica só no banco principal (feed.py). Nos bancos das obras
+# (shards.py), os gatilhos da migração 0008 gravariam em uma tabela que ninguém lê:
+# lá eles são removidos, e as alterações são registradas no banco principal pelos
+# sinais e pelas ações em massa.
+FEED = import_module("colaboradores.migrations.0008_feed_alteracoes")
+
+REMOVER_SQL = [*FEED.REMOVER_SQL, f"DELETE FROM {FEED.FEED}"]
+# Só os gatilhos (sem a carga inicial da tabela, que a migração 0008 faz).
+CRIAR_SQL = [sql for sql in FEED.CRIAR_SQL if sql.startswith("CREATE TRIGGER")]
+
+
+def executar(comandos):
+    # Só nos bancos das obras, e só no SQLite (onde existem os gatilhos).
+    def operacao(apps, schema_editor):
+        conexao = schema_editor.connection
+        if conexao.vendor != "sqlite" or conexao.alias == DEFAULT_DB_ALIAS:
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0012_tarefas"),
+    ]
+
+    operations = [
+        migrations.RunPython(executar(REMOVER_SQL), executar(CRIAR_SQL)),
+    ]
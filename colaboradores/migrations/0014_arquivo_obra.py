@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+ARQUIVO = "colaboradores_colaboradorarquivado"
+
+# Como na migração 0011: a coluna é criada com 'ALTER TABLE ... ADD COLUMN' para o
+# SQLite não recriar a tabela (o que apagaria os gatilhos da pesquisa no arquivo).
+ADICIONAR_SQL = [
+    f"ALTER TABLE {ARQUIVO} ADD COLUMN obra varchar(80) NOT NULL DEFAULT ''",
+]
+
+REMOVER_SQL = [
+    f"ALTER TABLE {ARQUIVO} DROP COLUMN obra",
+]
+
+
+def campo_obra():
+    campo = models.CharField(blank=True, default="", max_length=80)
+    campo.set_attributes_from_name("obra")
+    return campo
+
+
+def adicionar_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in ADICIONAR_SQL:
+            schema_editor.execute(sql)
+        return
+    schema_editor.add_field(
+        apps.get_model("colaboradores", "ColaboradorArquivado"), campo_obra()
+    )
+
+
+def remover_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in REMOVER_SQL:
+            schema_editor.execute(sql)
+        return
+    schema_editor.remove_field(
+        apps.get_model("colaboradores", "ColaboradorArquivado"), campo_obra()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("colaboradores", "0013_feed_so_no_principal"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="colaboradorarquivado",
+                    name="obra",
+                    field=models.CharField(blank=True, default="", max_length=80),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(adicionar_coluna, remover_coluna),
+            ],
+        ),
+    ]
@@ -1,6 +1,8 @@
 # Importa o módulo 'models' do Django, que contém as classes e funções 
 # necessárias para definir modelos de banco de dados.
 from django.db import models
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
 
 # Define uma nova classe chamada 'Colaborador'.
 # Herdar de 'models.Model' transforma esta classe Python comum 
@@ -48,9 +50,294 @@ class Colaborador(models.Model):
     #     é CRIADO pela primeira vez. O campo não será atualizado depois.
     data_cadastro = models.DateTimeField(auto_now_add=True)
 
+    # 'updated_at' guarda o momento da última alteração do colaborador.
+    # 'auto_now=True' atualiza o valor automaticamente a cada .save().
+    # [ATENÇÃO] O .update() de QuerySet NÃO passa pelo .save(): quem o usa deve
+    # informar 'updated_at=timezone.now()' (ver acoes.py). O cache das linhas da
+    # tabela (fragmentos.py) depende desse valor para saber que a linha mudou.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # 'obra' é o canteiro onde o colaborador trabalha (vazio = sem obra definida).
+    # Com as obras em bancos separados (shards.py), ela decide em qual banco (arquivo
+    # SQLite) o colaborador fica gravado.
+    obra = models.CharField(max_length=80, blank=True, default='')
+
+    # [DESEMPENHO] A classe interna 'Meta' define opções do modelo; aqui, os índices.
+    # Cada índice corresponde a uma forma real de consultar a tabela:
+    #   - (data_cadastro, id): a lista do dashboard é ordenada do mais novo para o
+    #     mais antigo e paginada por cursor nesse par; com o índice, o banco lê as
+    #     linhas já na ordem certa, sem ordenar a tabela inteira.
+    #   - (status, data_cadastro): filtros por status em ordem de cadastro
+    #     (ex: listar/arquivar os inativos mais antigos).
+    #   - (obra, data_cadastro, id): a lista de uma obra, na mesma ordem do dashboard;
+    #   - (obra, status): os cards de uma obra, contados só pelo índice.
+    class Meta:
+        indexes = [
+            models.Index(fields=['data_cadastro', 'id'], name='colab_data_id_idx'),
+            models.Index(fields=['status', 'data_cadastro'], name='colab_status_data_idx'),
+            models.Index(fields=['obra', 'data_cadastro', 'id'], name='colab_obra_data_idx'),
+            models.Index(fields=['obra', 'status'], name='colab_obra_status_idx'),
+        ]
+
     # [BOA PRÁTICA] Define o método especial '__str__'.
     # Este método retorna uma representação em string "legível" do objeto Colaborador.
     # É o que o Django Admin (e outras partes do Django) usa para exibir o objeto.
     # Aqui, ele retorna o nome completo do colaborador.
     def __str__(self):
-        return self.nome_completo
\ No newline at end of file
+        return self.nome_completo
+
+    # [AUDITORIA] 'from_db' é chamado pelo Django ao montar um objeto lido do banco.
+    # Guardamos os valores originais para que a auditoria (auditoria.py) saiba o que
+    # mudou em um .save() — sem precisar de um SELECT extra antes de salvar.
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_carregados = dict(zip(field_names, values))
+        return instancia
+
+    # [EPIs] Quantidade de itens emprestados e ainda não devolvidos (ver SaldoEpi).
+    # A lista busca o saldo na MESMA consulta dos colaboradores, com
+    # .select_related('saldo_epi') (um LEFT JOIN); sem nenhum empréstimo, não existe
+    # a linha de saldo e o valor é 0.
+    @property
+    def epis_pendentes(self):
+        try:
+            return self.saldo_epi.pendentes
+        except ObjectDoesNotExist:
+            return 0
+
+# Define o modelo 'ContadorStatus', uma pequena tabela de resumo (contadores materializados).
+# Em vez de contar TODOS os colaboradores a cada acesso ao dashboard (COUNT(*) varre a
+# tabela inteira), guardamos aqui quantos colaboradores existem em cada status.
+# No SQLite, gatilhos (triggers) criados na migração 0003 atualizam estes números dentro
+# da MESMA transação de cada INSERT, UPDATE ou DELETE em 'Colaborador'.
+# O comando 'python manage.py recalcular_contadores' reconstrói e verifica os valores.
+class ContadorStatus(models.Model):
+    # O próprio status ('Ativo' / 'Inativo') é a chave primária: existe uma linha por status.
+    status = models.CharField(max_length=10, primary_key=True)
+    # Quantidade de colaboradores com este status.
+    total = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.status}: {self.total}'
+
+
+# Define o modelo 'VersaoTabela', um "contador de alterações" por tabela.
+# Cada INSERT, UPDATE ou DELETE em 'Colaborador' incrementa 'versao' e registra
+# o horário em 'atualizado_em' (gatilhos criados na migração 0004, no SQLite).
+# Com isso, a API consegue responder "nada mudou desde a última consulta"
+# (HTTP 304) lendo uma única linha, sem buscar nenhum colaborador.
+class VersaoTabela(models.Model):
+    # Nome lógico da tabela acompanhada (ex: 'colaborador').
+    nome = models.CharField(max_length=50, primary_key=True)
+    # Número que só cresce: muda a cada alteração na tabela.
+    versao = models.BigIntegerField(default=0)
+    # Momento da última alteração (usado no cabeçalho HTTP 'Last-Modified').
+    atualizado_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.nome} v{self.versao}'
+
+
+# Define o modelo 'EventoAuditoria': o histórico (somente inclusão) de quem mudou
+# qual colaborador, quando e o que mudou (valores antes/depois).
+# Os eventos são gravados em segundo plano, em lotes (ver auditoria.py), para não
+# atrasar o cadastro, a edição e a exclusão.
+class EventoAuditoria(models.Model):
+    ACOES = [
+        ('criado', 'Criado'),
+        ('alterado', 'Alterado'),
+        ('excluido', 'Excluído'),
+    ]
+
+    # [IMPORTANTE] Guarda só o número do colaborador, e não uma ForeignKey: o histórico
+    # precisa continuar existindo depois que o colaborador é excluído.
+    colaborador_id = models.BigIntegerField()
+    acao = models.CharField(max_length=10, choices=ACOES)
+    # Campos alterados no formato {"campo": [valor_antes, valor_depois]}.
+    alteracoes = models.JSONField(default=dict)
+    # Quem fez a alteração (usuário logado, ou 'anônimo') e de qual endereço IP.
+    usuario = models.CharField(max_length=150, blank=True)
+    ip = models.GenericIPAddressField(null=True, blank=True)
+    # Momento da alteração (e não da gravação do evento, que acontece depois).
+    momento = models.DateTimeField()
+
+    class Meta:
+        # O histórico de um colaborador é consultado por (colaborador_id, momento):
+        # o índice entrega os eventos já filtrados e em ordem.
+        indexes = [
+            models.Index(fields=['colaborador_id', 'momento'], name='auditoria_colab_momento_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.colaborador_id} {self.acao} em {self.momento:%d/%m/%Y %H:%M}'
+
+
+# Define o modelo 'Alteracao': o feed de alterações dos colaboradores, consultado por
+# sistemas externos (folha de pagamento, controle de acesso) para saber O QUE MUDOU
+# desde a última sincronização, sem baixar a lista inteira (ver feed.py).
+# Existe UMA linha por colaborador (a da última alteração dele): a cada cadastro ou
+# edição a linha é substituída por uma nova, com um 'id' maior; na exclusão ela vira
+# uma "lápide" (excluido=True), para que a exclusão também chegue aos sistemas.
+# No SQLite, quem mantém esta tabela são os gatilhos da migração 0008 — então
+# update() e exclusões em massa (acoes.py) também entram no feed.
+class Alteracao(models.Model):
+    # O 'id' (que só cresce) é o cursor do feed: "me dê as alterações depois do 42".
+    # [IMPORTANTE] Guarda só o número do colaborador, e não uma ForeignKey: a lápide
+    # precisa continuar existindo depois que o colaborador é excluído.
+    # Indexado: os gatilhos procuram a linha anterior do colaborador para substituí-la.
+    colaborador_id = models.BigIntegerField(db_index=True)
+    excluido = models.BooleanField(default=False)
+    # Cursor em que o colaborador foi cadastrado: permite dizer, para quem sincroniza
+    # a partir de um cursor, se ele é novo ('criado') ou já existia ('alterado').
+    cursor_criacao = models.BigIntegerField(null=True, blank=True)
+    momento = models.DateTimeField()
+
+    def __str__(self):
+        return f'#{self.id} colaborador {self.colaborador_id}{" (excluído)" if self.excluido else ""}'
+
+
+# Define o modelo 'ColaboradorArquivado': o ARQUIVO ("frio") dos colaboradores
+# inativos há muito tempo. O comando 'python manage.py arquivar_inativos' move esses
+# colaboradores para cá (ver arquivo.py), e a tabela principal ("quente") fica só com
+# quem ainda importa para o dia a dia — o dashboard, os contadores e a pesquisa
+# trabalham com menos linhas.
+#   - O 'id' é o MESMO que o colaborador tinha: o histórico da auditoria e o feed de
+#     alterações continuam apontando para ele.
+#   - O CPF continua único nas DUAS tabelas: no SQLite, gatilhos da migração 0009
+#     impedem cadastrar (ou editar para) um CPF que está no arquivo.
+#   - O arquivo fica no banco principal, também para os colaboradores que vêm dos
+#     bancos das obras (shards.py); a 'obra' diz para qual banco ele volta ao ser restaurado.
+class ColaboradorArquivado(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    nome_completo = models.CharField(max_length=150)
+    cpf = models.CharField(max_length=11, unique=True)
+    funcao = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=Colaborador.STATUS_CHOICES)
+    data_cadastro = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    obra = models.CharField(max_length=80, blank=True, default='')
+    # Momento em que o colaborador foi movido para o arquivo.
+    arquivado_em = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.nome_completo} (arquivado)'
+
+
+# Define o modelo 'Epi': o catálogo de Equipamentos de Proteção Individual
+# (capacete, luva, botina...) que podem ser emprestados aos colaboradores.
+class Epi(models.Model):
+    nome = models.CharField(max_length=100)
+    # Número do Certificado de Aprovação (CA) do equipamento, quando houver.
+    ca = models.CharField(max_length=20, blank=True)
+
+    def __str__(self):
+        return f'{self.nome} (CA {self.ca})' if self.ca else self.nome
+
+
+# Define o modelo 'MovimentacaoEpi': o livro-registro (somente inclusão) de cada
+# empréstimo e devolução de EPI. Nenhuma linha é alterada depois de gravada: o que um
+# colaborador tem em mãos é a soma dos empréstimos menos a soma das devoluções.
+# Para não somar milhões de linhas a cada exibição da lista, o total por colaborador
+# fica pronto em 'SaldoEpi' (ver epis.py).
+class MovimentacaoEpi(models.Model):
+    TIPOS = [
+        ('emprestimo', 'Empréstimo'),
+        ('devolucao', 'Devolução'),
+    ]
+
+    # [IMPORTANTE] ForeignKey SEM restrição no banco (db_constraint=False) e sem
+    # cascata (DO_NOTHING): o registro continua existindo depois que o colaborador é
+    # excluído ou movido para o arquivo (arquivo.py), e as ações em massa (acoes.py)
+    # continuam sendo um único DELETE.
+    colaborador = models.ForeignKey(
+        Colaborador, on_delete=models.DO_NOTHING, db_constraint=False, related_name='movimentacoes_epi',
+    )
+    epi = models.ForeignKey(Epi, on_delete=models.PROTECT, related_name='movimentacoes')
+    tipo = models.CharField(max_length=10, choices=TIPOS)
+    quantidade = models.PositiveIntegerField(default=1)
+    momento = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # O que está com um colaborador (e a conferência de uma devolução) é consultado
+        # por (colaborador, epi): o índice entrega só as linhas dele.
+        indexes = [
+            models.Index(fields=['colaborador', 'epi'], name='mov_epi_colab_epi_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()}: {self.quantidade} x EPI {self.epi_id} (colaborador {self.colaborador_id})'
+
+
+# Define o modelo 'SaldoEpi': quantos itens cada colaborador tem emprestados agora
+# (empréstimos - devoluções), atualizado a cada movimentação — no SQLite, por
+# gatilhos da migração 0010, na mesma transação do INSERT em 'MovimentacaoEpi'.
+# 'python manage.py recalcular_saldos_epi' reconstrói e verifica os valores.
+class SaldoEpi(models.Model):
+    # O próprio colaborador é a chave primária: o LEFT JOIN da lista é pela chave.
+    colaborador = models.OneToOneField(
+        Colaborador, on_delete=models.DO_NOTHING, db_constraint=False,
+        primary_key=True, related_name='saldo_epi',
+    )
+    pendentes = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.colaborador_id}: {self.pendentes}'
+
+
+# [OBRAS] Em qual banco estão os colaboradores de cada obra (ver shards.py).
+# Fica sempre no banco principal; uma obra sem linha aqui fica no banco principal.
+# Só é alterado pelo comando 'python manage.py rebalancear_obras'.
+class ObraBanco(models.Model):
+    obra = models.CharField(max_length=80, primary_key=True)
+    # Nome do banco em settings.DATABASES (um dos COLABORADORES_SHARDS).
+    banco = models.CharField(max_length=50)
+
+    def __str__(self):
+        return f'{self.obra} -> {self.banco}'
+
+
+# Define o modelo 'Tarefa': a fila de trabalhos pesados executados FORA das
+# requisições (ex: o relatório mensal do quadro para os auditores, que percorre
+# todos os colaboradores). A página só cria a tarefa e acompanha o progresso; quem
+# executa é o comando 'python manage.py executar_tarefas' (ver tarefas.py).
+class Tarefa(models.Model):
+    ESTADOS = [
+        ('pendente', 'Pendente'),
+        ('executando', 'Executando'),
+        ('concluida', 'Concluída'),
+        ('falhou', 'Falhou'),
+    ]
+
+    # Tipo do trabalho (uma das chaves de tarefas.TIPOS) e os parâmetros dele.
+    tipo = models.CharField(max_length=30)
+    parametros = models.JSONField(default=dict)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='pendente')
+    # Progresso: colaboradores processados de um total estimado no início.
+    processados = models.BigIntegerField(default=0)
+    total = models.BigIntegerField(null=True, blank=True)
+    # Ponto de retomada, gravado a cada lote: se o processo cair, a tarefa continua
+    # daqui (e não do começo).
+    checkpoint = models.JSONField(default=dict)
+    # Nome do arquivo gerado (na pasta COLABORADORES_TAREFAS_DIR), para download.
+    arquivo = models.CharField(max_length=255, blank=True)
+    erro = models.TextField(blank=True)
+    # Quantas vezes a tarefa foi iniciada (retomadas incluídas).
+    tentativas = models.PositiveIntegerField(default=0)
+    # Processo que está executando a tarefa (ex: 'maquina:1234').
+    executor = models.CharField(max_length=100, blank=True)
+    criada_em = models.DateTimeField(default=timezone.now)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+    # Atualizado a cada lote: uma tarefa 'executando' sem sinal de vida há muito
+    # tempo é de um processo que caiu, e é retomada por outro.
+    sinal_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # O executor procura as próximas tarefas por (estado, criada_em).
+        indexes = [
+            models.Index(fields=['estado', 'criada_em'], name='tarefa_estado_criada_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.id} {self.tipo} ({self.get_estado_display()})'
@@ -0,0 +1,158 @@
+# Paginação por Cursor (Keyset Pagination)
+# ========================================
+# Em vez de usar OFFSET (que obriga o banco a ler e descartar todas as linhas
+# anteriores à página pedida), a paginação por cursor guarda a "posição" da
+# última linha exibida — o par (data_cadastro, id) — e pede ao banco apenas as
+# linhas que vêm DEPOIS (ou ANTES) desse par. Assim o custo de cada página é
+# sempre o mesmo, não importa o quão fundo o usuário navegue.
+
+# 'base64' e 'binascii' são usados para transformar o cursor em um texto seguro para URL.
+import base64
+import binascii
+import heapq
+from datetime import datetime
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import Q
+
+from . import busca
+
+# Tamanho padrão da página e o limite máximo que o usuário pode pedir via '?tamanho='.
+# Podem ser sobrescritos no settings.py (COLABORADORES_TAMANHO_PAGINA / COLABORADORES_TAMANHO_MAXIMO).
+TAMANHO_PADRAO = 50
+TAMANHO_MAXIMO = 200
+
+
+def tamanho_pagina(valor):
+    # Converte o parâmetro '?tamanho=' em um inteiro dentro dos limites permitidos.
+    # Valores inválidos (texto, negativos, vazios) caem no tamanho padrão.
+    padrao = getattr(settings, 'COLABORADORES_TAMANHO_PAGINA', TAMANHO_PADRAO)
+    maximo = getattr(settings, 'COLABORADORES_TAMANHO_MAXIMO', TAMANHO_MAXIMO)
+    try:
+        tamanho = int(valor)
+    except (TypeError, ValueError):
+        return padrao
+    if tamanho < 1:
+        return padrao
+    return min(tamanho, maximo)
+
+
+def codificar_cursor(colaborador):
+    # Gera o cursor de um colaborador: "data_iso|id" codificado em base64 (seguro para URL).
+    bruto = f'{colaborador.data_cadastro.isoformat()}|{colaborador.id}'
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    # Faz o caminho inverso de 'codificar_cursor'.
+    # Retorna a tupla (data_cadastro, id) ou None se o cursor for inválido/adulterado.
+    if not cursor:
+        return None
+    try:
+        preenchido = cursor + '=' * (-len(cursor) % 4)
+        bruto = base64.urlsafe_b64decode(preenchido.encode()).decode()
+        data_iso, id_texto = bruto.rsplit('|', 1)
+        return datetime.fromisoformat(data_iso), int(id_texto)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def _preparar(queryset, apos, antes, tamanho, query, busca_pelo_id=True):
+    # Monta a consulta limitada da página (ainda sem executá-la).
+    # Retorna (queryset, posicao_apos, posicao_antes).
+    # 'busca_pelo_id=False' desliga o atalho da pesquisa pelo id (ver abaixo).
+    posicao_apos = decodificar_cursor(apos)
+    posicao_antes = None if posicao_apos else decodificar_cursor(antes)
+
+    # Ordem da consulta, do mais novo para o mais antigo. O índice (data_cadastro, id)
+    # de models.py entrega as linhas já nessa ordem, sem ordenação extra no banco.
+    ordem = ('-data_cadastro', '-id')
+
+    if query and not busca_pelo_id:
+        # Ids que não seguem a ordem de cadastro (ex: colaboradores que mudaram de
+        # banco; ver shards.py): o índice de busca entrega todos os ids que casam e a
+        # página segue a ordem (data_cadastro, id), como sem pesquisa.
+        queryset = busca.filtrar(queryset, query)
+    elif query:
+        # Como 'data_cadastro' é preenchida na criação (auto_now_add) e o 'id' é
+        # sequencial, a ordem por id é a mesma ordem por data. Por isso o índice de
+        # busca pode entregar só os 'tamanho + 1' ids vizinhos ao cursor.
+        # Pelo mesmo motivo a página pesquisada é ordenada só pelo id: o SQLite lê
+        # os ids encontrados pela chave primária já em ordem, sem tabela temporária.
+        ordem = ('-id',)
+        queryset = busca.filtrar(
+            queryset, query, limite=tamanho + 1,
+            id_abaixo_de=posicao_apos[1] if posicao_apos else None,
+            id_acima_de=posicao_antes[1] if posicao_antes else None,
+        )
+
+    if posicao_antes:
+        # Página anterior: pega as linhas "mais novas" que o cursor, em ordem crescente,
+        # e depois inverte em memória (são no máximo 'tamanho + 1' linhas).
+        data, pk = posicao_antes
+        queryset = queryset.filter(
+            Q(data_cadastro__gt=data) | Q(data_cadastro=data, id__gt=pk)
+        ).order_by(*[campo.lstrip('-') for campo in ordem])
+    else:
+        if posicao_apos:
+            data, pk = posicao_apos
+            queryset = queryset.filter(
+                Q(data_cadastro__lt=data) | Q(data_cadastro=data, id__lt=pk)
+            )
+        queryset = queryset.order_by(*ordem)
+
+    # [IMPORTANTE] Busca limitada: pedimos UMA linha a mais só para saber se existe
+    # outra página naquela direção. O SQL gerado é um 'LIMIT tamanho+1', sem OFFSET.
+    return queryset[:tamanho + 1], posicao_apos, posicao_antes
+
+
+def _montar(linhas, tamanho, posicao_apos, posicao_antes):
+    # Recebe as linhas já buscadas e calcula os cursores de navegação.
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+
+    if posicao_antes:
+        linhas.reverse()
+        tem_anterior, tem_proxima = tem_mais, True
+    else:
+        tem_anterior, tem_proxima = posicao_apos is not None, tem_mais
+
+    return {
+        'linhas': linhas,
+        'cursor_anterior': codificar_cursor(linhas[0]) if linhas and tem_anterior else None,
+        'cursor_proxima': codificar_cursor(linhas[-1]) if linhas and tem_proxima else None,
+    }
+
+
+def paginar(queryset, apos=None, antes=None, tamanho=TAMANHO_PADRAO, query=''):
+    # Aplica a paginação por cursor a um QuerySet de Colaborador.
+    # A ordem exibida é sempre a mais recente primeiro: (-data_cadastro, -id).
+    #   - apos: cursor da última linha da página atual -> busca a PRÓXIMA página.
+    #   - antes: cursor da primeira linha da página atual -> busca a página ANTERIOR.
+    #   - query: texto da pesquisa; a página é montada a partir do índice de busca.
+    # Retorna um dicionário com as linhas da página e os cursores de navegação.
+    consulta, posicao_apos, posicao_antes = _preparar(queryset, apos, antes, tamanho, query)
+    return _montar(list(consulta), tamanho, posicao_apos, posicao_antes)
+
+
+async def apaginar(queryset, apos=None, antes=None, tamanho=TAMANHO_PADRAO, query=''):
+    # Versão assíncrona de 'paginar' (usada pelas views de views_async.py).
+    # 'async for' busca as linhas pelo ORM assíncrono do Django.
+    consulta, posicao_apos, posicao_antes = _preparar(queryset, apos, antes, tamanho, query)
+    return _montar([linha async for linha in consulta], tamanho, posicao_apos, posicao_antes)
+
+
+def paginar_varios(querysets, apos=None, antes=None, tamanho=TAMANHO_PADRAO, query='', executar=map):
+    # 'paginar' sobre vários QuerySets (ex: um por banco; ver shards.py) como se
+    # fossem um só. Cada QuerySet busca a sua própria página ('tamanho + 1' linhas
+    # a partir do mesmo cursor); 'executar' (com a assinatura de 'map') busca todas
+    # — em paralelo, se quiser — e as linhas são intercaladas pela ordem
+    # (data_cadastro, id), o que basta para montar a página e os cursores.
+    consultas = [_preparar(queryset, apos, antes, tamanho, query, busca_pelo_id=False) for queryset in querysets]
+    _, posicao_apos, posicao_antes = consultas[0]
+    listas = executar(list, [consulta for consulta, _, _ in consultas])
+    # Página anterior: as listas vêm em ordem crescente (e '_montar' as inverte).
+    linhas = heapq.merge(*listas, key=attrgetter('data_cadastro', 'id'), reverse=posicao_antes is None)
+    return _montar(list(islice(linhas, tamanho + 1)), tamanho, posicao_apos, posicao_antes)
@@ -0,0 +1,155 @@
+# Relatório Mensal do Quadro (para os auditores)
+# ==============================================
+# Percorre TODOS os colaboradores cadastrados até o fim do mês e gera um .zip com:
+#   - quadro.csv: um colaborador por linha (nome, CPF, função, status, obra, se foi
+#     admitido no mês e quantos EPIs tem pendentes);
+#   - resumo.csv: por função, total, ativos, inativos, admitidos no mês e EPIs
+#     pendentes (quantos colaboradores e quantos itens).
+# O status é o do momento em que o relatório é gerado.
+#
+# Executado como tarefa em segundo plano (ver tarefas.py), em lotes:
+#   - cada lote lê 'lote' colaboradores pela chave (id > último id do lote anterior),
+#     banco por banco (obras separadas, ver shards.py), e os saldos de EPIs dele com
+#     UMA consulta ao banco principal;
+#   - o checkpoint guarda o banco em andamento (pelo nome, não pela posição: a
+#     lista de bancos pode mudar entre uma retomada e outra), os bancos já
+#     terminados e o último id lido;
+#   - as linhas vão para o arquivo parcial 'tarefa-<id>.csv' e o resumo parcial
+#     fica no checkpoint, junto com o tamanho do arquivo parcial. Ao retomar, o
+#     arquivo é cortado nesse tamanho: as linhas de um lote interrompido (escritas,
+#     mas sem checkpoint) são descartadas e escritas de novo.
+
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from . import contadores, shards
+from .models import Colaborador, SaldoEpi
+
+CAMPOS = ['id', 'nome_completo', 'cpf', 'funcao', 'status', 'obra', 'data_cadastro']
+CABECALHO_QUADRO = [*CAMPOS, 'admitido_no_mes', 'epis_pendentes']
+CABECALHO_RESUMO = [
+    'funcao', 'total', 'ativos', 'inativos', 'admitidos_no_mes', 'com_epis_pendentes', 'epis_pendentes',
+]
+
+
+def _csv(linhas):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(linhas)
+    return buffer.getvalue()
+
+
+class RelatorioMensal:
+    tipo = 'relatorio_mensal'
+
+    def __init__(self, tarefa, pasta):
+        self.tarefa = tarefa
+        self.pasta = pasta
+        self.parcial = pasta / f'tarefa-{tarefa.id}.csv'
+        self.mes = tarefa.parametros['mes']
+        # Intervalo [inicio, fim) do mês, no fuso do projeto.
+        ano, mes = map(int, self.mes.split('-'))
+        self.inicio = timezone.make_aware(datetime(ano, mes, 1))
+        self.fim = timezone.make_aware((datetime(ano, mes, 1) + timedelta(days=32)).replace(day=1))
+
+    @staticmethod
+    def validar(parametros):
+        # 'mes' no formato AAAA-MM (sem ele, o mês atual).
+        mes = (parametros.get('mes') or '').strip() or timezone.localdate().strftime('%Y-%m')
+        try:
+            datetime.strptime(mes, '%Y-%m')
+        except ValueError:
+            raise ValueError('Informe o mês no formato AAAA-MM.')
+        return {'mes': mes}
+
+    def iniciar(self):
+        # Retorna (checkpoint, total estimado). O total vem dos contadores de cada banco.
+        total = sum(contadores.totais(banco=banco)['total_colaboradores'] for banco in shards.bancos())
+        with open(self.parcial, 'wb') as arquivo:
+            # O BOM ('\ufeff') faz o Excel reconhecer os acentos como UTF-8.
+            arquivo.write(('\ufeff' + _csv([CABECALHO_QUADRO])).encode('utf-8'))
+            tamanho = arquivo.tell()
+        checkpoint = {'banco': shards.PRINCIPAL, 'concluidos': [], 'ultimo_id': 0, 'bytes': tamanho, 'resumo': {}}
+        return checkpoint, total
+
+    def retomar(self, checkpoint):
+        # Descarta o que foi escrito depois do último checkpoint.
+        with open(self.parcial, 'r+b') as arquivo:
+            arquivo.truncate(checkpoint['bytes'])
+
+    def processar(self, checkpoint, lote):
+        # Processa o próximo lote. Retorna (novo checkpoint, quantidade); 0 = terminou.
+        banco, ultimo_id = checkpoint['banco'], checkpoint['ultimo_id']
+        concluidos = list(checkpoint['concluidos'])
+        linhas = []
+        while banco is not None:
+            linhas = list(
+                Colaborador.objects.using(banco)
+                .filter(id__gt=ultimo_id, data_cadastro__lt=self.fim)
+                .order_by('id')
+                .values_list(*CAMPOS)[:lote]
+            )
+            if linhas:
+                break
+            # Banco terminado: o próximo é o primeiro da lista atual ainda não lido.
+            concluidos.append(banco)
+            pendentes = [outro for outro in shards.bancos() if outro not in concluidos]
+            banco, ultimo_id = (pendentes[0] if pendentes else None), 0
+        if not linhas:
+            return {**checkpoint, 'banco': None, 'concluidos': concluidos, 'ultimo_id': 0}, 0
+
+        saldos = dict(
+            SaldoEpi.objects.using(DEFAULT_DB_ALIAS)
+            .filter(colaborador_id__in=[linha[0] for linha in linhas], pendentes__gt=0)
+            .values_list('colaborador_id', 'pendentes')
+        )
+        resumo = checkpoint['resumo']
+        saida = []
+        for id, nome, cpf, funcao, status, obra, data_cadastro in linhas:
+            admitido = self.inicio <= data_cadastro < self.fim
+            pendentes = saldos.get(id, 0)
+            saida.append([id, nome, cpf, funcao, status, obra, data_cadastro.isoformat(),
+                          'sim' if admitido else 'não', pendentes])
+            # [total, ativos, inativos, admitidos no mês, com EPIs pendentes, EPIs pendentes]
+            numeros = resumo.setdefault(funcao, [0, 0, 0, 0, 0, 0])
+            numeros[0] += 1
+            numeros[1 if status == 'Ativo' else 2] += 1
+            numeros[3] += admitido
+            numeros[4] += pendentes > 0
+            numeros[5] += pendentes
+
+        with open(self.parcial, 'ab') as arquivo:
+            arquivo.write(_csv(saida).encode('utf-8'))
+            arquivo.flush()
+            # Grava no disco ANTES do checkpoint: o checkpoint nunca aponta para
+            # linhas que poderiam se perder. O tamanho é em bytes (usado em 'retomar').
+            os.fsync(arquivo.fileno())
+            tamanho = arquivo.tell()
+        checkpoint = {'banco': banco, 'concluidos': concluidos, 'ultimo_id': linhas[-1][0], 'bytes': tamanho,
+                      'resumo': resumo}
+        return checkpoint, len(linhas)
+
+    def finalizar(self, checkpoint):
+        # Monta o .zip e retorna o nome do arquivo (na pasta das tarefas).
+        resumo = sorted(checkpoint['resumo'].items())
+        totais = [sum(numeros[i] for _, numeros in resumo) for i in range(len(CABECALHO_RESUMO) - 1)]
+        nome = f'relatorio-mensal-{self.mes}-{self.tarefa.id}.zip'
+        temporario = self.pasta / f'{nome}.tmp'
+        with zipfile.ZipFile(temporario, 'w', compression=zipfile.ZIP_DEFLATED) as pacote:
+            pacote.write(self.parcial, 'quadro.csv')
+            pacote.writestr('resumo.csv', '\ufeff' + _csv(
+                [CABECALHO_RESUMO, *([funcao, *numeros] for funcao, numeros in resumo), ['TOTAL', *totais]]
+            ))
+        # Só aparece com o nome final quando está completo.
+        os.replace(temporario, self.pasta / nome)
+        self.parcial.unlink()
+        return nome
+
+    def descartar(self):
+        # A tarefa falhou: o arquivo parcial não serve para mais nada.
+        self.parcial.unlink(missing_ok=True)
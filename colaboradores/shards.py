@@ -0,0 +1,444 @@
+# Obras em Bancos Separados (shards)
+# ==================================
+# Cada colaborador pertence a uma obra (o canteiro onde trabalha). Com dezenas de
+# obras, uma tabela única cresce sem parar e toda página, contagem e pesquisa passa
+# por ela. Aqui cada obra pode ter os seus dados em outro arquivo SQLite:
+#
+#   - COLABORADORES_SHARDS (settings.py) lista os bancos extras ('obras_1', ...),
+#     cada um com as mesmas tabelas e gatilhos deste app
+#     ('python manage.py migrate --database obras_1').
+#   - 'ObraBanco' (no banco principal) diz em qual banco está cada obra; as obras
+#     sem linha lá ficam no banco principal ('default'), como antes.
+#   - 'RoteadorObras' (DATABASE_ROUTERS) grava cada colaborador no banco da sua obra.
+#   - 'listar': a lista de UMA obra consulta só o banco dela; a de todas as obras
+#     consulta todos os bancos ao mesmo tempo (threads) e junta cards e páginas.
+#   - 'mover_obra' (comando 'rebalancear_obras') leva uma obra para outro banco.
+#
+# CPF: o UNIQUE de cada banco só enxerga o próprio banco; 'salvar' (usado no cadastro
+# e na edição) e o formulário (forms.py) conferem o CPF em todos os bancos e no
+# arquivo de inativos antes de gravar ('cpf_em_uso').
+#
+# Ids: cada banco numera os seus colaboradores em um bloco próprio de ids (múltiplos
+# de BLOCO), então o id continua único entre os bancos e não muda quando a obra
+# troca de banco (links, histórico e EPIs continuam valendo). Por isso, com as obras
+# separadas, a ordem dos ids deixa de ser a ordem de cadastro, e a pesquisa pagina
+# pela data (paginacao.paginar_varios), sem o atalho pelo id.
+#
+# A API JSON e a exportação também juntam os bancos ('paginar' e um QuerySet por banco).
+# Continuam só no banco principal: o catálogo e o livro-registro de EPIs (o
+# almoxarifado é um só), a auditoria, o arquivo de inativos, o feed de alterações
+# (as alterações nos outros bancos são registradas nele, ver feed.py), a fila de
+# tarefas e o admin. A versão da tabela (ETag da API, versao.py) soma a de cada banco.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import Count
+from django.http import Http404
+from django.utils import timezone
+
+from . import acoes, busca, cache_lista, contadores, feed, metricas
+from .models import Colaborador, ColaboradorArquivado, ObraBanco, SaldoEpi
+from .paginacao import TAMANHO_PADRAO, paginar_varios
+
+PRINCIPAL = DEFAULT_DB_ALIAS
+# Tamanho do bloco de ids de cada banco.
+BLOCO = 10**12
+# Por quantos segundos cada processo reaproveita o mapa obra -> banco.
+MAPA_TTL = 5.0
+# Máximo de bancos consultados ao mesmo tempo.
+PARALELISMO = 8
+# Colunas copiadas quando um colaborador muda de banco.
+CAMPOS = ['id', 'nome_completo', 'cpf', 'funcao', 'status', 'obra', 'data_cadastro', 'updated_at']
+
+_mapa = (0.0, {})
+_trava = threading.Lock()
+_executor = None
+
+
+def configurados():
+    # Os bancos extras (vazio = tudo no banco principal).
+    return list(getattr(settings, 'COLABORADORES_SHARDS', []))
+
+
+def bancos():
+    return [PRINCIPAL, *configurados()]
+
+
+def mapa():
+    # {obra: banco} das obras que estão fora do banco principal.
+    # Sem bancos extras configurados, não consulta nada.
+    global _mapa
+    if not configurados():
+        return {}
+    expira_em, obras = _mapa
+    if expira_em > time.monotonic():
+        return obras
+    obras = dict(ObraBanco.objects.using(PRINCIPAL).values_list('obra', 'banco'))
+    _mapa = (time.monotonic() + MAPA_TTL, obras)
+    return obras
+
+
+def esquecer_mapa():
+    # Relê o mapa na próxima consulta (os outros processos o releem em até MAPA_TTL).
+    global _mapa
+    _mapa = (0.0, {})
+
+
+def ativo():
+    # Há alguma obra fora do banco principal?
+    return bool(mapa())
+
+
+def banco_da_obra(obra):
+    return mapa().get(obra, PRINCIPAL) if obra else PRINCIPAL
+
+
+class RoteadorObras:
+    # Roteador de bancos do Django (settings.DATABASE_ROUTERS). Só decide pelos
+    # colaboradores; o resto fica no banco principal.
+
+    def db_for_write(self, model, **hints):
+        instancia = hints.get('instance')
+        if model is not Colaborador or instancia is None:
+            return None
+        # Um colaborador lido de um banco continua sendo gravado nele (mudar de obra
+        # não muda de banco sozinho; ver 'salvar'). Um novo vai para o da obra.
+        return instancia._state.db or banco_da_obra(instancia.obra)
+
+    db_for_read = db_for_write
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # O saldo de EPIs fica no banco principal, mesmo para colaboradores de
+        # outro banco (ver 'anexar_saldos').
+        if {type(obj1), type(obj2)} == {Colaborador, SaldoEpi}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Os bancos das obras têm as tabelas (e gatilhos) deste app, menos o mapa e a
+        # fila de tarefas (tarefas.py).
+        if db == PRINCIPAL:
+            return None
+        return app_label == 'colaboradores' and model_name not in ('obrabanco', 'tarefa')
+
+
+def em_paralelo(funcao, itens):
+    # Como 'map', mas com cada item em uma thread (cada thread tem a sua conexão
+    # com cada banco, reaproveitada nas próximas chamadas).
+    global _executor
+    itens = list(itens)
+    if len(itens) < 2:
+        return [funcao(item) for item in itens]
+    with _trava:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PARALELISMO, thread_name_prefix='shards')
+    medicao = metricas.atual()
+    if medicao is None:
+        return list(_executor.map(funcao, itens))
+
+    def medir(item):
+        # As threads do pool não enxergam a medição da requisição (ContextVar): cada
+        # chamada é medida à parte e somada a ela depois (ver metricas.py).
+        parcial, token = metricas.iniciar(guardar_sql=medicao.sql is not None)
+        try:
+            return funcao(item), parcial
+        finally:
+            metricas.encerrar(token)
+
+    resultados = list(_executor.map(medir, itens))
+    for _, parcial in resultados:
+        metricas.somar(medicao, parcial)
+    return [resultado for resultado, _ in resultados]
+
+
+def obter(id, queryset=None):
+    # Procura o colaborador pelo id em cada banco (o principal primeiro).
+    # Retorna None se ele não existir.
+    queryset = Colaborador.objects.all() if queryset is None else queryset
+    for banco in bancos():
+        colaborador = queryset.using(banco).filter(id=id).first()
+        if colaborador is not None:
+            return colaborador
+    return None
+
+
+def em_lote(ids, queryset=None):
+    # Como 'in_bulk': {id: colaborador} dos 'ids' encontrados, procurando em cada banco
+    # só os que ainda faltam (o principal primeiro).
+    queryset = Colaborador.objects.all() if queryset is None else queryset
+    encontrados = {}
+    for banco in bancos():
+        faltando = [id for id in ids if id not in encontrados]
+        if not faltando:
+            break
+        encontrados.update(queryset.using(banco).in_bulk(faltando))
+    return encontrados
+
+
+def obter_ou_404(id, queryset=None):
+    colaborador = obter(id, queryset)
+    if colaborador is None:
+        raise Http404('Colaborador não encontrado.')
+    return anexar_saldos([colaborador])[0]
+
+
+def anexar_saldos(colaboradores):
+    # Os saldos de EPIs estão no banco principal: para os colaboradores lidos de
+    # outro banco, vêm de UMA consulta pela chave (no lugar do LEFT JOIN).
+    fora = [colaborador for colaborador in colaboradores if colaborador._state.db != PRINCIPAL]
+    if fora:
+        saldos = SaldoEpi.objects.using(PRINCIPAL).in_bulk([colaborador.id for colaborador in fora])
+        for colaborador in fora:
+            colaborador.saldo_epi = saldos.get(colaborador.id)
+    return colaboradores
+
+
+def _unidades(obra):
+    # Consultas da lista: [(banco, obra a filtrar ou None)].
+    obras = mapa()
+    if obra:
+        banco = obras.get(obra, PRINCIPAL)
+        # Sozinha no banco: não precisa filtrar (e os cards vêm de 'ContadorStatus').
+        sozinha = banco != PRINCIPAL and list(obras.values()).count(banco) == 1
+        return [(banco, None if sozinha else obra)]
+    return [(banco, None) for banco in [PRINCIPAL, *sorted(set(obras.values()))]]
+
+
+def listar(query='', obra='', apos=None, antes=None, tamanho=TAMANHO_PADRAO):
+    # Cards e página da lista de uma obra ('obra') ou de todas (juntando os bancos).
+    # Retorna (estatisticas, pagina), nos formatos de contadores.totais e paginacao.paginar.
+    unidades = _unidades(obra)
+    querysets = []
+    for banco, filtro in unidades:
+        colaboradores = Colaborador.objects.using(banco)
+        if filtro is not None:
+            colaboradores = colaboradores.filter(obra=filtro)
+        if banco == PRINCIPAL:
+            # No banco principal, o saldo de EPIs vem no LEFT JOIN (ver views.py).
+            colaboradores = colaboradores.select_related('saldo_epi')
+        querysets.append(colaboradores)
+
+    def contar(indice):
+        (banco, filtro), colaboradores = unidades[indice], querysets[indice]
+        if query:
+            return contadores.agregar(busca.filtrar(colaboradores, query))
+        if filtro is None:
+            return contadores.totais(banco=banco)
+        return contadores.agregar(colaboradores)
+
+    estatisticas = contadores.somar(em_paralelo(contar, range(len(unidades))))
+    pagina = paginar_varios(querysets, apos, antes, tamanho, query, executar=em_paralelo)
+    anexar_saldos(pagina['linhas'])
+    return estatisticas, pagina
+
+
+def paginar(queryset, apos=None, antes=None, tamanho=TAMANHO_PADRAO, query=''):
+    # Como paginacao.paginar, mas juntando todos os bancos (sem os cards). Usado pela
+    # API JSON, com o QuerySet dela ('.only(...)').
+    querysets = [queryset.using(banco) for banco, _ in _unidades('')]
+    return paginar_varios(querysets, apos, antes, tamanho, query, executar=em_paralelo)
+
+
+# Mudança de banco
+# ----------------
+
+def _sequencia(banco):
+    # Último id já usado pelo banco (o AUTOINCREMENT do SQLite nunca o reaproveita).
+    with connections[banco].cursor() as cursor:
+        cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s', [Colaborador._meta.db_table])
+        linha = cursor.fetchone()
+    return linha[0] if linha else 0
+
+
+def novo_bloco(banco):
+    # Passa a numerar os próximos colaboradores de 'banco' em um bloco de ids acima
+    # de todos os já usados em qualquer banco. Retorna o primeiro id do bloco.
+    inicio = (max(_sequencia(outro) for outro in bancos()) // BLOCO + 1) * BLOCO
+    with connections[banco].cursor() as cursor:
+        cursor.execute('DELETE FROM sqlite_sequence WHERE name = %s', [Colaborador._meta.db_table])
+        cursor.execute(
+            'INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [Colaborador._meta.db_table, inicio],
+        )
+    return inicio
+
+
+def _apagar(banco, ids):
+    # Um DELETE ... WHERE id IN (...) por lote, sem os sinais (acoes.apagar).
+    ids = list(ids)
+    for inicio in range(0, len(ids), 500):
+        acoes.apagar(Colaborador.objects.using(banco).filter(id__in=ids[inicio:inicio + 500]))
+
+
+def _copiar(ids, origem, destino):
+    # Grava no destino (com os mesmos ids) os colaboradores 'ids' da origem.
+    # Pode ser repetido: quem já estiver no destino é substituído.
+    linhas = list(Colaborador.objects.using(origem).filter(id__in=ids).values(*CAMPOS))
+    with transaction.atomic(using=destino):
+        bloco = _sequencia(destino) // BLOCO
+        _apagar(destino, ids)
+        copias = [Colaborador(**linha) for linha in linhas]
+        Colaborador.objects.using(destino).bulk_create(copias)
+        # O bulk_create preenche as datas com a hora atual (auto_now_add/auto_now);
+        # as originais são gravadas de volta, como em arquivo.restaurar.
+        for copia, linha in zip(copias, linhas):
+            copia.data_cadastro, copia.updated_at = linha['data_cadastro'], linha['updated_at']
+        Colaborador.objects.using(destino).bulk_update(copias, ['data_cadastro', 'updated_at'])
+        # Um banco de obras ainda no bloco do principal, ou um banco que recebeu ids
+        # acima do próprio bloco, passa para um bloco novo: os próximos ids não podem colidir.
+        if (bloco == 0 and destino != PRINCIPAL) or _sequencia(destino) // BLOCO != bloco:
+            novo_bloco(destino)
+    return len(linhas)
+
+
+def bancos_dos_cpfs(cpfs):
+    # {cpf: banco} dos CPFs já cadastrados, em qualquer banco (uma consulta por banco,
+    # pelo índice único do CPF).
+    encontrados = {}
+    for banco in bancos():
+        cadastrados = Colaborador.objects.using(banco).filter(cpf__in=list(cpfs)).values_list('cpf', flat=True)
+        encontrados.update(dict.fromkeys(cadastrados, banco))
+    return encontrados
+
+
+def cpf_em_uso(cpf, exceto=None):
+    # O CPF já é de outro colaborador (em qualquer banco) ou de um arquivado?
+    # 'exceto': o id do próprio colaborador, na edição.
+    for banco in bancos():
+        outros = Colaborador.objects.using(banco).filter(cpf=cpf)
+        if exceto is not None:
+            outros = outros.exclude(id=exceto)
+        if outros.exists():
+            return True
+    return ColaboradorArquivado.objects.using(PRINCIPAL).filter(cpf=cpf).exists()
+
+
+def conferir_cpf(colaborador):
+    # Com bancos extras, recusa um CPF que já está em outro banco — com a mesma
+    # mensagem do UNIQUE, como arquivo.conferir_cpf. Só consulta quando o colaborador
+    # é novo ou o CPF mudou.
+    # [NOTA] A conferência e a gravação não são uma operação só: dois cadastros
+    # simultâneos do mesmo CPF em bancos diferentes ainda podem passar.
+    if not configurados():
+        return
+    carregados = getattr(colaborador, '_valores_carregados', {})
+    if not colaborador._state.adding and carregados.get('cpf') == colaborador.cpf:
+        return
+    if cpf_em_uso(colaborador.cpf, exceto=colaborador.pk):
+        raise IntegrityError('UNIQUE constraint failed: colaboradores_colaborador.cpf')
+
+
+def salvar(colaborador):
+    # .save() que, se a obra nova fica em outro banco, leva o colaborador para lá
+    # (com o mesmo id; na auditoria aparece como uma alteração da obra).
+    # Um colaborador novo é gravado no banco da obra dele (ver 'RoteadorObras').
+    conferir_cpf(colaborador)
+    colaborador.save()
+    origem, destino = colaborador._state.db, banco_da_obra(colaborador.obra)
+    if origem != destino:
+        _copiar([colaborador.id], origem, destino)
+        _apagar(origem, [colaborador.id])
+        # Para o feed, a saída da origem não é uma exclusão.
+        feed.registrar([colaborador.id], banco=destino)
+        colaborador._state.db = destino
+        cache_lista.invalidar()
+
+
+def contar_por_obra(banco):
+    # {obra: colaboradores} de um banco (as obras do mapa sem ninguém aparecem com 0).
+    obras = {obra: 0 for obra, banco_obra in mapa().items() if banco_obra == banco}
+    obras.update(
+        Colaborador.objects.using(banco).order_by().values_list('obra').annotate(total=Count('id'))
+    )
+    return obras
+
+
+def plano_divisao(banco):
+    # Escolhe as obras que saem de 'banco' para dividi-lo em duas metades parecidas
+    # (as maiores primeiro, cada uma para o lado mais leve).
+    ficam = saem = 0
+    saindo = []
+    por_tamanho = sorted(contar_por_obra(banco).items(), key=lambda item: (-item[1], item[0]))
+    for obra, total in por_tamanho:
+        if not obra:
+            continue  # sem obra definida: fica no banco principal
+        if saem < ficam:
+            saindo.append(obra)
+            saem += total
+        else:
+            ficam += total
+    return saindo
+
+
+def mover_obra(obra, destino, lote=1000, espera=MAPA_TTL + 1, progresso=None):
+    # Leva os colaboradores da obra para o banco 'destino'. Retorna quantos foram.
+    # Etapas (se o comando for interrompido, basta executá-lo de novo):
+    #   1. copia os colaboradores para o destino, em lotes, com os mesmos ids;
+    #   2. troca o banco da obra em 'ObraBanco';
+    #   3. espera 'espera' segundos (os outros processos releem o mapa) e copia de
+    #      novo quem mudou na origem nesse meio tempo;
+    #   4. apaga os colaboradores da origem.
+    # [ATENÇÃO] Execute uma mudança por vez (os blocos de ids são escolhidos olhando
+    # todos os bancos).
+    if destino not in configurados():
+        raise ValueError(f'Banco desconhecido: "{destino}". Use um de COLABORADORES_SHARDS.')
+    if not obra:
+        raise ValueError('Informe a obra.')
+    if connections[destino].vendor != 'sqlite':
+        raise ValueError('Os bancos das obras precisam ser SQLite.')
+    esquecer_mapa()
+    origem = banco_da_obra(obra)
+    inicio = timezone.now()
+
+    copiados = []
+    if origem != destino:
+        da_obra = Colaborador.objects.using(origem).filter(obra=obra)
+        while ids := list(
+            da_obra.filter(id__gt=copiados[-1] if copiados else 0).order_by('id').values_list('id', flat=True)[:lote]
+        ):
+            _copiar(ids, origem, destino)
+            copiados += ids
+            if progresso:
+                progresso(len(copiados))
+        if not copiados:
+            # Obra ainda sem ninguém: o destino precisa ter o próprio bloco de ids.
+            with transaction.atomic(using=destino):
+                if _sequencia(destino) < BLOCO:
+                    novo_bloco(destino)
+        ObraBanco.objects.using(PRINCIPAL).update_or_create(obra=obra, defaults={'banco': destino})
+        esquecer_mapa()
+        cache_lista.invalidar()
+        time.sleep(espera)
+
+    # Etapas 3 e 4 em todos os outros bancos: uma execução interrompida pode ter
+    # deixado colaboradores da obra no banco antigo.
+    movidos = 0
+    for banco in bancos():
+        da_obra = Colaborador.objects.using(banco).filter(obra=obra)
+        if banco == destino or not da_obra.exists():
+            continue
+        # Na origem, só os alterados ou cadastrados durante a cópia (o .update() das
+        # ações em massa também muda 'updated_at'). Quem já foi alterado de novo no
+        # destino (depois da troca) fica com a versão de lá.
+        recentes = da_obra.filter(updated_at__gte=inicio) if banco == origem else da_obra
+        alterados = dict(recentes.values_list('id', 'updated_at'))
+        no_destino = dict(
+            Colaborador.objects.using(destino).filter(id__in=list(alterados)).values_list('id', 'updated_at')
+        )
+        recopiar = [id for id, momento in alterados.items() if id not in no_destino or momento > no_destino[id]]
+        for inicio_lote in range(0, len(recopiar), lote):
+            _copiar(recopiar[inicio_lote:inicio_lote + lote], banco, destino)
+        restantes = set(da_obra.values_list('id', flat=True))
+        if banco == origem:
+            # Excluídos na origem durante a cópia.
+            _apagar(destino, set(copiados) - restantes)
+        _apagar(banco, restantes)
+        # Para o feed, a saída da origem não é uma exclusão (no banco principal, os
+        # gatilhos gravaram lápides): os movidos aparecem como alterados.
+        feed.registrar(list(restantes), banco=destino)
+        movidos += len(restantes)
+    cache_lista.invalidar()
+    return movidos
@@ -0,0 +1,75 @@
+# Sinais (Signals) do App Colaboradores
+# =====================================
+# O Django dispara 'post_save' depois de cada .save()/.create() e 'post_delete'
+# depois de cada .delete(). Usamos esses sinais para invalidar o cache da página
+# de lista sempre que um colaborador é cadastrado, editado ou excluído — seja
+# pelas views (colaborador_novo / colaborador_editar / colaborador_excluir), pelo
+# Django Admin ou pelo shell.
+# [NOTA] Operações em lote (bulk_create, update(), delete() de QuerySet) NÃO
+# disparam estes sinais; quem as usa deve chamar cache_lista.invalidar().
+#
+# Os mesmos sinais alimentam a auditoria (auditoria.py): cada alteração vira um
+# EventoAuditoria com os valores antes/depois, gravado em segundo plano.
+#
+# Fora do SQLite e nos bancos das obras (shards.py), eles também alimentam o feed de
+# alterações (feed.py); no banco principal SQLite quem faz isso são os gatilhos da
+# migração 0008. Pelo mesmo motivo, o 'pre_save'
+# confere se o CPF já está no arquivo de inativos (no SQLite, gatilhos da migração 0009).
+#
+# O sinal 'connection_created' (disparado a cada nova conexão com o banco) instala
+# a medição das consultas SQL usada pelas métricas de desempenho (metricas.py).
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import arquivo, auditoria, cache_lista, feed, metricas
+from .models import Colaborador
+
+
+@receiver(post_save, sender=Colaborador)
+@receiver(post_delete, sender=Colaborador)
+def invalidar_cache_lista(sender, **kwargs):
+    cache_lista.invalidar()
+
+
+@receiver(post_save, sender=Colaborador)
+def auditar_gravacao(sender, instance, created, **kwargs):
+    depois = {campo: getattr(instance, campo) for campo in auditoria.CAMPOS}
+    # 'from_db' (models.py) guardou os valores lidos do banco; um objeto novo não tem.
+    antes = {} if created else getattr(instance, '_valores_carregados', {})
+    alteracoes = auditoria.diferencas(antes, depois)
+    if not alteracoes:
+        return  # .save() sem nenhuma mudança nos campos acompanhados
+    auditoria.registrar([
+        auditoria.evento(instance.id, 'criado' if created else 'alterado', alteracoes)
+    ])
+    # Um segundo .save() no mesmo objeto deve comparar com o que acabou de ser salvo.
+    instance._valores_carregados = {**antes, **depois}
+
+
+@receiver(post_delete, sender=Colaborador)
+def auditar_exclusao(sender, instance, **kwargs):
+    antes = {campo: getattr(instance, campo) for campo in auditoria.CAMPOS}
+    auditoria.registrar([
+        auditoria.evento(instance.id, 'excluido', auditoria.diferencas(antes, {}))
+    ])
+
+
+@receiver(post_save, sender=Colaborador)
+@receiver(post_delete, sender=Colaborador)
+def alimentar_feed(sender, instance, signal, using, **kwargs):
+    feed.registrar([instance.id], excluido=signal is post_delete, banco=using)
+
+
+@receiver(pre_save, sender=Colaborador)
+def conferir_cpf_arquivado(sender, instance, using, **kwargs):
+    arquivo.conferir_cpf(instance, using)
+
+
+@receiver(connection_created)
+def medir_consultas(sender, connection, **kwargs):
+    # O mesmo objeto de conexão pode ser reaberto (ex: CONN_MAX_AGE expirou),
+    # então verificamos para não instalar a medição duas vezes.
+    if metricas.medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metricas.medir_consulta)
@@ -0,0 +1,69 @@
+# Massa de Dados Sintética
+# ========================
+# Gera colaboradores fictícios (com CPFs VÁLIDOS) para testes de carga e
+# benchmarks. A geração é determinística: o colaborador de número 'i' é sempre
+# o mesmo, então duas execuções com a mesma escala produzem o mesmo banco.
+
+import random
+
+from django.db import transaction
+
+from . import cache_lista, contadores
+from . import cpf as cpf_util
+from .models import Colaborador
+
+NOMES = ['João', 'José', 'Maria', 'Ana', 'Antônio', 'Sebastião', 'Conceição', 'Luís', 'Inês', 'Márcio']
+SOBRENOMES = ['Silva', 'Souza', 'Conceição', 'Araújo', 'Gonçalves', 'Simões', 'Leão', 'Magalhães']
+FUNCOES = ['Almoxarife', 'Pedreiro', 'Eletricista', 'Mestre de Obras', 'Carpinteiro', 'Servente', 'Armador']
+
+# Os 9 primeiros dígitos do CPF de número 'i' são ((i + 1) * PASSO) % 10^9. Como PASSO não
+# é divisível por 2 nem por 5, essa conta nunca repete um valor (para i < 10^9), e os
+# CPFs ficam espalhados em vez de sequenciais.
+PASSO = 387_420_489
+LIMITE_CPF = 10 ** 9
+
+
+def colaborador(numero):
+    # Monta (sem salvar) o colaborador sintético de número 'numero'.
+    aleatorio = random.Random(numero)
+    base = (numero + 1) * PASSO % LIMITE_CPF
+    if len(set(f'{base:09d}')) == 1:
+        # Bases com todos os dígitos iguais geram CPFs inválidos (ex: 111.111.111-11).
+        base += 1
+    return Colaborador(
+        nome_completo=f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}',
+        cpf=cpf_util.gerar(base),
+        funcao=aleatorio.choice(FUNCOES),
+        # Aproximadamente 1 a cada 5 colaboradores fica inativo.
+        status='Inativo' if aleatorio.random() < 0.2 else 'Ativo',
+    )
+
+
+def popular(quantidade, lote=5_000, progresso=None):
+    # Garante que o banco tenha pelo menos 'quantidade' colaboradores, criando
+    # apenas os que faltam (em lotes, cada um com um único INSERT).
+    # Retorna quantos colaboradores foram criados.
+    # 'progresso' (opcional) é chamado com o total atual após cada lote.
+    total = contadores.totais()['total_colaboradores']
+    numero = total
+    criados = 0
+    while total < quantidade:
+        faltam = min(lote, quantidade - total)
+        with transaction.atomic():
+            # 'ignore_conflicts' pula CPFs que já existam no banco (ex: cadastrados
+            # à mão); o laço continua até atingir a quantidade pedida.
+            Colaborador.objects.bulk_create(
+                [colaborador(n) for n in range(numero, numero + faltam)],
+                ignore_conflicts=True,
+            )
+        numero += faltam
+        novo_total = contadores.totais()['total_colaboradores']
+        criados += novo_total - total
+        total = novo_total
+        if progresso:
+            progresso(total)
+
+    # O bulk_create não dispara os sinais do Django (ver importar_colaboradores).
+    if criados:
+        cache_lista.invalidar()
+    return criados
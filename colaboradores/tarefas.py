@@ -0,0 +1,172 @@
+# Tarefas em Segundo Plano (fila local de trabalhos pesados)
+# =========================================================
+# Alguns trabalhos percorrem todos os colaboradores (ex: o relatório mensal para os
+# auditores, relatorios.py) e levariam minutos: dentro de uma requisição, prenderiam
+# um worker do servidor esse tempo todo. Aqui eles viram uma 'Tarefa' (models.py):
+#
+#   1. a página cria a tarefa (POST em /tarefas/) e recebe o id;
+#   2. o comando 'python manage.py executar_tarefas' (um processo à parte, com um
+#      pool de processos) reserva as tarefas pendentes e as executa, em lotes;
+#   3. a página consulta o progresso (GET em /tarefas/<id>/) de tempos em tempos
+#      (script.js) e, quando a tarefa termina, mostra o link do arquivo gerado
+#      (/tarefas/<id>/arquivo/).
+#
+# Retomada: depois de cada lote, o ponto de parada ('checkpoint') e o progresso são
+# gravados juntos, com um sinal de vida ('sinal_em'). Se o processo cair, a tarefa
+# fica 'executando' sem sinal; passado ABANDONO, outro executor a reserva e continua
+# do último checkpoint. Depois de MAX_TENTATIVAS, ela é marcada como 'falhou'.
+#
+# Reserva: cada executor marca a tarefa com a sua identificação ('executor') em um
+# UPDATE condicionado ao estado que leu — dois executores nunca pegam a mesma
+# tarefa. Cada gravação de progresso também confere o 'executor': quem perdeu a
+# tarefa para outro (por ter ficado tempo demais sem sinal) para de executá-la.
+#
+# Cada tipo de tarefa (TIPOS) é uma classe com:
+#   validar(parametros) -> parâmetros limpos (ValueError se inválidos);
+#   iniciar() -> (checkpoint, total estimado); retomar(checkpoint);
+#   processar(checkpoint, lote) -> (checkpoint, quantidade; 0 = terminou);
+#   finalizar(checkpoint) -> nome do arquivo gerado na pasta das tarefas;
+#   descartar() -> apaga os arquivos parciais de uma tarefa que falhou.
+
+import logging
+import os
+import socket
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.http import Http404
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Tarefa
+from .relatorios import RelatorioMensal
+
+logger = logging.getLogger('colaboradores.tarefas')
+
+TIPOS = {
+    RelatorioMensal.tipo: RelatorioMensal,
+}
+
+# Colaboradores processados por lote (entre dois checkpoints).
+LOTE = 1000
+# Sem sinal de vida por mais que isso, uma tarefa 'executando' é retomada por outro executor.
+ABANDONO = timedelta(minutes=2)
+# Quantas vezes uma tarefa pode ser iniciada (retomadas incluídas) antes de falhar.
+MAX_TENTATIVAS = 3
+
+
+def pasta():
+    # Pasta dos arquivos gerados (COLABORADORES_TAREFAS_DIR).
+    caminho = Path(settings.COLABORADORES_TAREFAS_DIR)
+    caminho.mkdir(parents=True, exist_ok=True)
+    return caminho
+
+
+def identificar():
+    # Identificação deste processo na coluna 'executor'.
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def criar(tipo, parametros):
+    classe = TIPOS.get(tipo)
+    if classe is None:
+        raise ValueError(f'Tipo de tarefa desconhecido: "{tipo}".')
+    return Tarefa.objects.create(tipo=tipo, parametros=classe.validar(parametros))
+
+
+def reservar(executor):
+    # Reserva a próxima tarefa para 'executor': a pendente mais antiga, ou uma
+    # abandonada (executando, sem sinal de vida). Retorna a tarefa ou None.
+    agora = timezone.now()
+    candidatas = Tarefa.objects.filter(
+        Q(estado='pendente') | Q(estado='executando', sinal_em__lt=agora - ABANDONO)
+    ).order_by('criada_em', 'id')
+    for tarefa in candidatas[:10]:
+        # Condicionado ao que foi lido: se outro executor reservou antes, não altera nada.
+        mesma = Tarefa.objects.filter(id=tarefa.id, estado=tarefa.estado, sinal_em=tarefa.sinal_em)
+        if tarefa.tentativas >= MAX_TENTATIVAS:
+            if mesma.update(estado='falhou', erro=f'Interrompida {tarefa.tentativas} vez(es) sem terminar.',
+                            concluida_em=agora):
+                TIPOS[tarefa.tipo](tarefa, pasta()).descartar()
+            continue
+        campos = {'estado': 'executando', 'executor': executor, 'sinal_em': agora,
+                  'tentativas': F('tentativas') + 1}
+        if tarefa.estado == 'pendente':
+            campos['iniciada_em'] = agora
+        if mesma.update(**campos):
+            tarefa.refresh_from_db()
+            return tarefa
+    return None
+
+
+def _gravar(tarefa, executor, **campos):
+    # Grava o progresso, se a tarefa ainda é deste executor. Retorna False se não for.
+    return bool(
+        Tarefa.objects.filter(id=tarefa.id, estado='executando', executor=executor)
+        .update(sinal_em=timezone.now(), **campos)
+    )
+
+
+def executar(tarefa_id, executor, lote=LOTE):
+    # Executa (ou retoma, do último checkpoint) uma tarefa já reservada por 'executor'.
+    # Retorna o estado final: 'concluida', 'falhou' ou 'perdida' (outro executor a pegou).
+    tarefa = Tarefa.objects.get(id=tarefa_id)
+    trabalho = None
+    try:
+        trabalho = TIPOS[tarefa.tipo](tarefa, pasta())
+        checkpoint, processados = tarefa.checkpoint, tarefa.processados
+        if not checkpoint:
+            checkpoint, total = trabalho.iniciar()
+            if not _gravar(tarefa, executor, checkpoint=checkpoint, total=total):
+                return 'perdida'
+        trabalho.retomar(checkpoint)
+        while True:
+            checkpoint, quantidade = trabalho.processar(checkpoint, lote)
+            if not quantidade:
+                break
+            processados += quantidade
+            if not _gravar(tarefa, executor, checkpoint=checkpoint, processados=processados):
+                return 'perdida'
+        arquivo = trabalho.finalizar(checkpoint)
+    except Exception as erro:
+        logger.exception('Falha na tarefa #%d (%s).', tarefa.id, tarefa.tipo)
+        # Só descarta o arquivo parcial se a tarefa ainda era deste executor.
+        if _gravar(tarefa, executor, estado='falhou', erro=f'{type(erro).__name__}: {erro}',
+                   concluida_em=timezone.now()) and trabalho is not None:
+            trabalho.descartar()
+        return 'falhou'
+    if not _gravar(tarefa, executor, estado='concluida', arquivo=arquivo, concluida_em=timezone.now()):
+        return 'perdida'
+    return 'concluida'
+
+
+def progresso(tarefa):
+    # O que a página precisa para mostrar o andamento (view 'tarefa_progresso').
+    if tarefa.estado == 'concluida':
+        percentual = 100.0
+    elif tarefa.total:
+        percentual = min(99.9, round(tarefa.processados * 100 / tarefa.total, 1))
+    else:
+        percentual = 0.0
+    return {
+        'id': tarefa.id,
+        'tipo': tarefa.tipo,
+        'parametros': tarefa.parametros,
+        'estado': tarefa.estado,
+        'processados': tarefa.processados,
+        'total': tarefa.total,
+        'percentual': percentual,
+        'erro': tarefa.erro,
+        'progresso_url': reverse('tarefa_progresso', args=[tarefa.id]),
+        'arquivo_url': reverse('tarefa_arquivo', args=[tarefa.id]) if tarefa.estado == 'concluida' else None,
+    }
+
+
+def caminho_arquivo(tarefa):
+    # Arquivo gerado por uma tarefa concluída (404 se ele não existe mais).
+    caminho = pasta() / tarefa.arquivo
+    if tarefa.estado != 'concluida' or not tarefa.arquivo or not caminho.is_file():
+        raise Http404('Arquivo não encontrado.')
+    return caminho
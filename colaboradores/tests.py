@@ -1,3 +1,1429 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models.signals import post_delete
+from django.core.management import CommandError, call_command
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from setup import aquecimento, estaticos
+
+from . import (
+    acoes, arquivo, auditoria, cache_lista, contadores, epis, fragmentos, metricas, paginacao, shards, sintetico,
+    tarefas, views, views_async,
+)
+from . import cpf as cpf_util
+from .management.commands import benchmark_inicializacao
+from .forms import ColaboradorForm
+from .middleware import MetricasMiddleware
+from .models import (
+    Alteracao, Colaborador, ColaboradorArquivado, ContadorStatus, Epi, EventoAuditoria, MovimentacaoEpi, ObraBanco,
+    Tarefa, VersaoTabela,
+)
+from .relatorios import RelatorioMensal
+from .voo_unico import VooUnico
+
+
+# Cria 'quantidade' colaboradores com CPFs sequenciais (apenas para os testes).
+def criar_colaboradores(quantidade, **campos):
+    return [
+        Colaborador.objects.create(
+            nome_completo=campos.get('nome_completo', f'Colaborador {i}'),
+            cpf=f'{i:011d}',
+            funcao=campos.get('funcao', 'Pedreiro'),
+            status=campos.get('status', 'Ativo'),
+        )
+        for i in range(quantidade)
+    ]
+
+
+class PaginacaoCursorTests(TestCase):
+
+    def setUp(self):
+        self.colaboradores = criar_colaboradores(7)
+        # Do mais novo para o mais antigo, a mesma ordem exibida no dashboard.
+        self.ordem = sorted(self.colaboradores, key=lambda c: (c.data_cadastro, c.id), reverse=True)
+
+    def test_navega_para_frente_e_para_tras(self):
+        url = reverse('index')
+        resposta = self.client.get(url, {'tamanho': 3})
+        self.assertEqual(list(resposta.context['colaboradores_lista']), self.ordem[:3])
+        self.assertIsNone(resposta.context['cursor_anterior'])
+
+        resposta = self.client.get(url, {'tamanho': 3, 'apos': resposta.context['cursor_proxima']})
+        self.assertEqual(list(resposta.context['colaboradores_lista']), self.ordem[3:6])
+
+        resposta = self.client.get(url, {'tamanho': 3, 'apos': resposta.context['cursor_proxima']})
+        self.assertEqual(list(resposta.context['colaboradores_lista']), self.ordem[6:])
+        self.assertIsNone(resposta.context['cursor_proxima'])
+
+        resposta = self.client.get(url, {'tamanho': 3, 'antes': resposta.context['cursor_anterior']})
+        self.assertEqual(list(resposta.context['colaboradores_lista']), self.ordem[3:6])
+
+    def test_nao_usa_offset(self):
+        resposta = self.client.get(reverse('index'), {'tamanho': 2})
+        cursor = resposta.context['cursor_proxima']
+        with self.assertNumQueries(2) as consultas:
+            self.client.get(reverse('index'), {'tamanho': 2, 'apos': cursor})
+        for consulta in consultas.captured_queries:
+            self.assertNotIn('OFFSET', consulta['sql'])
+
+    def test_cursor_invalido_volta_para_primeira_pagina(self):
+        resposta = self.client.get(reverse('index'), {'tamanho': 3, 'apos': 'lixo'})
+        self.assertEqual(list(resposta.context['colaboradores_lista']), self.ordem[:3])
+
+
+class PlanoConsultaTests(TestCase):
+    # Roda 'EXPLAIN QUERY PLAN' em todas as consultas que a lista (colaborador_lista)
+    # faz e falha se alguma delas voltar a varrer a tabela de colaboradores inteira
+    # ou a ordenar linhas em uma tabela temporária (sinal de índice faltando).
+
+    def setUp(self):
+        cache.clear()
+        criar_colaboradores(7, funcao='Pedreiro')
+
+    def planos(self, **parametros):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('index'), {'tamanho': 3, **parametros})
+        planos = []
+        with connection.cursor() as cursor:
+            for consulta in consultas.captured_queries:
+                cursor.execute('EXPLAIN QUERY PLAN ' + consulta['sql'])
+                planos.append((consulta['sql'], [linha[3] for linha in cursor.fetchall()]))
+        return resposta, planos
+
+    def assertSemVarreduraNemOrdenacao(self, planos):
+        for sql, plano in planos:
+            for passo in plano:
+                # 'SCAN tabela' sem índice = leitura da tabela inteira. A tabela de
+                # contadores tem uma linha por status, então lê-la toda é esperado.
+                varredura = re.match(r'SCAN colaboradores_colaborador( |$)', passo) and 'INDEX' not in passo
+                self.assertFalse(varredura, f'Varredura completa em:\n{sql}\n{plano}')
+                self.assertNotIn('TEMP B-TREE', passo, f'Ordenação temporária em:\n{sql}\n{plano}')
+
+    def test_paginas_da_lista_usam_indices(self):
+        resposta, planos = self.planos()
+        self.assertSemVarreduraNemOrdenacao(planos)
+        cursor = resposta.context['cursor_proxima']
+        resposta, planos = self.planos(apos=cursor)
+        self.assertSemVarreduraNemOrdenacao(planos)
+        _, planos = self.planos(antes=resposta.context['cursor_anterior'])
+        self.assertSemVarreduraNemOrdenacao(planos)
+
+    def test_paginas_da_pesquisa_usam_indices(self):
+        resposta, planos = self.planos(q='pedreiro')
+        self.assertSemVarreduraNemOrdenacao(planos)
+        resposta, planos = self.planos(q='pedreiro', apos=resposta.context['cursor_proxima'])
+        self.assertSemVarreduraNemOrdenacao(planos)
+        _, planos = self.planos(q='pedreiro', antes=resposta.context['cursor_anterior'])
+        self.assertSemVarreduraNemOrdenacao(planos)
+
+
+class BuscaIndexadaTests(TestCase):
+
+    def setUp(self):
+        self.joao = Colaborador.objects.create(
+            nome_completo='João da Conceição', cpf='12345678901', funcao='Eletricista')
+        self.maria = Colaborador.objects.create(
+            nome_completo='Maria Souza', cpf='98765432100', funcao='Pedreiro')
+
+    def buscar(self, query):
+        resposta = self.client.get(reverse('index'), {'q': query})
+        return list(resposta.context['colaboradores_lista'])
+
+    def test_ignora_acentos_e_maiusculas(self):
+        self.assertEqual(self.buscar('joao'), [self.joao])
+        self.assertEqual(self.buscar('CONCEICAO'), [self.joao])
+        self.assertEqual(self.buscar('eletric'), [self.joao])
+
+    def test_cpf_com_ou_sem_mascara(self):
+        self.assertEqual(self.buscar('123.456'), [self.joao])
+        self.assertEqual(self.buscar('987.654.321-00'), [self.maria])
+        self.assertEqual(self.buscar('98765'), [self.maria])
+
+    def test_indice_acompanha_edicao_e_exclusao(self):
+        self.maria.nome_completo = 'Mariana Simões'
+        self.maria.save()
+        self.assertEqual(self.buscar('simoes'), [self.maria])
+        self.assertEqual(self.buscar('souza'), [])
+
+        self.maria.delete()
+        self.assertEqual(self.buscar('mariana'), [])
+
+    def test_texto_com_operadores_do_fts(self):
+        self.assertEqual(self.buscar('"joao" OR'), [])
+        self.assertEqual(self.buscar('***'), [])
+
+
+class ContadoresStatusTests(TestCase):
+
+    def cards(self, **parametros):
+        contexto = self.client.get(reverse('index'), parametros).context
+        return (contexto['total_colaboradores'], contexto['colaboradores_ativos'],
+                contexto['colaboradores_inativos'])
+
+    def test_contadores_acompanham_cadastro_edicao_e_exclusao(self):
+        colaboradores = criar_colaboradores(3)
+        self.assertEqual(self.cards(), (3, 3, 0))
+
+        colaboradores[0].status = 'Inativo'
+        colaboradores[0].save()
+        self.assertEqual(self.cards(), (3, 2, 1))
+
+        colaboradores[1].delete()
+        Colaborador.objects.filter(id=colaboradores[2].id).update(status='Inativo')
+        self.assertEqual(self.cards(), (2, 0, 2))
+        self.assertEqual(contadores.divergencias(), {})
+
+    def test_dashboard_sem_pesquisa_nao_conta_a_tabela(self):
+        criar_colaboradores(3)
+        with self.assertNumQueries(2) as consultas:
+            self.client.get(reverse('index'))
+        self.assertFalse(any('COUNT(' in c['sql'] for c in consultas.captured_queries))
+
+    def test_pesquisa_usa_uma_unica_agregacao(self):
+        criar_colaboradores(2, funcao='Pedreiro')
+        Colaborador.objects.create(nome_completo='Ana', cpf='99999999999', funcao='Servente', status='Inativo')
+        with self.assertNumQueries(2):
+            self.assertEqual(self.cards(q='servente'), (1, 0, 1))
+
+    def test_comando_reconstroi_e_verifica(self):
+        criar_colaboradores(2)
+        ContadorStatus.objects.filter(status='Ativo').update(total=99)
+        with self.assertRaises(CommandError):
+            call_command('recalcular_contadores', '--apenas-verificar', stdout=io.StringIO(), stderr=io.StringIO())
+        call_command('recalcular_contadores', stdout=io.StringIO())
+        self.assertEqual(self.cards(), (2, 2, 0))
+
+
+class ImportacaoCsvTests(TestCase):
+
+    def importar(self, conteudo, *argumentos):
+        pasta = Path(tempfile.mkdtemp())
+        arquivo = pasta / 'colaboradores.csv'
+        arquivo.write_text(conteudo, encoding='utf-8')
+        call_command('importar_colaboradores', str(arquivo), *argumentos, stdout=io.StringIO())
+        return (pasta / 'colaboradores.csv.rejeitados.csv').read_text(encoding='utf-8')
+
+    def test_importa_em_lotes_com_upsert_pelo_cpf(self):
+        Colaborador.objects.create(nome_completo='Antigo', cpf='12345678901', funcao='Servente')
+        rejeitados = self.importar(
+            'nome_completo,cpf,funcao,status\n'
+            'João Silva,123.456.789-01,Pedreiro,Inativo\n'
+            'Ana Souza,98765432100,Eletricista,\n'
+            'Sem CPF,123,Pedreiro,Ativo\n'
+            'Maria,111.111.111-11,Armador,Demitido\n',
+            '--lote', '1',
+        )
+        self.assertEqual(Colaborador.objects.count(), 2)
+        joao = Colaborador.objects.get(cpf='12345678901')
+        self.assertEqual((joao.nome_completo, joao.status), ('João Silva', 'Inativo'))
+        self.assertEqual(Colaborador.objects.get(cpf='98765432100').status, 'Ativo')
+        self.assertIn('cpf deve ter 11 dígitos', rejeitados)
+        self.assertIn('status inválido: Demitido', rejeitados)
+        self.assertEqual(contadores.divergencias(), {})
+
+
+class ExportacaoTests(TestCase):
+
+    def setUp(self):
+        Colaborador.objects.create(nome_completo='João Silva', cpf='12345678901', funcao='Pedreiro')
+        Colaborador.objects.create(nome_completo='Ana Souza', cpf='98765432100', funcao='Eletricista')
+
+    def baixar(self, **parametros):
+        resposta = self.client.get(reverse('colaborador_exportar'), parametros)
+        self.assertTrue(resposta.streaming)
+        return resposta, b''.join(resposta.streaming_content)
+
+    def test_csv_respeita_pesquisa(self):
+        resposta, conteudo = self.baixar(q='joao')
+        linhas = conteudo.decode('utf-8-sig').splitlines()
+        self.assertEqual(linhas[0], 'id,nome_completo,cpf,funcao,status,obra,data_cadastro')
+        self.assertEqual(len(linhas), 2)
+        self.assertIn('João Silva,12345678901,Pedreiro,Ativo', linhas[1])
+
+    def test_jsonl_comprimido(self):
+        resposta, conteudo = self.baixar(formato='jsonl', gzip='1')
+        self.assertEqual(resposta['Content-Type'], 'application/gzip')
+        registros = [json.loads(l) for l in gzip.decompress(conteudo).decode().splitlines()]
+        self.assertEqual({r['cpf'] for r in registros}, {'12345678901', '98765432100'})
+
+    def test_formato_invalido(self):
+        resposta = self.client.get(reverse('colaborador_exportar'), {'formato': 'xml'})
+        self.assertEqual(resposta.status_code, 400)
+
+
+class ApiColaboradoresTests(TestCase):
+
+    def setUp(self):
+        self.joao = Colaborador.objects.create(nome_completo='João Silva', cpf='12345678901', funcao='Pedreiro')
+        self.url = reverse('colaborador_api')
+
+    def test_projecao_de_campos(self):
+        resposta = self.client.get(self.url, {'fields': 'id,nome_completo'})
+        self.assertEqual(resposta.json()['resultados'], [{'id': self.joao.id, 'nome_completo': 'João Silva'}])
+        self.assertEqual(self.client.get(self.url, {'fields': 'senha'}).status_code, 400)
+
+    def test_etag_responde_304_sem_buscar_linhas(self):
+        etag = self.client.get(self.url, {'q': 'joao'})['ETag']
+        with self.assertNumQueries(1):
+            resposta = self.client.get(self.url, {'q': 'joao'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+
+        # Uma edição muda a versão da tabela, então o ETag antigo deixa de valer.
+        self.joao.funcao = 'Eletricista'
+        self.joao.save()
+        resposta = self.client.get(self.url, {'q': 'joao'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['resultados'][0]['funcao'], 'Eletricista')
+
+
+@override_settings(COLABORADORES_AUDITORIA='sincrono')
+class CacheListaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.joao = Colaborador.objects.create(nome_completo='João Silva', cpf='12345678901', funcao='Pedreiro')
+
+    def test_segunda_leitura_vem_do_cache(self):
+        self.assertEqual(self.client.get(reverse('index'))['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            resposta = self.client.get(reverse('index'))
+        self.assertEqual(resposta['X-Cache'], 'HIT')
+        # A pesquisa é normalizada: "JOÃO " e "joao" são a mesma entrada.
+        self.client.get(reverse('index'), {'q': 'JOÃO '})
+        self.assertEqual(self.client.get(reverse('index'), {'q': 'joao'})['X-Cache'], 'HIT')
+        self.assertEqual(cache_lista.estatisticas()['acertos'], 2)
+
+    def test_nenhuma_pagina_antiga_apos_escrita(self):
+        self.assertContains(self.client.get(reverse('index')), 'Pedreiro')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('colaborador_editar', args=[self.joao.id]), {
+                'nome_completo': 'João Silva', 'cpf': '123.456.789-01',
+                'funcao': 'Eletricista', 'status': 'Inativo',
+            })
+        resposta = self.client.get(reverse('index'))
+        self.assertEqual(resposta['X-Cache'], 'MISS')
+        self.assertContains(resposta, 'Eletricista')
+        self.assertNotContains(resposta, 'Pedreiro')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('colaborador_excluir', args=[self.joao.id]))
+        self.assertContains(self.client.get(reverse('index')), 'Nenhum colaborador encontrado')
+
+
+class VooUnicoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        cache_lista.VOO.esquecer()
+
+    def test_requisicoes_identicas_simultaneas_montam_a_pagina_uma_vez(self):
+        quantidade = 8
+        largada = threading.Barrier(quantidade)
+        respostas = []
+
+        def paginar_lento(*args, **kwargs):
+            time.sleep(0.2)  # tempo para todas as requisições chegarem
+            return paginacao.paginar(*args, **kwargs)
+
+        def pedir(consulta):
+            cliente = self.client_class()
+            largada.wait(5)
+            respostas.append(cliente.get(reverse('index'), {'q': consulta}))
+            connections.close_all()
+
+        with mock.patch.object(views, 'paginar', side_effect=paginar_lento) as paginar:
+            # "Pedreiro", " pedreiro " e "PEDREIRO" são a mesma pesquisa.
+            consultas = ['Pedreiro', ' pedreiro ', 'PEDREIRO']
+            threads = [threading.Thread(target=pedir, args=[consultas[i % 3]]) for i in range(quantidade)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+
+        # Uma única execução da view (e das suas consultas) para as 8 requisições.
+        self.assertEqual(paginar.call_count, 1)
+        self.assertEqual(sorted(r['X-Cache'] for r in respostas), ['COALESCED'] * (quantidade - 1) + ['MISS'])
+        # A mesma página para todas, cada uma com o token CSRF do próprio usuário.
+        paginas = {cache_lista.CAMPO_CSRF.sub(rb'\1\2', r.content) for r in respostas}
+        self.assertEqual(len(paginas), 1)
+        self.assertEqual(len({r.cookies['csrftoken'].value for r in respostas}), quantidade)
+
+    def test_resultado_guardado_por_pouco_tempo_e_memoria_limitada(self):
+        voo = VooUnico(ttl=0.05, maximo=2)
+        contagem = []
+        contar = lambda: contagem.append(1) or len(contagem)
+        self.assertEqual([voo.executar('a', contar), voo.executar('a', contar)], [1, 1])
+        time.sleep(0.06)
+        self.assertEqual(voo.executar('a', contar), 2)
+        # Só as 'maximo' chaves mais recentes ficam guardadas.
+        voo.executar('b', contar)
+        voo.executar('c', contar)
+        self.assertEqual(voo.executar('a', contar), 5)
+        # Uma alteração nos dados descarta tudo o que estava guardado.
+        voo.esquecer()
+        self.assertEqual(voo.executar('c', contar), 6)
+
+
+class FragmentosLinhaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.colaboradores = criar_colaboradores(3, nome_completo="Ana D'Avila")
+
+    def test_linhas_sem_alteracao_nao_sao_renderizadas_de_novo(self):
+        resposta = self.client.get(reverse('index'))
+        self.assertContains(resposta, reverse('colaborador_editar', args=[self.colaboradores[0].id]))
+        # O nome continua escapado para o JavaScript do 'confirm'.
+        self.assertContains(resposta, "excluir Ana D\\u0027Avila?")
+
+        # Outro colaborador mudou: a página sai do cache, mas só a linha dele é renderizada.
+        editado = self.colaboradores[1]
+        editado.funcao = 'Eletricista'
+        editado.save()
+        with mock.patch.object(fragmentos, 'renderizar', wraps=fragmentos.renderizar) as renderizar:
+            resposta = self.client.get(reverse('index'))
+        renderizar.assert_called_once()
+        self.assertEqual([c.id for c in renderizar.call_args.args[0]], [editado.id])
+        self.assertContains(resposta, 'Eletricista')
+
+    def test_acao_em_massa_renderiza_as_linhas_alteradas(self):
+        self.client.get(reverse('index'))
+        self.client.post(reverse('colaborador_acoes_em_massa'), {
+            'acao': 'inativar', 'ids': [c.id for c in self.colaboradores],
+        })
+        resposta = self.client.get(reverse('index'))
+        self.assertContains(resposta, '<td>Inativo</td>', count=3)
+        self.assertNotContains(resposta, '<td>Ativo</td>')
+
+
+class AcoesEmMassaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.colaboradores = criar_colaboradores(6)
+        self.url = reverse('colaborador_acoes_em_massa')
+
+    def comandos(self, consultas, comando):
+        return [c['sql'] for c in consultas.captured_queries if c['sql'].startswith(comando)]
+
+    def test_inativar_selecionados_com_um_unico_update(self):
+        ids = [c.id for c in self.colaboradores[:4]]
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.post(self.url, {'acao': 'inativar', 'ids': ids})
+        self.assertEqual(resposta.json(), {'acao': 'inativar', 'afetados': 4})
+        self.assertEqual(len(self.comandos(consultas, 'UPDATE')), 1)
+        self.assertEqual(contadores.totais()['colaboradores_inativos'], 4)
+        # Quem já está inativo não conta de novo.
+        resposta = self.client.post(self.url, {'acao': 'inativar', 'ids': ids[:2]})
+        self.assertEqual(resposta.json()['afetados'], 0)
+
+    def test_excluir_todos_da_pesquisa(self):
+        Colaborador.objects.create(nome_completo='Ana Souza', cpf='98765432100', funcao='Eletricista')
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.post(self.url, {'acao': 'excluir', 'q': 'pedreiro', 'todos_da_pesquisa': '1'})
+        self.assertEqual(resposta.json()['afetados'], 6)
+        self.assertEqual(len(self.comandos(consultas, 'DELETE')), 1)
+        self.assertEqual(list(Colaborador.objects.values_list('nome_completo', flat=True)), ['Ana Souza'])
+        self.assertEqual(contadores.totais()['total_colaboradores'], 1)
+        # Sem pesquisa, "todos" não é aceito.
+        resposta = self.client.post(self.url, {'acao': 'excluir', 'todos_da_pesquisa': '1'})
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_apagar_sem_ler_as_linhas_e_sem_sinais(self):
+        excluidos = []
+        receptor = lambda sender, instance, **kwargs: excluidos.append(instance.id)
+        post_delete.connect(receptor, sender=Colaborador)
+        self.addCleanup(post_delete.disconnect, receptor, sender=Colaborador)
+        ids = [c.id for c in self.colaboradores[:2]]
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(acoes.apagar(Colaborador.objects.filter(id__in=ids)), 2)
+        self.assertEqual(len(consultas.captured_queries), 1)
+        self.assertTrue(consultas.captured_queries[0]['sql'].startswith('DELETE'))
+        self.assertEqual(excluidos, [])
+        self.assertEqual(Colaborador.objects.count(), 4)
+        self.assertEqual(contadores.divergencias(), {})
+        # Nada a apagar: nenhum comando.
+        with self.assertNumQueries(0):
+            self.assertEqual(acoes.apagar(Colaborador.objects.none()), 0)
+            self.assertEqual(acoes.apagar(Colaborador.objects.filter(id__in=[])), 0)
+
+    def test_exige_post_e_token_csrf(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        cliente = self.client_class(enforce_csrf_checks=True)
+        dados = {'acao': 'ativar', 'ids': [self.colaboradores[0].id]}
+        self.assertEqual(cliente.post(self.url, dados).status_code, 403)
+
+        # A página da lista vinda do cache traz o token do próprio usuário.
+        cliente.get(reverse('index'))
+        resposta = cliente.get(reverse('index'))
+        self.assertEqual(resposta['X-Cache'], 'HIT')
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', resposta.content.decode()).group(1)
+        self.assertEqual(cliente.post(self.url, {**dados, 'csrfmiddlewaretoken': token}).status_code, 200)
+
+    def test_formulario_sem_javascript_volta_para_a_lista(self):
+        resposta = self.client.post(
+            self.url, {'acao': 'inativar', 'ids': [self.colaboradores[0].id], 'q': 'pedreiro'},
+            headers={'Accept': 'text/html'},
+        )
+        self.assertRedirects(resposta, reverse('index') + '?q=pedreiro', fetch_redirect_response=False)
+
+
+class EstaticosTests(TestCase):
+    # collectstatic com o armazenamento de produção (setup/estaticos.py) em uma pasta
+    # temporária, e os arquivos servidos pelo EstaticosMiddleware.
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pasta = tempfile.TemporaryDirectory()
+        cls.configuracao = override_settings(
+            STATIC_ROOT=cls.pasta.name,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'setup.estaticos.ArmazenamentoEstaticos'},
+            },
+            MIDDLEWARE=['setup.estaticos.EstaticosMiddleware', *settings.MIDDLEWARE],
+        )
+        cls.configuracao.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.configuracao.disable()
+        cls.pasta.cleanup()
+
+    def url_do_css(self):
+        pagina = self.client.get(reverse('index')).content.decode()
+        return re.search(r'href="(/static/style\.[0-9a-f]{12}\.css)"', pagina).group(1)
+
+    def test_arquivo_com_hash_e_imutavel_e_pre_compactado(self):
+        url = self.url_do_css()
+        resposta = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(resposta['Content-Encoding'], 'gzip')
+        self.assertEqual(resposta['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(resposta['Vary'], 'Accept-Encoding')
+        self.assertTrue(resposta['Content-Type'].startswith('text/css'))
+        css = gzip.decompress(b''.join(resposta.streaming_content)).decode()
+        # Minificado: sem comentários nem quebras de linha.
+        self.assertNotIn('/*', css)
+        self.assertNotIn('\n', css.strip())
+
+        # Sem suporte a gzip no cliente, vai o arquivo original (minificado).
+        resposta = self.client.get(url)
+        self.assertFalse(resposta.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(resposta.streaming_content).decode(), css)
+
+    def test_arquivo_sem_hash_tem_cache_curto(self):
+        resposta = self.client.get('/static/style.css')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(self.client.get('/static/nao-existe.css').status_code, 404)
+
+    def test_minificar_js_mantem_strings_e_regex(self):
+        codigo = 'let a = "// não é comentário"; // comentário\n    let b = x.replace(/\\d\\/\\//g, "");\n\n'
+        self.assertEqual(
+            estaticos.minificar_js(codigo),
+            'let a = "// não é comentário";\nlet b = x.replace(/\\d\\/\\//g, "");\n',
+        )
+
+
+class ViewsAsyncTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.fabrica = AsyncRequestFactory()
+        self.joao = Colaborador.objects.create(nome_completo='João Silva', cpf='12345678901', funcao='Pedreiro')
+        Colaborador.objects.create(nome_completo='Ana Souza', cpf='98765432100', funcao='Servente', status='Inativo')
+
+    async def test_lista_e_pesquisa(self):
+        resposta = await views_async.colaborador_lista(self.fabrica.get('/', {'q': 'joao'}))
+        self.assertContains(resposta, 'João Silva')
+        self.assertNotContains(resposta, 'Ana Souza')
+
+    async def test_api_detalhe_com_etag(self):
+        requisicao = self.fabrica.get(f'/api/colaboradores/{self.joao.id}/', {'fields': 'nome_completo'})
+        resposta = await views_async.colaborador_api_detalhe(requisicao, id=self.joao.id)
+        self.assertEqual(json.loads(resposta.content), {'nome_completo': 'João Silva'})
+
+        requisicao = self.fabrica.get(f'/api/colaboradores/{self.joao.id}/', {'fields': 'nome_completo'},
+                                      headers={'If-None-Match': resposta['ETag']})
+        resposta = await views_async.colaborador_api_detalhe(requisicao, id=self.joao.id)
+        self.assertEqual(resposta.status_code, 304)
+
+
+class FeedAlteracoesTests(TestCase):
+
+    def setUp(self):
+        self.url = reverse('colaborador_alteracoes')
+        self.ana, self.bia = criar_colaboradores(2)
+
+    def feed(self, **parametros):
+        return self.client.get(self.url, parametros).json()
+
+    def test_cadastro_edicao_e_exclusao_depois_do_cursor(self):
+        inicio = self.feed()
+        self.assertEqual([(i['tipo'], i['id']) for i in inicio['alteracoes']],
+                         [('criado', self.ana.id), ('criado', self.bia.id)])
+        self.assertFalse(inicio['tem_mais'])
+
+        self.ana.funcao = 'Eletricista'
+        self.ana.save()
+        self.client.get(reverse('colaborador_excluir', args=[self.bia.id]))
+        novas = self.feed(since=inicio['cursor'])
+        self.assertEqual([(i['tipo'], i['id']) for i in novas['alteracoes']],
+                         [('alterado', self.ana.id), ('excluido', self.bia.id)])
+        self.assertEqual(novas['alteracoes'][0]['colaborador']['funcao'], 'Eletricista')
+        self.assertIsNone(novas['alteracoes'][1]['colaborador'])
+
+        # Nada mudou desde o último cursor: resposta vazia, mesmo cursor.
+        self.assertEqual(self.feed(since=novas['cursor']), {
+            'alteracoes': [], 'cursor': novas['cursor'], 'tem_mais': False,
+        })
+
+    def test_acoes_em_massa_e_lotes_limitados(self):
+        cursor = self.feed()['cursor']
+        self.client.post(reverse('colaborador_acoes_em_massa'), {'acao': 'inativar', 'ids': [self.ana.id, self.bia.id]})
+
+        # Um item por vez: 'tem_mais' avisa que há outro lote, e o cursor avança.
+        primeiro = self.feed(since=cursor, tamanho=1)
+        self.assertTrue(primeiro['tem_mais'])
+        with self.assertNumQueries(2):
+            segundo = self.feed(since=primeiro['cursor'], tamanho=1)
+        self.assertFalse(segundo['tem_mais'])
+        self.assertEqual(
+            [primeiro['alteracoes'][0]['id'], segundo['alteracoes'][0]['id']], [self.ana.id, self.bia.id]
+        )
+        self.assertEqual(segundo['alteracoes'][0]['colaborador']['status'], 'Inativo')
+
+        self.client.post(reverse('colaborador_acoes_em_massa'), {'acao': 'excluir', 'ids': [self.ana.id]})
+        self.assertEqual([i['tipo'] for i in self.feed(since=segundo['cursor'])['alteracoes']], ['excluido'])
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': '-1'}).status_code, 400)
+
+
+class ArquivoInativosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        *self.antigos, self.recente = criar_colaboradores(4, status='Inativo')
+        self.ativo = Colaborador.objects.create(nome_completo='Ana Ativa', cpf='99999999999', funcao='Pedreiro')
+        # Inativos sem alteração há um ano (o 'recente' mudou agora há pouco).
+        Colaborador.objects.filter(id__in=[c.id for c in self.antigos] + [self.ativo.id]).update(
+            updated_at=timezone.now() - timedelta(days=365),
+        )
+
+    def test_move_inativos_antigos_em_lotes(self):
+        saida = io.StringIO()
+        call_command('arquivar_inativos', '--dias', '180', '--lote', '2', stdout=saida)
+        self.assertIn('3 colaborador(es) arquivado(s)', saida.getvalue())
+        self.assertEqual(
+            sorted(ColaboradorArquivado.objects.values_list('id', flat=True)), [c.id for c in self.antigos]
+        )
+        self.assertEqual(
+            sorted(Colaborador.objects.values_list('id', flat=True)), sorted([self.ativo.id, self.recente.id])
+        )
+        # Contadores e feed acompanham a saída da tabela principal.
+        self.assertEqual(contadores.divergencias(), {})
+        tipos = {i['id']: i['tipo'] for i in self.client.get(reverse('colaborador_alteracoes')).json()['alteracoes']}
+        self.assertEqual(tipos[self.antigos[0].id], 'arquivado')
+
+    def test_cpf_unico_nas_duas_tabelas_e_restauracao(self):
+        arquivo.arquivar(180)
+        cpf = self.antigos[0].cpf
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Colaborador.objects.create(nome_completo='Outro', cpf=cpf, funcao='Pedreiro')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Colaborador.objects.filter(id=self.ativo.id).update(cpf=cpf)
+
+        call_command('arquivar_inativos', '--restaurar', cpf, stdout=io.StringIO())
+        restaurado = Colaborador.objects.get(cpf=cpf)
+        self.assertEqual((restaurado.id, restaurado.data_cadastro), (self.antigos[0].id, self.antigos[0].data_cadastro))
+        self.assertFalse(ColaboradorArquivado.objects.filter(cpf=cpf).exists())
+
+    def test_cpf_arquivado_conferido_fora_do_sqlite(self):
+        # Sem os gatilhos da migração 0009, o 'pre_save' recusa o CPF arquivado.
+        arquivo.arquivar(180)
+        cpf = self.antigos[0].cpf
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            with self.assertRaises(IntegrityError):
+                Colaborador(nome_completo='Outro', cpf=cpf, funcao='Pedreiro').save()
+            self.ativo.cpf = cpf
+            with self.assertRaises(IntegrityError):
+                self.ativo.save()
+            # CPF sem mudança: nenhuma consulta ao arquivo.
+            ativo = Colaborador.objects.get(id=self.ativo.id)
+            with self.assertNumQueries(0):
+                arquivo.conferir_cpf(ativo, 'default')
+
+    def test_pesquisa_inclui_o_arquivo_so_quando_pedido(self):
+        arquivo.arquivar(180)
+        nome = self.antigos[1].nome_completo
+        resposta = self.client.get(reverse('index'), {'q': nome})
+        self.assertNotContains(resposta, 'Arquivados</h3>')
+        resposta = self.client.get(reverse('index'), {'q': nome, 'arquivados': '1'})
+        self.assertContains(resposta, 'Arquivados</h3>')
+        self.assertEqual([c.id for c in resposta.context['arquivados_lista']], [self.antigos[1].id])
+
+
+class EpisTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.colaboradores = criar_colaboradores(3)
+        self.capacete = Epi.objects.create(nome='Capacete', ca='12345')
+        self.luva = Epi.objects.create(nome='Luva de raspa')
+
+    def test_saldo_acompanha_emprestimos_e_devolucoes(self):
+        colab = self.colaboradores[0]
+        epis.emprestar(colab.id, self.capacete.id)
+        epis.emprestar(colab.id, self.luva.id, quantidade=3)
+        self.assertEqual(epis.devolver(colab.id, self.luva.id, quantidade=2), 2)
+        # Só se devolve o que foi emprestado daquele EPI.
+        with self.assertRaises(ValueError):
+            epis.devolver(colab.id, self.capacete.id, quantidade=2)
+        self.assertEqual(
+            [(item['epi__nome'], item['pendentes']) for item in epis.pendentes_por_epi(colab.id)],
+            [('Capacete', 1), ('Luva de raspa', 1)],
+        )
+        self.assertEqual(MovimentacaoEpi.objects.count(), 3)
+        self.assertEqual(epis.divergencias(), {})
+
+    def test_lista_mostra_pendentes_na_mesma_consulta(self):
+        for colab in self.colaboradores:
+            epis.emprestar(colab.id, self.capacete.id, quantidade=2)
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('index'))
+        self.assertContains(resposta, '<td class="epis">2</td>', count=3)
+        # Uma única consulta lê os saldos: a dos colaboradores da página (LEFT JOIN).
+        com_saldo = [c['sql'] for c in consultas.captured_queries if 'saldoepi' in c['sql']]
+        self.assertEqual(len(com_saldo), 1)
+        self.assertIn('LEFT OUTER JOIN', com_saldo[0])
+        self.assertFalse([c for c in consultas.captured_queries if 'movimentacaoepi' in c['sql']])
+
+        # Um empréstimo muda a linha dele (o colaborador em si não mudou).
+        epis.emprestar(self.colaboradores[1].id, self.luva.id)
+        resposta = self.client.get(reverse('index'))
+        self.assertContains(resposta, '<td class="epis">3</td>', count=1)
+
+    def test_rotas_e_historico_mantido_apos_exclusao(self):
+        colab = self.colaboradores[0]
+        url = reverse('epi_movimentar')
+        resposta = self.client.post(url, {'colaborador': colab.id, 'epi': self.capacete.id, 'tipo': 'emprestimo'})
+        self.assertEqual(resposta.json(), {'colaborador_id': colab.id, 'pendentes': 1})
+        resposta = self.client.post(url, {'colaborador': colab.id, 'epi': self.luva.id, 'tipo': 'devolucao'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
+        dados = self.client.get(reverse('colaborador_epis', args=[colab.id])).json()
+        self.assertEqual(dados['epis'], [{'id': self.capacete.id, 'nome': 'Capacete', 'pendentes': 1}])
+
+        # A exclusão em massa continua sendo um único DELETE, e o livro-registro fica.
+        self.client.post(reverse('colaborador_acoes_em_massa'), {'acao': 'excluir', 'ids': [colab.id]})
+        self.assertFalse(Colaborador.objects.filter(id=colab.id).exists())
+        self.assertEqual(MovimentacaoEpi.objects.filter(colaborador_id=colab.id).count(), 1)
+        # Só colaboradores cadastrados (e ativos) recebem EPIs.
+        with self.assertRaises(ValueError):
+            epis.emprestar(colab.id, self.capacete.id)
+
+
+class AdminColaboradoresTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.colaboradores = criar_colaboradores(5)
+        Colaborador.objects.create(nome_completo='João Eletricista', cpf='98765432100', funcao='Eletricista')
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@exemplo.com', 'senha'))
+        self.url = reverse('admin:colaboradores_colaborador_changelist')
+
+    def consultas_colaborador(self, consultas):
+        return [c['sql'] for c in consultas.captured_queries if 'colaboradores_colaborador' in c['sql']]
+
+    def test_lista_sem_contar_a_tabela(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(self.url, {'status__exact': 'Ativo'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['cl'].result_count, 6)
+        # O total vem dos contadores: a única consulta na tabela é a da página,
+        # só com as colunas exibidas.
+        (pagina,) = self.consultas_colaborador(consultas)
+        self.assertNotIn('COUNT(', pagina)
+        self.assertNotIn('"updated_at"', pagina)
+
+    def test_pesquisa_pelo_indice_com_contagem_limitada(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(self.url, {'q': 'joao eletricista'})
+        self.assertEqual([c.nome_completo for c in resposta.context['cl'].result_list], ['João Eletricista'])
+        sql = ' '.join(self.consultas_colaborador(consultas))
+        self.assertIn('MATCH', sql)
+        self.assertIn('LIMIT 10000', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_pesquisa_com_filtro_limita_depois_do_filtro(self):
+        # Os 2 Pedreiros mais antigos estão inativos; com o limite ANTES do filtro, o
+        # índice entregaria só os 2 mais novos (ativos) e a lista ficaria vazia.
+        Colaborador.objects.filter(id__in=[c.id for c in self.colaboradores[:2]]).update(status='Inativo')
+        with mock.patch('colaboradores.admin.LIMITE_CONTAGEM', 2):
+            resposta = self.client.get(self.url, {'q': 'pedreiro', 'status__exact': 'Inativo'})
+            cl = resposta.context['cl']
+            self.assertEqual(cl.result_count, 2)
+            self.assertEqual(sorted(c.id for c in cl.result_list), [c.id for c in self.colaboradores[:2]])
+            # Sem filtro, a contagem continua limitada.
+            self.assertEqual(self.client.get(self.url, {'q': 'pedreiro'}).context['cl'].result_count, 2)
+
+    def test_acao_em_massa_com_um_unico_update(self):
+        ids = [c.id for c in self.colaboradores[:3]]
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.post(self.url, {'action': 'inativar', '_selected_action': ids})
+        self.assertEqual(resposta.status_code, 302)
+        atualizacoes = [sql for sql in self.consultas_colaborador(consultas) if sql.startswith('UPDATE')]
+        self.assertEqual(len(atualizacoes), 1)
+        self.assertEqual(contadores.totais()['colaboradores_inativos'], 3)
+        # A exclusão padrão do admin (um colaborador por vez) não é oferecida.
+        formulario = self.client.get(self.url).context['action_form']
+        self.assertNotIn('delete_selected', [nome for nome, _ in formulario.fields['action'].choices])
+
+
+@override_settings(COLABORADORES_AUDITORIA='sincrono')
+class AuditoriaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.joao = Colaborador.objects.create(nome_completo='João Silva', cpf='12345678901', funcao='Pedreiro')
+
+    def test_historico_de_edicao_e_exclusao(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('colaborador_editar', args=[self.joao.id]), {
+                'nome_completo': 'João Silva', 'cpf': '123.456.789-01',
+                'funcao': 'Pedreiro', 'status': 'Inativo',
+            })
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('colaborador_excluir', args=[self.joao.id]))
+
+        eventos = self.client.get(reverse('colaborador_historico', args=[self.joao.id])).json()['eventos']
+        self.assertEqual([e['acao'] for e in eventos], ['excluido', 'alterado'])
+        self.assertEqual(eventos[1]['alteracoes'], {'status': ['Ativo', 'Inativo']})
+        self.assertEqual((eventos[1]['usuario'], eventos[1]['ip']), ('anônimo', '127.0.0.1'))
+        self.assertEqual(eventos[0]['alteracoes']['cpf'], ['12345678901', None])
+
+    def test_acao_em_massa_gera_um_evento_por_colaborador(self):
+        outros = criar_colaboradores(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('colaborador_acoes_em_massa'), {
+                'acao': 'inativar', 'ids': [c.id for c in outros],
+            })
+        self.assertEqual(
+            EventoAuditoria.objects.filter(acao='alterado', alteracoes={'status': ['Ativo', 'Inativo']}).count(), 3
+        )
+
+    def test_historico_usa_o_indice(self):
+        sql, parametros = auditoria.historico(self.joao.id)[:50].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, parametros)
+            plano = ' '.join(linha[3] for linha in cursor.fetchall())
+        self.assertIn('auditoria_colab_momento_idx', plano)
+        self.assertNotIn('TEMP B-TREE', plano)
+
+
+class FilaEscritaTests(SimpleTestCase):
+    # A fila de gravação em segundo plano, testada com uma função de gravação falsa.
+
+    def setUp(self):
+        self.lotes = []
+        self.liberar = threading.Event()
+        self.gravando = threading.Event()
+
+    def gravar_lento(self, itens):
+        # Segura a thread da fila até o teste liberar, para a fila encher.
+        self.gravando.set()
+        self.liberar.wait(5)
+        self.lotes.append((threading.current_thread().name, list(itens)))
+
+    def encher(self, politica):
+        fila = auditoria.FilaEscrita(self.gravar_lento, tamanho=2, lote=10, politica=politica, espera=0.01)
+        fila.adicionar([0])
+        self.gravando.wait(5)  # a thread pegou o item 0 e está "gravando"
+        return fila
+
+    def test_grava_em_lotes_e_descarrega_ao_encerrar(self):
+        self.liberar.set()
+        fila = auditoria.FilaEscrita(self.gravar_lento, lote=10, espera=0.01)
+        fila.adicionar(range(25))
+        fila.encerrar()
+        itens = [item for _, lote in self.lotes for item in lote]
+        self.assertEqual(itens, list(range(25)))
+        self.assertTrue(all(len(lote) <= 10 for _, lote in self.lotes))
+
+    def test_fila_cheia_descarta(self):
+        fila = self.encher('descartar')
+        with self.assertLogs('colaboradores.auditoria', 'WARNING'):
+            fila.adicionar([1, 2, 3, 4])
+        self.assertEqual(fila.descartados, 2)
+        self.liberar.set()
+        self.assertTrue(fila.descarregar(timeout=5))
+        self.assertEqual(sorted(i for _, lote in self.lotes for i in lote), [0, 1, 2])
+
+    def test_fila_cheia_grava_na_propria_requisicao(self):
+        fila = self.encher('gravar')
+        threading.Timer(0.05, self.liberar.set).start()
+        fila.adicionar([1, 2, 3])
+        self.assertTrue(fila.descarregar(timeout=5))
+        self.assertIn((threading.current_thread().name, [3]), self.lotes)
+        self.assertEqual(sorted(i for _, lote in self.lotes for i in lote), [0, 1, 2, 3])
+
+
+class MetricasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        metricas.limpar()
+        Colaborador.objects.create(nome_completo='João Silva', cpf='12345678901', funcao='Pedreiro')
+
+    def valor(self, texto, linha):
+        return float(re.search(re.escape(linha) + r' (\S+)', texto).group(1))
+
+    def test_histogramas_por_rota_no_formato_prometheus(self):
+        self.client.get(reverse('index'))
+        self.client.get(reverse('index'))  # a segunda vem do cache: nenhuma consulta
+        resposta = self.client.get(reverse('metricas'))
+        self.assertTrue(resposta['Content-Type'].startswith('text/plain; version=0.0.4'))
+        texto = resposta.content.decode()
+        self.assertIn('# TYPE colaboradores_requisicao_duracao_segundos histogram', texto)
+        self.assertEqual(self.valor(texto, 'colaboradores_requisicao_duracao_segundos_count{rota="index"}'), 2)
+        self.assertEqual(self.valor(texto, 'colaboradores_requisicao_consultas_sum{rota="index"}'), 2)
+        self.assertEqual(self.valor(texto, 'colaboradores_requisicao_consultas_bucket{rota="index",le="0"}'), 1)
+        self.assertGreater(self.valor(texto, 'colaboradores_requisicao_template_segundos_sum{rota="index"}'), 0)
+        self.assertGreater(self.valor(texto, 'colaboradores_requisicao_banco_segundos_sum{rota="index"}'), 0)
+
+    async def test_views_assincronas_tambem_sao_medidas(self):
+        # As consultas rodam em outra thread (sync_to_async), mas são somadas à requisição.
+        requisicao = AsyncRequestFactory().get('/')
+        requisicao.resolver_match = resolve('/')
+        await MetricasMiddleware(views_async.colaborador_lista)(requisicao)
+        texto = metricas.exportar()
+        self.assertEqual(self.valor(texto, 'colaboradores_requisicao_consultas_sum{rota="index"}'), 2)
+
+    @override_settings(COLABORADORES_LENTO_MS=0)
+    def test_log_de_requisicoes_lentas_com_sql(self):
+        with self.assertLogs('colaboradores.lentas', 'WARNING') as logs:
+            self.client.get(reverse('index'), {'q': 'joao'})
+        self.assertIn('rota=index', logs.output[0])
+        self.assertIn('colaboradores_colaborador_busca', logs.output[0])
+
+
+class BackendSqliteProducaoTests(TestCase):
+
+    def test_pragmas_e_transacao_immediate(self):
+        from setup.sqlite_producao.base import DatabaseWrapper
+
+        arquivo = Path(tempfile.mkdtemp()) / 'producao.sqlite3'
+        conexao = DatabaseWrapper({**connection.settings_dict, 'NAME': str(arquivo), 'OPTIONS': {
+            'pragmas': {'cache_size': -1024},
+        }}, alias='producao')
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.assertEqual(cursor.fetchone()[0], 'wal')
+                cursor.execute('PRAGMA cache_size')
+                self.assertEqual(cursor.fetchone()[0], -1024)
+            self.assertEqual(conexao.transaction_mode, 'IMMEDIATE')
+        finally:
+            conexao.close()
+
+
+class AquecimentoTests(TestCase):
+
+    def test_aquecer_prepara_todas_as_etapas(self):
+        with self.assertNoLogs('colaboradores.aquecimento', 'WARNING'):
+            duracoes = aquecimento.aquecer()
+        self.assertEqual(set(duracoes), {'rotas', 'templates', 'estaticos', 'banco'})
+        self.assertEqual(aquecimento.ultimo, duracoes)
+        self.assertIsNotNone(connection.connection)
+
+    def test_etapa_com_falha_so_gera_aviso(self):
+        with mock.patch.dict(aquecimento.ETAPAS, {'banco': mock.Mock(side_effect=RuntimeError('sem banco'))}):
+            with self.assertLogs('colaboradores.aquecimento', 'WARNING') as logs:
+                duracoes = aquecimento.aquecer()
+        self.assertIn('banco', duracoes)
+        self.assertIn('"banco"', logs.output[0])
+
+    def test_leitura_do_importtime(self):
+        saida = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:      1500 |       1500 | django.db',
+            'import time:       500 |       2000 |   django',
+            'import time:       250 |        250 | colaboradores.views',
+            benchmark_inicializacao.MARCA,
+            'import time:       750 |        750 | json.decoder',
+        ])
+        antes, depois, por_pacote = benchmark_inicializacao.importacoes(saida)
+        self.assertEqual((antes, depois), (2.25, 0.75))
+        self.assertEqual(dict(por_pacote), {'django': 2.0, 'colaboradores': 0.25})
+
+
+class BenchmarkViewsTests(TestCase):
+
+    def test_massa_sintetica_tem_cpfs_validos_e_unicos(self):
+        self.assertEqual(sintetico.popular(300, lote=128), 300)
+        self.assertEqual(sintetico.popular(300), 0)
+        cpfs = list(Colaborador.objects.values_list('cpf', flat=True))
+        self.assertEqual(len(set(cpfs)), 300)
+        self.assertTrue(all(cpf_util.valido(cpf) for cpf in cpfs))
+        self.assertFalse(cpf_util.valido('111.111.111-11'))
+
+    def test_resultado_em_json_e_verificacao_de_regressao(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            saida = Path(pasta) / 'resultado.json'
+            call_command('benchmark_views', escalas='40', repeticoes=3, saida=saida, stdout=io.StringIO())
+            documento = json.loads(saida.read_text(encoding='utf-8'))
+            resultados = {r['operacao']: r for r in documento['resultados']}
+            self.assertEqual(set(resultados), {
+                'lista', 'lista_pesquisa', 'novo', 'editar', 'excluir', 'admin_lista', 'admin_pesquisa',
+            })
+            self.assertEqual(resultados['lista']['consultas'], 2)
+            self.assertTrue(all(r['erros'] == 0 for r in resultados.values()))
+            # A massa sintética foi desfeita no final.
+            self.assertFalse(Colaborador.objects.exists())
+
+            # Uma base com menos consultas SQL faz a verificação falhar.
+            resultados['lista']['consultas'] = 1
+            saida.write_text(json.dumps(documento), encoding='utf-8')
+            with self.assertRaises(CommandError):
+                call_command('benchmark_views', escalas='40', repeticoes=3, comparar=saida,
+                             tolerancia=100, stdout=io.StringIO(), stderr=io.StringIO())
+
+
+@override_settings(COLABORADORES_SHARDS=['obras_teste_1', 'obras_teste_2'])
+class ObrasShardsTests(TransactionTestCase):
+    # TransactionTestCase: a lista de todas as obras consulta os bancos em outras
+    # threads, que não enxergariam os dados de uma transação não confirmada.
+    databases = {'default', 'obras_teste_1', 'obras_teste_2'}
+
+    def setUp(self):
+        cache.clear()
+        shards.esquecer_mapa()
+        self.addCleanup(shards.esquecer_mapa)
+
+    def criar(self, obra, quantidade, inicio=0, **campos):
+        # Colaboradores da obra, no banco dela, com datas de cadastro espaçadas de 1 minuto.
+        agora = timezone.now()
+        criados = []
+        for i in range(inicio, inicio + quantidade):
+            colaborador = Colaborador(
+                nome_completo=f'{obra or "Sede"} {i}', cpf=f'{i:011d}',
+                funcao=campos.get('funcao', 'Pedreiro'), status=campos.get('status', 'Ativo'), obra=obra,
+            )
+            colaborador.save()
+            Colaborador.objects.using(colaborador._state.db).filter(id=colaborador.id).update(
+                data_cadastro=agora - timedelta(minutes=i),
+            )
+            criados.append(colaborador)
+        return criados
+
+    def mover(self, *argumentos):
+        call_command('rebalancear_obras', *argumentos, '--espera', '0', stdout=io.StringIO())
+
+    def nomes(self, **parametros):
+        resposta = self.client.get(reverse('index'), parametros)
+        return resposta, [colab.nome_completo for colab in resposta.context['colaboradores_lista']]
+
+    def test_obra_gravada_e_listada_so_no_banco_dela(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        self.client.post(reverse('cadastro'), {
+            'nome_completo': 'Ana', 'cpf': '123.456.789-01', 'funcao': 'Servente', 'status': 'Ativo', 'obra': 'Aurora',
+        })
+        ana = Colaborador.objects.using('obras_teste_1').get(cpf='12345678901')
+        # Bloco de ids próprio: não colide com os ids do banco principal.
+        self.assertGreaterEqual(ana.id, shards.BLOCO)
+        self.assertFalse(Colaborador.objects.filter(cpf='12345678901').exists())
+        self.criar('', 3)
+
+        with CaptureQueriesContext(connection) as principal:
+            resposta, nomes = self.nomes(obra='Aurora')
+        self.assertEqual(nomes, ['Ana'])
+        self.assertEqual(resposta.context['total_colaboradores'], 1)
+        # No banco principal, só o saldo de EPIs (nenhuma consulta de colaboradores).
+        self.assertFalse([c for c in principal.captured_queries if 'colaboradores_colaborador' in c['sql']])
+
+        resposta, nomes = self.nomes()
+        self.assertEqual(nomes, ['Sede 0', 'Ana', 'Sede 1', 'Sede 2'])
+        self.assertEqual(resposta.context['total_colaboradores'], 4)
+        self.assertEqual(resposta.context['obras'], ['Aurora'])
+
+        # Edição e exclusão encontram o colaborador no banco da obra.
+        self.assertEqual(self.client.get(reverse('colaborador_editar', args=[ana.id])).status_code, 200)
+        self.client.get(reverse('colaborador_excluir', args=[ana.id]))
+        self.assertFalse(Colaborador.objects.using('obras_teste_1').exists())
+
+    def test_lista_de_todas_as_obras_junta_os_bancos_em_ordem(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        self.mover('--mover', 'Horizonte', '--para', 'obras_teste_2')
+        # Cadastros intercalados entre os três bancos (i = minutos atrás).
+        for i in range(9):
+            self.criar(['', 'Aurora', 'Horizonte'][i % 3], 1, inicio=i, status='Inativo' if i == 4 else 'Ativo')
+        esperado = [f'{["Sede", "Aurora", "Horizonte"][i % 3]} {i}' for i in range(9)]
+
+        paginas, parametros = [], {'tamanho': 4}
+        while True:
+            resposta, nomes = self.nomes(**parametros)
+            paginas += nomes
+            if not resposta.context['cursor_proxima']:
+                break
+            parametros['apos'] = resposta.context['cursor_proxima']
+        self.assertEqual(paginas, esperado)
+        self.assertEqual(resposta.context['colaboradores_inativos'], 1)
+        # Volta uma página a partir da última.
+        _, nomes = self.nomes(tamanho=4, antes=resposta.context['cursor_anterior'])
+        self.assertEqual(nomes, esperado[4:8])
+
+        # Pesquisa nos três bancos, e a de uma obra só no banco dela.
+        resposta, nomes = self.nomes(q='pedreiro', tamanho=4)
+        self.assertEqual(nomes, esperado[:4])
+        self.assertEqual(resposta.context['total_colaboradores'], 9)
+        _, nomes = self.nomes(q='pedreiro', obra='Horizonte')
+        self.assertEqual(nomes, ['Horizonte 2', 'Horizonte 5', 'Horizonte 8'])
+
+    def test_mover_e_dividir_mantem_ids_e_datas(self):
+        aurora = self.criar('Aurora', 3)
+        horizonte = self.criar('Horizonte', 1, inicio=3)
+        datas = dict(Colaborador.objects.values_list('id', 'data_cadastro'))
+
+        self.mover('--mover', 'Aurora', 'Horizonte', '--para', 'obras_teste_1')
+        self.assertFalse(Colaborador.objects.exists())
+        movidos = Colaborador.objects.using('obras_teste_1')
+        self.assertEqual(dict(movidos.values_list('id', 'data_cadastro')), datas)
+        self.assertEqual(dict(ContadorStatus.objects.using('obras_teste_1').values_list('status', 'total')), {'Ativo': 4})
+        self.assertEqual(dict(ObraBanco.objects.values_list('obra', 'banco')),
+                         {'Aurora': 'obras_teste_1', 'Horizonte': 'obras_teste_1'})
+
+        # Divisão: a obra maior fica, a outra vai para o banco novo.
+        self.mover('--dividir', 'obras_teste_1', '--para', 'obras_teste_2')
+        self.assertEqual(list(Colaborador.objects.using('obras_teste_2').values_list('id', flat=True)),
+                         [horizonte[0].id])
+        self.assertEqual(shards.contar_por_obra('obras_teste_1'), {'Aurora': 3})
+
+        # Cada banco numera os novos cadastros no seu bloco: nenhum id repetido.
+        novos = self.criar('Aurora', 1, inicio=10) + self.criar('Horizonte', 1, inicio=11) + self.criar('', 1, inicio=12)
+        ids = [c.id for c in novos] + list(datas)
+        self.assertEqual(len(set(ids)), len(ids))
+
+        # Trocar a obra na edição leva o colaborador (com o mesmo id) para o outro banco.
+        self.client.post(reverse('colaborador_editar', args=[aurora[0].id]), {
+            'nome_completo': 'Trocado', 'cpf': aurora[0].cpf, 'funcao': 'Pedreiro', 'status': 'Ativo',
+            'obra': 'Horizonte',
+        })
+        self.assertEqual(Colaborador.objects.using('obras_teste_2').get(id=aurora[0].id).nome_completo, 'Trocado')
+        self.assertFalse(Colaborador.objects.using('obras_teste_1').filter(id=aurora[0].id).exists())
+
+    # Sem o voo único, a mesma página é montada de novo logo em seguida.
+    @override_settings(COLABORADORES_VOO_UNICO_TTL=0)
+    def test_metricas_somam_as_consultas_de_todos_os_bancos(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        self.criar('', 2)
+        self.criar('Aurora', 2, inicio=2)
+        self.client.get(reverse('index'))  # carrega o mapa de obras
+
+        # Referência: a mesma página com os bancos consultados um depois do outro,
+        # nesta thread, contando as consultas de cada conexão.
+        cache.clear()
+        with mock.patch.object(shards, 'em_paralelo', lambda funcao, itens: [funcao(i) for i in itens]), \
+                CaptureQueriesContext(connections['default']) as principal, \
+                CaptureQueriesContext(connections['obras_teste_1']) as aurora:
+            self.client.get(reverse('index'))
+        esperadas = len(principal.captured_queries) + len(aurora.captured_queries)
+        self.assertGreater(len(aurora.captured_queries), 0)
+
+        cache.clear()
+        metricas.limpar()
+        self.client.get(reverse('index'))
+        somas = metricas.somas('index')
+        self.assertEqual(somas['consultas'], esperadas)
+        self.assertGreater(somas['banco'], 0)
+
+    def test_feed_e_versao_acompanham_os_bancos_das_obras(self):
+        # O TransactionTestCase esvazia as tabelas entre os testes, inclusive a linha de
+        # versão criada pela migração 0004.
+        for banco in shards.bancos():
+            VersaoTabela.objects.using(banco).get_or_create(nome='colaborador')
+        aurora = self.criar('Aurora', 2)
+        url = reverse('colaborador_alteracoes')
+        cursor = self.client.get(url).json()['cursor']
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        # A mudança de banco não é uma exclusão: os colaboradores continuam no feed.
+        dados = self.client.get(url, {'since': cursor}).json()
+        self.assertEqual(sorted((item['id'], item['tipo']) for item in dados['alteracoes']),
+                         [(aurora[0].id, 'alterado'), (aurora[1].id, 'alterado')])
+        self.assertTrue(all(item['colaborador'] for item in dados['alteracoes']))
+
+        # Edição e exclusão no banco da obra entram no feed (do banco principal) e na versão.
+        etag = self.client.get(reverse('colaborador_api'))['ETag']
+        self.client.post(reverse('colaborador_editar', args=[aurora[0].id]), {
+            'nome_completo': 'Editado', 'cpf': aurora[0].cpf, 'funcao': 'Pedreiro', 'status': 'Ativo',
+            'obra': 'Aurora',
+        })
+        self.assertNotEqual(self.client.get(reverse('colaborador_api'))['ETag'], etag)
+        self.client.get(reverse('colaborador_excluir', args=[aurora[1].id]))
+        dados = self.client.get(url, {'since': dados['cursor']}).json()
+        self.assertEqual([(item['id'], item['tipo']) for item in dados['alteracoes']],
+                         [(aurora[0].id, 'alterado'), (aurora[1].id, 'excluido')])
+        self.assertEqual(dados['alteracoes'][0]['colaborador']['nome_completo'], 'Editado')
+        self.assertFalse(Alteracao.objects.using('obras_teste_1').exists())
+
+    def test_exportacao_e_api_incluem_os_bancos_das_obras(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        sede = self.criar('', 1)[0]
+        ana = self.criar('Aurora', 1, inicio=1)[0]
+
+        resposta = self.client.get(reverse('colaborador_exportar'))
+        linhas = b''.join(resposta.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual([linha.split(',')[0] for linha in linhas[1:]], [str(sede.id), str(ana.id)])
+        # A coluna 'obra' diz de qual obra é cada linha.
+        self.assertEqual([linha.split(',')[5] for linha in linhas[1:]], ['', 'Aurora'])
+        resposta = self.client.get(reverse('colaborador_exportar'), {'q': 'aurora'})
+        self.assertEqual(len(b''.join(resposta.streaming_content).splitlines()), 2)
+
+        resultados = self.client.get(reverse('colaborador_api'), {'fields': 'id'}).json()['resultados']
+        self.assertEqual(resultados, [{'id': sede.id}, {'id': ana.id}])
+        com_obra = self.client.get(reverse('colaborador_api'), {'fields': 'id,obra'}).json()['resultados']
+        self.assertEqual(com_obra, [{'id': sede.id, 'obra': ''}, {'id': ana.id, 'obra': 'Aurora'}])
+        detalhe = self.client.get(reverse('colaborador_api_detalhe', args=[ana.id]))
+        self.assertEqual((detalhe.json()['nome_completo'], detalhe.json()['obra']), ('Aurora 1', 'Aurora'))
+
+        # As views assíncronas (ASGI) respondem do mesmo jeito.
+        fabrica = AsyncRequestFactory()
+        resposta = async_to_sync(views_async.colaborador_api)(fabrica.get('/api/colaboradores/', {'fields': 'id'}))
+        self.assertEqual(json.loads(resposta.content)['resultados'], resultados)
+        resposta = async_to_sync(views_async.colaborador_api_detalhe)(fabrica.get('/'), id=ana.id)
+        self.assertEqual(json.loads(resposta.content)['id'], ana.id)
+
+    def test_cpf_unico_entre_os_bancos(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        sede = self.criar('', 1)[0]
+        with self.assertRaises(IntegrityError):
+            shards.salvar(Colaborador(nome_completo='Outro', cpf=sede.cpf, funcao='Pedreiro', obra='Aurora'))
+        self.assertFalse(Colaborador.objects.using('obras_teste_1').exists())
+
+        ana = self.criar('Aurora', 1, inicio=1)[0]
+        ana.cpf = sede.cpf
+        with self.assertRaises(IntegrityError):
+            shards.salvar(ana)
+
+        dados = {'nome_completo': 'Outro', 'cpf': f'{1:011d}', 'funcao': 'Pedreiro', 'status': 'Ativo'}
+        self.assertIn('cpf', ColaboradorForm(data=dados).errors)
+        # Na edição, o CPF do próprio colaborador é aceito.
+        self.assertTrue(ColaboradorForm(data=dados, instance=shards.obter(ana.id)).is_valid())
+
+    def test_arquivo_e_contadores_percorrem_os_bancos(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        ana = self.criar('Aurora', 1, status='Inativo')[0]
+        Colaborador.objects.using('obras_teste_1').filter(id=ana.id).update(
+            updated_at=timezone.now() - timedelta(days=365),
+        )
+        saida = io.StringIO()
+        call_command('arquivar_inativos', '--dias', '180', '--simular', stdout=saida)
+        self.assertIn('1 colaborador(es)', saida.getvalue())
+
+        self.assertEqual(arquivo.arquivar(180), 1)
+        self.assertEqual(ColaboradorArquivado.objects.get(id=ana.id).obra, 'Aurora')
+        self.assertFalse(Colaborador.objects.using('obras_teste_1').exists())
+        tipos = {i['id']: i['tipo'] for i in self.client.get(reverse('colaborador_alteracoes')).json()['alteracoes']}
+        self.assertEqual(tipos[ana.id], 'arquivado')
+
+        # A restauração devolve o colaborador ao banco da obra dele.
+        self.assertEqual(arquivo.restaurar([ana.cpf]), 1)
+        self.assertEqual(Colaborador.objects.using('obras_teste_1').get(id=ana.id).cpf, ana.cpf)
+        self.assertFalse(ColaboradorArquivado.objects.exists())
+
+        saida = io.StringIO()
+        call_command('recalcular_contadores', stdout=saida)
+        self.assertIn('[obras_teste_1] Inativo: 1', saida.getvalue())
+        for banco in shards.bancos():
+            self.assertEqual(contadores.divergencias(banco), {})
+
+    def test_importacao_grava_no_banco_da_obra(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        sede = self.criar('', 1)[0]
+        pasta = Path(tempfile.mkdtemp())
+        caminho = pasta / 'colaboradores.csv'
+        caminho.write_text(
+            'nome_completo,cpf,funcao,obra\n'
+            f'Ana,{2:011d},Servente,Aurora\n'
+            f'Bruno,{3:011d},Pedreiro,\n'
+            f'Mudou de obra,{sede.cpf},Pedreiro,Aurora\n',
+            encoding='utf-8',
+        )
+        call_command('importar_colaboradores', str(caminho), stdout=io.StringIO())
+        self.assertEqual(Colaborador.objects.using('obras_teste_1').get().nome_completo, 'Ana')
+        self.assertEqual(sorted(Colaborador.objects.values_list('nome_completo', flat=True)), ['Bruno', 'Sede 0'])
+        rejeitados = (pasta / 'colaboradores.csv.rejeitados.csv').read_text(encoding='utf-8')
+        self.assertIn('obra em outro banco', rejeitados)
+        # O feed (no banco principal) recebe as linhas gravadas no banco da obra.
+        ids = [i['id'] for i in self.client.get(reverse('colaborador_alteracoes')).json()['alteracoes']]
+        self.assertIn(Colaborador.objects.using('obras_teste_1').get().id, ids)
+
+    def test_epis_de_colaborador_em_outro_banco(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        colab = self.criar('Aurora', 1)[0]
+        capacete = Epi.objects.create(nome='Capacete')
+        self.assertEqual(epis.emprestar(colab.id, capacete.id, quantidade=2), 2)
+        self.assertContains(self.client.get(reverse('index'), {'obra': 'Aurora'}), '<td class="epis">2</td>')
+        self.assertEqual(self.client.get(reverse('colaborador_epis', args=[colab.id])).json()['pendentes'], 2)
+        # Ações em massa valem em todos os bancos.
+        self.client.post(reverse('colaborador_acoes_em_massa'), {'acao': 'inativar', 'ids': [colab.id]})
+        self.assertEqual(Colaborador.objects.using('obras_teste_1').get(id=colab.id).status, 'Inativo')
+
+    def test_acao_em_todos_da_pesquisa_respeita_a_obra(self):
+        self.mover('--mover', 'Aurora', '--para', 'obras_teste_1')
+        self.criar('Aurora', 2)
+        self.criar('Boreal', 2, inicio=2)
+        self.criar('Cerrado', 2, inicio=4)
+        url = reverse('colaborador_acoes_em_massa')
+        # A lista filtrada por uma obra só mostra (e só conta) os dela.
+        self.assertContains(self.client.get(reverse('index'), {'q': 'pedreiro', 'obra': 'Boreal'}),
+                            '<input type="hidden" name="obra" value="Boreal">')
+
+        resposta = self.client.post(url, {'acao': 'inativar', 'q': 'pedreiro', 'obra': 'Boreal',
+                                          'todos_da_pesquisa': '1'})
+        self.assertEqual(resposta.json()['afetados'], 2)
+        inativos = Colaborador.objects.filter(status='Inativo').values_list('obra', flat=True)
+        self.assertEqual(list(inativos), ['Boreal', 'Boreal'])
+        self.assertFalse(Colaborador.objects.using('obras_teste_1').filter(status='Inativo').exists())
+
+        # Obra com banco próprio: só o banco dela é alterado.
+        resposta = self.client.post(url, {'acao': 'excluir', 'q': 'pedreiro', 'obra': 'Aurora',
+                                          'todos_da_pesquisa': '1'})
+        self.assertEqual(resposta.json()['afetados'], 2)
+        self.assertFalse(Colaborador.objects.using('obras_teste_1').exists())
+        self.assertEqual(Colaborador.objects.count(), 4)
+
+
+class TarefasTests(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = override_settings(COLABORADORES_TAREFAS_DIR=pasta.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.colab = criar_colaboradores(3)[0]
+        for numero in (3, 4):
+            Colaborador.objects.create(nome_completo=f'Colaborador {numero}', cpf=f'{numero:011d}',
+                                       funcao='Servente', status='Inativo')
+        epis.emprestar(self.colab.id, Epi.objects.create(nome='Capacete').id, quantidade=2)
+        self.mes = timezone.localdate().strftime('%Y-%m')
+
+    def conteudo(self, tarefa):
+        with zipfile.ZipFile(tarefas.caminho_arquivo(tarefa)) as pacote:
+            return (pacote.read('quadro.csv').decode('utf-8-sig').splitlines(),
+                    pacote.read('resumo.csv').decode('utf-8-sig').splitlines())
+
+    def test_retoma_do_checkpoint_depois_de_uma_queda(self):
+        tarefa = tarefas.criar('relatorio_mensal', {'mes': self.mes})
+        self.assertEqual(tarefas.reservar('a').id, tarefa.id)
+        self.assertIsNone(tarefas.reservar('b'))
+
+        # O processo "cai" depois de escrever o 2º lote, antes do checkpoint dele.
+        processar = RelatorioMensal.processar
+        chamadas = []
+
+        def processar_e_cair(trabalho, checkpoint, lote):
+            resultado = processar(trabalho, checkpoint, lote)
+            chamadas.append(1)
+            if len(chamadas) == 2:
+                raise KeyboardInterrupt
+            return resultado
+
+        with mock.patch.object(RelatorioMensal, 'processar', processar_e_cair):
+            with self.assertRaises(KeyboardInterrupt):
+                tarefas.executar(tarefa.id, 'a', lote=2)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.estado, tarefa.processados, tarefa.total), ('executando', 2, 5))
+
+        # Sem sinal de vida, outro executor retoma do checkpoint.
+        Tarefa.objects.update(sinal_em=timezone.now() - tarefas.ABANDONO - timedelta(seconds=1))
+        self.assertEqual(tarefas.reservar('b').tentativas, 2)
+        self.assertEqual(tarefas.executar(tarefa.id, 'b', lote=2), 'concluida')
+        self.assertFalse(tarefas._gravar(tarefa, 'a', processados=0))
+
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.processados, 5)
+        quadro, resumo = self.conteudo(tarefa)
+        # Sem linhas repetidas: o que o lote interrompido escreveu foi descartado.
+        self.assertEqual(len(quadro), 6)
+        self.assertEqual(len({linha.split(',')[0] for linha in quadro[1:]}), 5)
+        self.assertIn(f'{self.colab.id},Colaborador 0,00000000000,Pedreiro,Ativo,,', quadro[1])
+        self.assertTrue(quadro[1].endswith(',sim,2'))
+        self.assertEqual(resumo[1:], ['Pedreiro,3,3,0,3,1,2', 'Servente,2,0,2,2,0,0', 'TOTAL,5,3,2,5,1,2'])
+
+    def test_tentativas_esgotadas_marcam_falha(self):
+        tarefa = tarefas.criar('relatorio_mensal', {'mes': self.mes})
+        parcial = tarefas.pasta() / f'tarefa-{tarefa.id}.csv'
+        parcial.write_bytes(b'parcial')
+        Tarefa.objects.update(estado='executando', tentativas=tarefas.MAX_TENTATIVAS,
+                              sinal_em=timezone.now() - tarefas.ABANDONO - timedelta(seconds=1))
+        self.assertIsNone(tarefas.reservar('a'))
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.estado, 'falhou')
+        self.assertFalse(parcial.exists())
+
+    def test_falha_apaga_o_arquivo_parcial(self):
+        tarefa = tarefas.criar('relatorio_mensal', {'mes': self.mes})
+        tarefas.reservar('a')
+        with mock.patch.object(RelatorioMensal, 'finalizar', side_effect=OSError('disco cheio')), \
+                self.assertLogs('colaboradores.tarefas', 'ERROR'):
+            self.assertEqual(tarefas.executar(tarefa.id, 'a', lote=2), 'falhou')
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.estado, tarefa.erro), ('falhou', 'OSError: disco cheio'))
+        self.assertEqual(list(tarefas.pasta().iterdir()), [])
+
+    def test_checkpoint_guarda_o_banco_pelo_nome(self):
+        tarefa = tarefas.criar('relatorio_mensal', {'mes': self.mes})
+        trabalho = RelatorioMensal(tarefa, tarefas.pasta())
+        checkpoint, _ = trabalho.iniciar()
+        checkpoint, quantidade = trabalho.processar(checkpoint, 2)
+        self.assertEqual((checkpoint['banco'], checkpoint['ultimo_id'], quantidade), ('default', self.colab.id + 1, 2))
+        while quantidade:
+            checkpoint, quantidade = trabalho.processar(checkpoint, 2)
+        self.assertEqual((checkpoint['banco'], checkpoint['concluidos']), (None, ['default']))
+
+    def test_criar_acompanhar_e_baixar_pelas_views(self):
+        resposta = self.client.post(reverse('tarefa_criar'), {'tipo': 'relatorio_mensal', 'mes': '10/2026'})
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.client.post(reverse('tarefa_criar'), {'tipo': 'relatorio_mensal', 'mes': self.mes})
+        self.assertEqual(resposta.status_code, 202)
+        progresso = self.client.get(resposta.json()['progresso_url'])
+        self.assertEqual(progresso.json()['estado'], 'pendente')
+        self.assertIn('no-cache', progresso['Cache-Control'])
+        tarefa_id = progresso.json()['id']
+        self.assertEqual(self.client.get(reverse('tarefa_arquivo', args=[tarefa_id])).status_code, 404)
+
+        saida = io.StringIO()
+        call_command('executar_tarefas', '--processos', '0', '--uma-vez', stdout=saida)
+        self.assertIn(f'#{tarefa_id} (relatorio_mensal): concluida', saida.getvalue())
+        dados = self.client.get(reverse('tarefa_progresso', args=[tarefa_id])).json()
+        self.assertEqual((dados['estado'], dados['percentual'], dados['processados']), ('concluida', 100.0, 5))
+        arquivo = self.client.get(dados['arquivo_url'])
+        self.assertIn('attachment', arquivo['Content-Disposition'])
+        self.assertTrue(b''.join(arquivo.streaming_content).startswith(b'PK'))
+        arquivo.close()
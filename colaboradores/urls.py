@@ -1,9 +1,42 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, views_async
+
+# Quando o projeto é servido via ASGI (COLABORADORES_ASYNC ligado, ver setup/asgi.py),
+# as rotas de leitura (lista/pesquisa e API) usam as views assíncronas.
+leitura = views_async if settings.COLABORADORES_ASYNC else views
 
 urlpatterns = [
     # Read (Listar)
-    path('', views.colaborador_lista, name='index'), 
+    path('', leitura.colaborador_lista, name='index'), 
+
+    # Exportar a lista (CSV ou JSON Lines), com o mesmo filtro 'q' da lista
+    path('exportar/', views.colaborador_exportar, name='colaborador_exportar'),
+
+    # API JSON somente leitura (mesma pesquisa da lista, com ETag / 304)
+    path('api/colaboradores/', leitura.colaborador_api, name='colaborador_api'),
+    path('api/colaboradores/<int:id>/', leitura.colaborador_api_detalhe, name='colaborador_api_detalhe'),
+
+    # Feed de alterações desde um cursor (sincronização incremental)
+    path('api/colaboradores/alteracoes/', views.colaborador_alteracoes, name='colaborador_alteracoes'),
+
+    # Histórico de alterações (auditoria) de um colaborador
+    path('api/colaboradores/<int:id>/historico/', views.colaborador_historico, name='colaborador_historico'),
+
+    # EPIs pendentes de um colaborador, e o registro de empréstimos/devoluções (POST)
+    path('api/colaboradores/<int:id>/epis/', views.colaborador_epis, name='colaborador_epis'),
+    path('epis/movimentar/', views.epi_movimentar, name='epi_movimentar'),
+
+    # Tarefas em segundo plano: criar (POST), acompanhar o progresso e baixar o arquivo
+    path('tarefas/', views.tarefa_criar, name='tarefa_criar'),
+    path('tarefas/<int:id>/', views.tarefa_progresso, name='tarefa_progresso'),
+    path('tarefas/<int:id>/arquivo/', views.tarefa_arquivo, name='tarefa_arquivo'),
+
+    # Estatísticas (acertos/falhas) do cache da página de lista
+    path('cache/estatisticas/', views.cache_estatisticas, name='cache_estatisticas'),
+
+    # Métricas de desempenho por rota (formato de texto do Prometheus)
+    path('metrics', views.exportar_metricas, name='metricas'),
     
     # Create (Cadastrar)
     path('cadastro/', views.colaborador_novo, name='cadastro'),
@@ -13,4 +46,7 @@ urlpatterns = [
     
     # Delete (Excluir) - NOVA LINHA
     path('excluir/<int:id>/', views.colaborador_excluir, name='colaborador_excluir'),
+
+    # Ações em massa (ativar / inativar / excluir os selecionados), via POST
+    path('acoes-em-massa/', views.colaborador_acoes_em_massa, name='colaborador_acoes_em_massa'),
 ]
\ No newline at end of file
@@ -0,0 +1,66 @@
+# Validador de Cache HTTP (ETag / Last-Modified)
+# ==============================================
+# Fornece uma "impressão digital" barata do estado da tabela de colaboradores.
+# Se a versão não mudou desde a última consulta do cliente, a API responde
+# 304 (Not Modified) sem buscar nenhuma linha.
+#
+# Com as obras em bancos separados (shards.py), cada banco tem a sua linha de versão
+# (os gatilhos da migração 0004 existem em todos): a versão é a soma delas, que
+# muda sempre que qualquer banco muda, e a data é a mais recente.
+
+from django.db import connection
+from django.db.models import Count, Max
+
+from . import shards
+from .models import Colaborador, VersaoTabela
+
+AGREGACAO = {'ultimo_id': Max('id'), 'ultima_data': Max('data_cadastro'), 'total': Count('id')}
+
+
+def _versoes(linhas):
+    # Junta as linhas (versao, atualizado_em) de cada banco.
+    return sum(versao for versao, _ in linhas), max((data for _, data in linhas if data), default=None)
+
+
+def _resumos(resumos):
+    # Junta as agregações do fallback de cada banco.
+    ultimo_id = max(resumo['ultimo_id'] or 0 for resumo in resumos)
+    total = sum(resumo['total'] for resumo in resumos)
+    ultima_data = max((resumo['ultima_data'] for resumo in resumos if resumo['ultima_data']), default=None)
+    return f'{ultimo_id}-{total}', ultima_data
+
+
+def atual():
+    # Retorna a tupla (versao, atualizado_em) da tabela de colaboradores.
+    # No SQLite, é uma leitura de UMA linha (por banco) mantida pelos gatilhos da migração 0004.
+    if connection.vendor == 'sqlite':
+        linhas = [
+            VersaoTabela.objects.using(banco).filter(nome='colaborador').values_list('versao', 'atualizado_em').first()
+            for banco in shards.bancos()
+        ]
+        if None not in linhas:
+            return _versoes(linhas)
+    # Fallback (outros bancos, ou a linha de versão ainda não existe): maior id,
+    # maior data de cadastro e quantidade de linhas, numa única agregação por banco.
+    # [NOTA] Este fallback não percebe edições que não mudam essas três informações.
+    return _resumos([Colaborador.objects.using(banco).aggregate(**AGREGACAO) for banco in shards.bancos()])
+
+
+def da_requisicao(request):
+    # Lê a versão uma única vez por requisição (o ETag e o Last-Modified usam o mesmo valor).
+    if not hasattr(request, '_versao_colaboradores'):
+        request._versao_colaboradores = atual()
+    return request._versao_colaboradores
+
+
+async def aatual():
+    # Versão assíncrona de 'atual' (ORM assíncrono: 'afirst' / 'aaggregate').
+    if connection.vendor == 'sqlite':
+        linhas = [
+            await VersaoTabela.objects.using(banco).filter(nome='colaborador')
+            .values_list('versao', 'atualizado_em').afirst()
+            for banco in shards.bancos()
+        ]
+        if None not in linhas:
+            return _versoes(linhas)
+    return _resumos([await Colaborador.objects.using(banco).aaggregate(**AGREGACAO) for banco in shards.bancos()])
@@ -5,16 +5,37 @@
 # 'get_object_or_404': Função útil que tenta buscar um objeto no banco de dados; 
 #                      se não encontrar, levanta automaticamente um erro HTTP 404 (Not Found).
 from django.shortcuts import render, redirect, get_object_or_404 
+# 'reverse': monta a URL a partir do nome da rota; 'urlencode': monta a parte '?q=...'.
+from django.urls import reverse
+from django.utils.http import urlencode
+# 'StreamingHttpResponse': resposta enviada em pedaços (usada na exportação).
+# 'HttpResponseBadRequest': resposta de erro 400 para parâmetros inválidos.
+# 'JsonResponse': resposta em JSON (usada nas estatísticas do cache).
+# 'FileResponse': envia um arquivo do disco (o relatório gerado por uma tarefa).
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+# 'never_cache': impede o navegador de guardar a resposta (o progresso muda a cada consulta).
+from django.views.decorators.cache import never_cache
+# 'condition': decorador que responde 304 (Not Modified) usando ETag / Last-Modified.
+# 'require_POST': decorador que só aceita o método POST (responde 405 aos outros).
+from django.views.decorators.http import condition, require_POST
 # Importa o modelo 'Colaborador' definido no arquivo models.py deste mesmo app.
-from .models import Colaborador
-# Importa o objeto 'Q', que permite construir consultas complexas ao banco de dados 
-# usando operadores lógicos como OR (|) e AND (&). Usado na pesquisa.
-from django.db.models import Q
+from .models import Colaborador, Tarefa
+# Importa os módulos auxiliares: ações em massa, API JSON, busca indexada (FTS5), cache
+# da lista, contadores dos cards de estatística, empréstimos de EPIs, exportação em streaming
+# tarefas em segundo plano e versão da tabela.
+from . import acoes, api, arquivo, auditoria, busca, cache_lista, contadores, epis, exportacao, feed, fragmentos, metricas, shards, tarefas, versao
+# Importa as funções de CPF com outro nome para não conflitar com a variável local 'cpf'.
+from . import cpf as cpf_util
+# Importa as funções de paginação por cursor (keyset) definidas em paginacao.py.
+from .paginacao import paginar, tamanho_pagina
 
 # View (Função) para a página de LISTA de Colaboradores (index.html)
 # =================================================================
 # Esta função é chamada quando uma requisição chega para a URL associada a ela (geralmente a raiz '/').
 # O parâmetro 'request' contém informações sobre a requisição HTTP (método, dados GET/POST, etc.).
+# O decorador '@cache_lista.em_cache' guarda o HTML pronto de cada pesquisa/página;
+# o cache é invalidado automaticamente a cada cadastro, edição ou exclusão (ver signals.py).
+@cache_lista.em_cache
 def colaborador_lista(request):
     
     # Lógica de Pesquisa
@@ -23,23 +44,16 @@ def colaborador_lista(request):
     # request.GET é um dicionário com os parâmetros GET. 
     # .get('q', '') busca a chave 'q'; se não existir, retorna uma string vazia ''.
     query = request.GET.get('q', '')
+    # Obra ('?obra='): mostra só os colaboradores daquele canteiro.
+    obra = request.GET.get('obra', '').strip()
     
     # Se 'query' não estiver vazia (o usuário pesquisou algo)...
     if query:
-        # Filtra os objetos Colaborador no banco de dados.
-        # Colaborador.objects acessa o "manager" do modelo, que permite fazer consultas.
-        # .filter() cria uma consulta WHERE no SQL.
-        # Q(...) permite combinar condições:
-        #   - nome_completo__icontains=query: Busca onde 'nome_completo' CONTÉM (ignorando maiúsc./min.) o texto da 'query'.
-        #   - cpf__icontains=query: Busca onde 'cpf' CONTÉM o texto da 'query'.
-        #   - funcao__icontains=query: Busca onde 'funcao' CONTÉM o texto da 'query'.
-        #   - O operador | significa OR (OU).
+        # Filtra os objetos Colaborador usando o índice de busca (ver busca.py).
+        # A busca ignora acentos e maiúsculas ("Joao" encontra "João") e aceita o
+        # CPF com ou sem máscara ("123.456" encontra "12345678901").
         # .order_by('-data_cadastro'): Ordena os resultados pela data de cadastro, do mais novo para o mais antigo ('-' indica ordem decrescente).
-        colaboradores = Colaborador.objects.filter(
-            Q(nome_completo__icontains=query) |
-            Q(cpf__icontains=query) |
-            Q(funcao__icontains=query)
-        ).order_by('-data_cadastro')
+        colaboradores = busca.filtrar(Colaborador.objects.all(), query).order_by('-data_cadastro')
     # Senão (se 'query' estiver vazia, ou seja, sem pesquisa)...
     else:
         # Busca TODOS os objetos Colaborador no banco de dados.
@@ -48,26 +62,64 @@ def colaborador_lista(request):
     
     # Lógica dos Cards de Estatística
     # -------------------------------
-    # Conta o número total de colaboradores encontrados (seja na pesquisa ou todos).
-    total_colaboradores = colaboradores.count()
-    # Filtra os colaboradores encontrados para pegar apenas os com status 'Ativo' e conta quantos são.
-    colaboradores_ativos = colaboradores.filter(status='Ativo').count()
-    # Calcula os inativos subtraindo os ativos do total.
-    colaboradores_inativos = total_colaboradores - colaboradores_ativos
+    # [IMPORTANTE] Sem pesquisa, os números vêm prontos da tabela de resumo
+    # 'ContadorStatus' (mantida pelo banco a cada cadastro/edição/exclusão), então
+    # não é preciso contar a tabela inteira. Com pesquisa, uma única consulta de
+    # agregação calcula total e ativos de uma vez (ver contadores.py).
+    # Os inativos são calculados subtraindo os ativos do total.
+    #
+    # Paginação por Cursor
+    # --------------------
+    # [IMPORTANTE] Em vez de mandar TODOS os colaboradores para o template, busca
+    # apenas uma página limitada. Os parâmetros 'apos' e 'antes' carregam o cursor
+    # (data_cadastro, id) da página atual, e 'tamanho' define quantas linhas exibir.
+    # A pesquisa ('query') também é aplicada aqui, de forma limitada à página.
+    tamanho = tamanho_pagina(request.GET.get('tamanho'))
+    incluir_arquivados = request.GET.get('arquivados') == '1'
+    if obra or shards.ativo():
+        # Obras em bancos separados (ver shards.py): a lista de uma obra consulta só
+        # o banco dela; a de todas as obras consulta os bancos em paralelo e junta
+        # os cards e as páginas.
+        estatisticas, pagina = shards.listar(
+            query, obra, apos=request.GET.get('apos'), antes=request.GET.get('antes'), tamanho=tamanho,
+        )
+    else:
+        estatisticas = contadores.totais(colaboradores if query else None)
+        # '.select_related('saldo_epi')': os EPIs pendentes de cada colaborador vêm na
+        # MESMA consulta (LEFT JOIN pela chave de 'SaldoEpi'), sem uma consulta por linha.
+        pagina = paginar(
+            Colaborador.objects.select_related('saldo_epi'),
+            apos=request.GET.get('apos'),
+            antes=request.GET.get('antes'),
+            tamanho=tamanho,
+            query=query,
+        )
 
     # Preparação do Contexto para o Template
     # -------------------------------------
     # 'context' é um dicionário Python. As chaves deste dicionário se tornarão
     # variáveis acessíveis dentro do template HTML (index.html).
     context = {
-        # A chave 'colaboradores_lista' receberá o QuerySet (lista) de colaboradores.
-        'colaboradores_lista': colaboradores,
-        # As outras chaves receberão os valores calculados para os cards.
-        'total_colaboradores': total_colaboradores,
-        'colaboradores_ativos': colaboradores_ativos,
-        'colaboradores_inativos': colaboradores_inativos,
+        # A chave 'colaboradores_lista' recebe apenas as linhas da página atual.
+        'colaboradores_lista': pagina['linhas'],
+        # HTML de cada linha da tabela, vindo do cache por colaborador quando possível
+        # (ver fragmentos.py): só as linhas de quem mudou são renderizadas de novo.
+        'linhas_tabela': fragmentos.linhas(pagina['linhas']),
+        # Pesquisa também no arquivo de inativos (arquivo.py), se pedido com '?arquivados=1'.
+        'incluir_arquivados': incluir_arquivados,
+        'arquivados_lista': arquivo.buscar(query) if query and incluir_arquivados else [],
+        # Cursores para os links "Anterior" / "Próxima" (None quando não há página).
+        'cursor_anterior': pagina['cursor_anterior'],
+        'cursor_proxima': pagina['cursor_proxima'],
+        'tamanho_pagina': tamanho,
+        # As outras chaves receberão os valores calculados para os cards
+        # ('total_colaboradores', 'colaboradores_ativos', 'colaboradores_inativos').
+        **estatisticas,
         # Envia a 'query' de volta para preencher o campo de busca no HTML.
-        'search_query': query 
+        'search_query': query,
+        # A obra filtrada e as obras conhecidas (sugestões do campo de obra).
+        'obra': obra,
+        'obras': sorted(shards.mapa()),
     }
     # Renderização do Template
     # ------------------------
@@ -79,6 +131,214 @@ def colaborador_lista(request):
     return render(request, 'index.html', context)
 
 
+# View (Função) para EXPORTAR a lista de Colaboradores (CSV ou JSON Lines)
+# =======================================================================
+# Chamada para a URL '/exportar/'. Aceita os parâmetros GET:
+#   - q: o mesmo filtro de pesquisa da lista (opcional);
+#   - formato: 'csv' (padrão) ou 'jsonl';
+#   - gzip: '1' para receber o arquivo compactado (.gz).
+# [IMPORTANTE] A resposta é enviada em streaming: as linhas são lidas do banco e
+# escritas na resposta aos poucos, então a memória usada não cresce com o
+# tamanho da lista (ver exportacao.py).
+def colaborador_exportar(request):
+    query = request.GET.get('q', '')
+    formato = request.GET.get('formato', 'csv')
+    if formato not in exportacao.FORMATOS:
+        return HttpResponseBadRequest('Formato inválido. Use "csv" ou "jsonl".')
+
+    # Aplica o mesmo filtro de pesquisa usado em 'colaborador_lista', em cada banco
+    # (com as obras em bancos separados, ver shards.py; senão, só o principal).
+    querysets = []
+    for banco in shards.bancos():
+        colaboradores = Colaborador.objects.using(banco)
+        if query:
+            colaboradores = busca.filtrar(colaboradores, query)
+        querysets.append(colaboradores)
+
+    content_type, extensao = exportacao.FORMATOS[formato]
+    conteudo = exportacao.gerar(querysets, formato)
+    nome_arquivo = f'colaboradores.{extensao}'
+    if request.GET.get('gzip') == '1':
+        conteudo = exportacao.comprimir(conteudo)
+        content_type = 'application/gzip'
+        nome_arquivo += '.gz'
+
+    # 'StreamingHttpResponse' recebe um gerador e envia cada pedaço assim que ele é produzido.
+    resposta = StreamingHttpResponse(conteudo, content_type=content_type)
+    # 'Content-Disposition: attachment' faz o navegador baixar o arquivo em vez de exibi-lo.
+    resposta['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    return resposta
+
+
+# Funções auxiliares da API: ETag e Last-Modified
+# ===============================================
+# Usadas pelo decorador '@condition' do Django. Ele chama estas funções ANTES da
+# view: se o cliente enviar 'If-None-Match' / 'If-Modified-Since' e a versão da
+# tabela não tiver mudado, o Django responde 304 direto, sem executar a view.
+def _api_etag(request, *args, **kwargs):
+    versao_atual, _ = versao.da_requisicao(request)
+    return api.etag(request, versao_atual)
+
+
+def _api_ultima_alteracao(request, *args, **kwargs):
+    _, atualizado_em = versao.da_requisicao(request)
+    return atualizado_em
+
+
+# View (Função) da API JSON somente leitura de Colaboradores
+# ==========================================================
+# Chamada para a URL '/api/colaboradores/'. Aceita os mesmos parâmetros da lista
+# ('q', 'tamanho', 'apos', 'antes') e também:
+#   - fields: lista de campos separados por vírgula (ex: ?fields=id,nome_completo).
+#     O banco busca apenas as colunas pedidas (mais a data/id usados no cursor).
+@condition(etag_func=_api_etag, last_modified_func=_api_ultima_alteracao)
+def colaborador_api(request):
+    campos, erro = api.campos_pedidos(request)
+    if erro:
+        return erro
+
+    # '.only(...)' gera um SELECT apenas com as colunas necessárias.
+    colaboradores = Colaborador.objects.only(*campos, 'id', 'data_cadastro')
+    # Com obras em bancos separados, a página junta os bancos (ver shards.py).
+    pagina = (shards.paginar if shards.ativo() else paginar)(
+        colaboradores,
+        apos=request.GET.get('apos'),
+        antes=request.GET.get('antes'),
+        tamanho=tamanho_pagina(request.GET.get('tamanho')),
+        query=request.GET.get('q', ''),
+    )
+    return api.resposta_pagina(pagina, campos)
+
+
+# View (Função) de DETALHE da API JSON
+# ====================================
+# Chamada para URLs como '/api/colaboradores/5/'. Retorna um único colaborador
+# (404 se não existir), também com '?fields=' e ETag / Last-Modified.
+@condition(etag_func=_api_etag, last_modified_func=_api_ultima_alteracao)
+def colaborador_api_detalhe(request, id):
+    campos, erro = api.campos_pedidos(request)
+    if erro:
+        return erro
+    # Procura em todos os bancos (ver shards.py); sem obras separadas, só no principal.
+    colaborador = shards.obter_ou_404(id, Colaborador.objects.only(*campos))
+    return api.json_compacto(api.serializar(colaborador, campos))
+
+
+# View (Função) com as estatísticas do cache da lista
+# ===================================================
+# Chamada para a URL '/cache/estatisticas/'. Retorna em JSON quantas vezes a
+# página de lista foi servida do cache (acertos) ou renderizada (falhas).
+def cache_estatisticas(request):
+    return JsonResponse(cache_lista.estatisticas())
+
+
+# Histórico (auditoria) de um colaborador, em JSON
+# ================================================
+# Os eventos mais recentes primeiro ('?tamanho=' limita a quantidade, como na API).
+# Funciona também para colaboradores já excluídos: o histórico não é apagado.
+def colaborador_historico(request, id):
+    eventos = auditoria.historico(id)[:tamanho_pagina(request.GET.get('tamanho'))]
+    return api.json_compacto({
+        'colaborador_id': id,
+        'eventos': [
+            {
+                'acao': evento.acao,
+                'alteracoes': evento.alteracoes,
+                'usuario': evento.usuario,
+                'ip': evento.ip,
+                'momento': evento.momento.isoformat(),
+            }
+            for evento in eventos
+        ],
+    })
+
+
+# Feed de alterações (sincronização incremental), em JSON
+# ======================================================
+# '?since=<cursor>' devolve só os cadastros, edições e exclusões depois do cursor,
+# em lotes de até '?tamanho=' itens (padrão 500). O sistema que sincroniza guarda o
+# 'cursor' da resposta e o envia no próximo pedido; 'tem_mais' indica que já há
+# outro lote esperando. Sem 'since', começa do início (carga inicial completa).
+def colaborador_alteracoes(request):
+    try:
+        desde = int(request.GET.get('since') or 0)
+        if desde < 0:
+            raise ValueError
+    except ValueError:
+        return api.json_compacto({'erro': 'O parâmetro since deve ser um cursor (número inteiro).'}, status=400)
+    return api.json_compacto(feed.alteracoes(desde, feed.tamanho_lote(request.GET.get('tamanho'))))
+
+
+# Empréstimo / devolução de EPIs, via POST
+# ========================================
+# Recebe 'colaborador', 'epi' (os ids), 'tipo' ('emprestimo' ou 'devolucao') e
+# 'quantidade' (padrão 1). Grava a movimentação no livro-registro e responde em JSON
+# com o novo saldo de EPIs pendentes do colaborador (ver epis.py), ou 400 com o erro.
+@require_POST
+def epi_movimentar(request):
+    try:
+        colaborador_id = int(request.POST.get('colaborador', ''))
+        epi_id = int(request.POST.get('epi', ''))
+        quantidade = int(request.POST.get('quantidade') or 1)
+    except ValueError:
+        return api.json_compacto({'erro': 'Informe colaborador, epi e quantidade como números inteiros.'}, status=400)
+    try:
+        pendentes = epis.movimentar(colaborador_id, epi_id, request.POST.get('tipo'), quantidade)
+    except ValueError as erro:
+        return api.json_compacto({'erro': str(erro)}, status=400)
+    return api.json_compacto({'colaborador_id': colaborador_id, 'pendentes': pendentes})
+
+
+# EPIs que um colaborador tem em mãos, em JSON
+# ===========================================
+# O total (o mesmo número da lista) e a quantidade pendente de cada EPI.
+def colaborador_epis(request, id):
+    # Procura em todos os bancos (ver shards.py); sem obras separadas, só no principal.
+    colaborador = shards.obter_ou_404(id, Colaborador.objects.select_related('saldo_epi'))
+    return api.json_compacto({
+        'colaborador_id': id,
+        'pendentes': colaborador.epis_pendentes,
+        'epis': [
+            {'id': item['epi_id'], 'nome': item['epi__nome'], 'pendentes': item['pendentes']}
+            for item in epis.pendentes_por_epi(id)
+        ],
+    })
+
+
+# Tarefas em segundo plano (relatório mensal)
+# ===========================================
+# A criação só grava a tarefa e responde na hora (202); quem executa é o comando
+# 'executar_tarefas' (ver tarefas.py). A página consulta o progresso até a tarefa
+# terminar e então baixa o arquivo.
+@require_POST
+def tarefa_criar(request):
+    try:
+        tarefa = tarefas.criar(request.POST.get('tipo', ''), request.POST.dict())
+    except ValueError as erro:
+        return api.json_compacto({'erro': str(erro)}, status=400)
+    return api.json_compacto(tarefas.progresso(tarefa), status=202)
+
+
+@never_cache
+def tarefa_progresso(request, id):
+    tarefa = get_object_or_404(Tarefa, id=id)
+    return api.json_compacto(tarefas.progresso(tarefa))
+
+
+def tarefa_arquivo(request, id):
+    tarefa = get_object_or_404(Tarefa, id=id)
+    # 'as_attachment': o navegador baixa o arquivo em vez de tentar abri-lo.
+    return FileResponse(open(tarefas.caminho_arquivo(tarefa), 'rb'), as_attachment=True, filename=tarefa.arquivo)
+
+
+# Métricas de desempenho no formato do Prometheus (rota /metrics)
+# ==============================================================
+# Histogramas por rota de duração, tempo de banco, consultas SQL e tempo de
+# template, coletados pelo middleware (ver middleware.py e metricas.py).
+def exportar_metricas(request):
+    return HttpResponse(metricas.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # View (Função) para a página de CADASTRO de Colaboradores (cadastro.html)
 # ======================================================================
 # Esta função é chamada para a URL '/cadastro/'.
@@ -93,26 +353,28 @@ def colaborador_novo(request):
         cpf = request.POST.get('cpf') # Vem com a máscara (ex: 123.456.789-01)
         funcao = request.POST.get('funcao')
         status = request.POST.get('status')
+        obra = request.POST.get('obra', '').strip()
         
         # Limpa o CPF: Remove a máscara (pontos e traço) antes de salvar no banco.
-        # filter(str.isdigit, cpf) pega apenas os caracteres que são dígitos.
-        # ''.join(...) junta esses dígitos de volta em uma string.
-        cpf_limpo = ''.join(filter(str.isdigit, cpf)) # Resulta em '12345678901'
+        # A função 'limpar' (cpf.py) mantém apenas os dígitos.
+        cpf_limpo = cpf_util.limpar(cpf) # Resulta em '12345678901'
         
         # Criação do Objeto no Banco de Dados
         # -----------------------------------
-        # Usa o manager 'objects' do modelo Colaborador para criar um novo registro.
-        # Colaborador.objects.create(...) é um atalho que cria e salva o objeto em um passo.
+        # Cria um novo objeto Colaborador e o salva com 'shards.salvar'.
         # Os argumentos (nome_completo=nome, etc.) mapeiam os valores das variáveis Python
         # para os campos correspondentes definidos no models.py.
-        Colaborador.objects.create(
+        # 'shards.salvar' confere o CPF em todos os bancos e grava no banco da obra
+        # (ver shards.py; sem obras separadas, é sempre o banco principal).
+        shards.salvar(Colaborador(
             nome_completo=nome,
             cpf=cpf_limpo, # Salva o CPF limpo
             funcao=funcao,
-            status=status
+            status=status,
+            obra=obra,
             # O campo 'data_cadastro' (se existir no modelo com auto_now_add=True) 
             # será preenchido automaticamente pelo Django.
-        )
+        ))
         # Redirecionamento após Salvar
         # ---------------------------
         # Após salvar com sucesso, redireciona o usuário para a URL nomeada 'index' 
@@ -136,8 +398,9 @@ def colaborador_editar(request, id):
     # -------------------------
     # Tenta encontrar um objeto Colaborador cujo 'id' (chave primária) seja igual ao 'id' 
     # recebido da URL. Se nenhum colaborador com esse ID for encontrado, a função 
-    # 'get_object_or_404' automaticamente retorna uma página de erro 404.
-    colaborador = get_object_or_404(Colaborador, id=id)
+    # 'obter_ou_404' retorna uma página de erro 404 (como o 'get_object_or_404' do
+    # Django, mas procurando também nos bancos das obras; ver shards.py).
+    colaborador = shards.obter_ou_404(id)
 
     # Verifica se o formulário de edição foi enviado (método POST).
     if request.method == 'POST':
@@ -146,16 +409,18 @@ def colaborador_editar(request, id):
         # Pega os novos dados enviados pelo formulário usando request.POST.get(...).
         # ATUALIZA diretamente os atributos do objeto 'colaborador' que já foi buscado do banco.
         colaborador.nome_completo = request.POST.get('nome_completo')
-        colaborador.cpf = ''.join(filter(str.isdigit, request.POST.get('cpf'))) # Limpa o CPF
+        colaborador.cpf = cpf_util.limpar(request.POST.get('cpf')) # Limpa o CPF
         colaborador.funcao = request.POST.get('funcao')
         colaborador.status = request.POST.get('status')
+        colaborador.obra = request.POST.get('obra', colaborador.obra).strip()
         
         # Salvar as Alterações no Banco
         # -----------------------------
-        # Chama o método .save() no objeto 'colaborador'. O Django detecta que este 
-        # objeto já existe no banco (porque tem um ID) e executa um comando SQL UPDATE 
-        # em vez de um INSERT.
-        colaborador.save()
+        # 'shards.salvar' chama o método .save() no objeto 'colaborador'. O Django detecta
+        # que este objeto já existe no banco (porque tem um ID) e executa um comando SQL
+        # UPDATE em vez de um INSERT. Se a nova obra fica em outro banco, o colaborador
+        # é levado para lá.
+        shards.salvar(colaborador)
         
         # Redireciona para a lista após salvar as alterações.
         return redirect('index')
@@ -180,8 +445,8 @@ def colaborador_editar(request, id):
 def colaborador_excluir(request, id):
     # Busca do Objeto a Excluir
     # -------------------------
-    # Encontra o colaborador pelo ID. Se não achar, retorna 404.
-    colaborador = get_object_or_404(Colaborador, id=id)
+    # Encontra o colaborador pelo ID (em qualquer banco). Se não achar, retorna 404.
+    colaborador = shards.obter_ou_404(id)
     
     # Exclusão do Objeto do Banco
     # ---------------------------
@@ -192,4 +457,60 @@ def colaborador_excluir(request, id):
     # Redirecionamento para a Lista
     # -----------------------------
     # Após excluir, redireciona o usuário de volta para a página de lista ('index').
-    return redirect('index')
\ No newline at end of file
+    return redirect('index')
+
+
+# View (Função) para as AÇÕES EM MASSA (ativar / inativar / excluir vários de uma vez)
+# ===================================================================================
+# Recebe (somente via POST, com o token CSRF do formulário da lista):
+#   - acao: 'ativar', 'inativar' ou 'excluir';
+#   - ids: os colaboradores marcados na lista (o campo 'ids' pode se repetir); OU
+#   - todos_da_pesquisa=1 e q: todos os colaboradores que casam com a pesquisa,
+#     inclusive os que estão em outras páginas (só os da 'obra', se a lista estava
+#     filtrada por uma obra).
+# A ação é UM comando UPDATE/DELETE em uma transação (ver acoes.py).
+# Responde em JSON com a quantidade de colaboradores afetados; formulários enviados
+# sem JavaScript (que pedem HTML) são redirecionados de volta para a lista.
+@require_POST
+def colaborador_acoes_em_massa(request):
+    acao = request.POST.get('acao')
+    if acao not in acoes.ACOES:
+        return HttpResponseBadRequest('Ação inválida. Use "ativar", "inativar" ou "excluir".')
+
+    query = request.POST.get('q', '')
+    obra = request.POST.get('obra', '').strip()
+    if request.POST.get('todos_da_pesquisa') == '1':
+        # Sem pesquisa, "todos" seria a tabela inteira: exigimos um filtro explícito.
+        if not query:
+            return HttpResponseBadRequest('Informe a pesquisa (q) para aplicar a todos os resultados.')
+        selecionados = busca.filtrar(Colaborador.objects.all(), query)
+    else:
+        try:
+            ids = {int(id) for id in request.POST.getlist('ids')}
+        except ValueError:
+            return HttpResponseBadRequest('Lista de ids inválida.')
+        if not ids:
+            return HttpResponseBadRequest('Nenhum colaborador selecionado.')
+        if len(ids) > acoes.LIMITE_IDS:
+            return HttpResponseBadRequest(
+                f'Selecione no máximo {acoes.LIMITE_IDS} colaboradores ou use a pesquisa.'
+            )
+        selecionados = Colaborador.objects.filter(id__in=ids)
+
+    # Com obras em bancos separados (shards.py), a ação é aplicada em cada banco da
+    # lista que estava na tela: com uma obra escolhida, só no banco dela.
+    if obra:
+        selecionados = selecionados.filter(obra=obra)
+        bancos = [banco for banco, _ in shards._unidades(obra)]
+    else:
+        bancos = shards.bancos()
+    afetados = sum(acoes.aplicar(selecionados.using(banco), acao) for banco in bancos)
+
+    if 'text/html' in request.headers.get('Accept', ''):
+        # Volta para a lista mantendo a pesquisa que estava aplicada.
+        destino = reverse('index')
+        filtros = {chave: valor for chave, valor in (('q', query), ('obra', obra)) if valor}
+        if filtros:
+            destino += '?' + urlencode(filtros)
+        return redirect(destino)
+    return JsonResponse({'acao': acao, 'afetados': afetados})
@@ -0,0 +1,120 @@
+# Views Assíncronas (ASGI)
+# ========================
+# Versões 'async def' da lista/pesquisa e da API JSON (lista e detalhe), usando o
+# ORM assíncrono do Django ('async for', 'aaggregate', 'aget'...). Servidas por um
+# servidor ASGI (uvicorn, daphne, hypercorn...), elas não prendem uma thread do
+# servidor enquanto esperam o banco de dados.
+#
+# São ativadas pela configuração COLABORADORES_ASYNC (ver settings.py): o arquivo
+# setup/asgi.py liga essa opção por padrão, e o setup/wsgi.py mantém as views
+# síncronas de views.py. As URLs e os nomes das rotas são os mesmos nos dois modos.
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.shortcuts import aget_object_or_404, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import api, arquivo, busca, cache_lista, contadores, fragmentos, shards, versao
+from .models import Colaborador
+from .paginacao import apaginar, tamanho_pagina
+
+
+def condicional(view):
+    # Equivalente assíncrono do decorador '@condition' usado em views.py: o
+    # '@condition' do Django chama as funções de ETag de forma síncrona, o que não
+    # é permitido (acesso ao banco) dentro de uma view assíncrona.
+    @wraps(view)
+    async def view_condicional(request, *args, **kwargs):
+        versao_atual, atualizado_em = await versao.aatual()
+        etag = quote_etag(api.etag(request, versao_atual))
+        ultima_alteracao = int(atualizado_em.timestamp()) if atualizado_em else None
+
+        resposta = get_conditional_response(request, etag=etag, last_modified=ultima_alteracao)
+        if resposta is None:
+            resposta = await view(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            resposta.headers.setdefault('ETag', etag)
+            if ultima_alteracao:
+                resposta.headers.setdefault('Last-Modified', http_date(ultima_alteracao))
+        return resposta
+
+    return view_condicional
+
+
+# Lista / Pesquisa (index.html) — mesma lógica de views.colaborador_lista.
+@cache_lista.em_cache
+async def colaborador_lista(request):
+    query = request.GET.get('q', '')
+    obra = request.GET.get('obra', '').strip()
+    tamanho = tamanho_pagina(request.GET.get('tamanho'))
+    incluir_arquivados = request.GET.get('arquivados') == '1'
+
+    if obra or (shards.configurados() and await sync_to_async(shards.ativo)()):
+        # Os bancos das obras são consultados em paralelo pelas threads de shards.py.
+        estatisticas, pagina = await sync_to_async(shards.listar)(
+            query, obra, apos=request.GET.get('apos'), antes=request.GET.get('antes'), tamanho=tamanho,
+        )
+    else:
+        colaboradores = busca.filtrar(Colaborador.objects.all(), query) if query else None
+        estatisticas = await contadores.atotais(colaboradores)
+        pagina = await apaginar(
+            Colaborador.objects.select_related('saldo_epi'),
+            apos=request.GET.get('apos'),
+            antes=request.GET.get('antes'),
+            tamanho=tamanho,
+            query=query,
+        )
+
+    context = {
+        'colaboradores_lista': pagina['linhas'],
+        'linhas_tabela': fragmentos.linhas(pagina['linhas']),
+        'incluir_arquivados': incluir_arquivados,
+        'arquivados_lista': (
+            await sync_to_async(arquivo.buscar)(query) if query and incluir_arquivados else []
+        ),
+        'cursor_anterior': pagina['cursor_anterior'],
+        'cursor_proxima': pagina['cursor_proxima'],
+        'tamanho_pagina': tamanho,
+        **estatisticas,
+        'search_query': query,
+        'obra': obra,
+        'obras': sorted(await sync_to_async(shards.mapa)()) if shards.configurados() else [],
+    }
+    # Todas as linhas já foram buscadas acima, então a renderização não acessa o banco.
+    return render(request, 'index.html', context)
+
+
+# API JSON (lista) — mesma lógica de views.colaborador_api.
+@condicional
+async def colaborador_api(request):
+    campos, erro = api.campos_pedidos(request)
+    if erro:
+        return erro
+    colaboradores = Colaborador.objects.only(*campos, 'id', 'data_cadastro')
+    parametros = {
+        'apos': request.GET.get('apos'),
+        'antes': request.GET.get('antes'),
+        'tamanho': tamanho_pagina(request.GET.get('tamanho')),
+        'query': request.GET.get('q', ''),
+    }
+    if shards.configurados() and await sync_to_async(shards.ativo)():
+        pagina = await sync_to_async(shards.paginar)(colaboradores, **parametros)
+    else:
+        pagina = await apaginar(colaboradores, **parametros)
+    return api.resposta_pagina(pagina, campos)
+
+
+# API JSON (detalhe) — mesma lógica de views.colaborador_api_detalhe.
+@condicional
+async def colaborador_api_detalhe(request, id):
+    campos, erro = api.campos_pedidos(request)
+    if erro:
+        return erro
+    if shards.configurados():
+        colaborador = await sync_to_async(shards.obter_ou_404)(id, Colaborador.objects.only(*campos))
+    else:
+        colaborador = await aget_object_or_404(Colaborador.objects.only(*campos), id=id)
+    return api.json_compacto(api.serializar(colaborador, campos))
@@ -0,0 +1,113 @@
+# Requisições Idênticas ao Mesmo Tempo ("single-flight")
+# ======================================================
+# Na troca de turno, dezenas de encarregados abrem o dashboard ou pesquisam a mesma
+# função ("Pedreiro") no mesmo segundo. Se a página ainda não está no cache da lista
+# (cache_lista.py), TODAS essas requisições montariam a mesma página ao mesmo tempo —
+# mesmas consultas, mesma renderização.
+#
+# 'VooUnico' deixa só a primeira requisição (a "líder") fazer o trabalho; as outras
+# com a mesma chave esperam por ela e recebem o mesmo resultado. O resultado ainda
+# fica guardado por 'ttl' segundos (memória limitada a 'maximo' chaves, as mais
+# antigas saem primeiro), para quem chegar logo depois.
+#
+# - Vale para as threads de UM processo (cada processo do servidor tem o seu); a
+#   trava (threading.Lock) protege as tabelas internas.
+# - Funciona com as views síncronas ('executar') e assíncronas ('aexecutar').
+# - Se a líder falhar, quem esperava recebe a mesma exceção; se ela demorar mais que
+#   'espera_maxima' segundos, quem esperava faz o trabalho por conta própria.
+# - 'esquecer' descarta os resultados guardados (chamado a cada alteração dos dados).
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+
+
+class VooUnico:
+
+    def __init__(self, ttl=1.0, maximo=256, espera_maxima=10.0):
+        # 'ttl' pode ser um número ou uma função sem argumentos, lida a cada uso
+        # (ex: para acompanhar uma configuração trocada nos testes).
+        self.ttl = ttl
+        self.maximo = maximo
+        self.espera_maxima = espera_maxima
+        self._trava = threading.Lock()
+        # Cada 'esquecer' muda a geração: resultados (e trabalhos em andamento)
+        # anteriores a ele deixam de ser usados.
+        self._geracao = 0
+        self._em_andamento = {}  # (geração, chave) -> Future
+        self._recentes = OrderedDict()  # (geração, chave) -> (expira_em, resultado)
+
+    def _entrar(self, chave):
+        # Retorna (chave interna, futuro, lider): a líder executa o trabalho; as outras
+        # esperam o futuro.
+        with self._trava:
+            chave = (self._geracao, chave)
+            recente = self._recentes.get(chave)
+            if recente is not None:
+                expira_em, resultado = recente
+                if expira_em > time.monotonic():
+                    futuro = Future()
+                    futuro.set_result(resultado)
+                    return chave, futuro, False
+                del self._recentes[chave]
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                return chave, futuro, False
+            futuro = self._em_andamento[chave] = Future()
+            return chave, futuro, True
+
+    def _sair(self, chave, futuro, resultado=None, erro=None):
+        ttl = self.ttl() if callable(self.ttl) else self.ttl
+        with self._trava:
+            del self._em_andamento[chave]
+            if erro is None and ttl > 0 and chave[0] == self._geracao:
+                self._recentes[chave] = (time.monotonic() + ttl, resultado)
+                while len(self._recentes) > self.maximo:
+                    self._recentes.popitem(last=False)
+        if erro is None:
+            futuro.set_result(resultado)
+        else:
+            futuro.set_exception(erro)
+
+    def executar(self, chave, funcao):
+        # Retorna funcao() — executada uma única vez para as chamadas simultâneas com a mesma chave.
+        chave, futuro, lider = self._entrar(chave)
+        if not lider:
+            try:
+                return futuro.result(timeout=self.espera_maxima)
+            except TimeoutError:
+                return funcao()
+        try:
+            resultado = funcao()
+        except Exception as erro:
+            self._sair(chave, futuro, erro=erro)
+            raise
+        self._sair(chave, futuro, resultado)
+        return resultado
+
+    async def aexecutar(self, chave, funcao):
+        # Versão assíncrona: 'funcao' é uma função 'async'. Quem espera não bloqueia o
+        # loop de eventos, e a mesma chave é compartilhada com as threads síncronas.
+        chave, futuro, lider = self._entrar(chave)
+        if not lider:
+            try:
+                # 'shield': desistir de esperar não pode cancelar o trabalho da líder.
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(futuro)), self.espera_maxima)
+            except asyncio.TimeoutError:
+                return await funcao()
+        try:
+            resultado = await funcao()
+        except Exception as erro:
+            self._sair(chave, futuro, erro=erro)
+            raise
+        self._sair(chave, futuro, resultado)
+        return resultado
+
+    def esquecer(self):
+        # Descarta os resultados guardados; os trabalhos em andamento terminam, mas
+        # quem chegar a partir de agora começa um novo.
+        with self._trava:
+            self._geracao += 1
+            self._recentes.clear()
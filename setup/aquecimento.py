@@ -0,0 +1,108 @@
+"""
+Aquecimento do processo do servidor, antes de ele receber requisições.
+
+Quando o gerenciador de processos (gunicorn, uvicorn...) reinicia um worker, o
+Django deixa para a PRIMEIRA requisição uma série de trabalhos feitos uma única
+vez por processo: importar as views, montar as tabelas de rotas, ler e compilar
+os templates, abrir a conexão com o banco (e o SQLite ler o esquema das tabelas),
+carregar o manifesto dos arquivos estáticos... Quem fazia essa requisição
+esperava por tudo isso.
+
+'aquecer()' faz esses trabalhos logo depois de 'get_wsgi_application()' /
+'get_asgi_application()' (ver setup/wsgi.py e setup/asgi.py), ainda durante a
+inicialização do worker:
+
+* rotas: importa o URLconf (e as views) e monta as tabelas de 'resolve' e 'reverse';
+* templates: compila base.html, index.html, cadastro.html e linha_colaborador.html
+  (com o carregador com cache, usado em produção, ficam compilados para o processo);
+* estaticos: lê o manifesto do 'collectstatic' (só com ESTATICOS_OTIMIZADOS);
+* banco: abre a conexão com cada banco (o principal e os das obras) e executa as
+  consultas do dashboard — cards e primeira página —, o que também traz as páginas
+  dos índices para o cache do sistema operacional.
+
+[NOTA] A conexão com o banco é de cada thread. Ela é reaproveitada pela primeira
+requisição quando a requisição roda na mesma thread (worker síncrono do gunicorn)
+e as conexões são persistentes (CONN_MAX_AGE, ligado com COLABORADORES_DB=producao).
+Nos outros casos a conexão aberta aqui é descartada, mas o restante (módulos do
+backend, metadados dos modelos, arquivo do banco no cache do sistema) continua valendo.
+
+Uma etapa que falhar (ex: banco ainda sem as tabelas) só gera um aviso no log
+'colaboradores.aquecimento': o worker sobe assim mesmo e a etapa fica para a
+primeira requisição, como antes. Desligue com COLABORADORES_AQUECER=0.
+O comando 'benchmark_inicializacao' mede o efeito.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('colaboradores.aquecimento')
+
+TEMPLATES = ['base.html', 'index.html', 'cadastro.html', 'linha_colaborador.html']
+
+# Duração (ms) de cada etapa do último aquecimento deste processo.
+ultimo = {}
+
+
+def _rotas():
+    from django.urls import get_resolver, resolve, reverse
+
+    resolver = get_resolver()
+    # 'url_patterns' importa o URLconf; 'reverse_dict' monta a tabela do {% url %}.
+    resolver.url_patterns
+    resolver.reverse_dict
+    resolve(reverse('index'))
+
+
+def _templates():
+    from django.template.loader import get_template
+
+    for nome in TEMPLATES:
+        get_template(nome)
+
+
+def _estaticos():
+    if not settings.ESTATICOS_OTIMIZADOS:
+        return
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    # A primeira URL carrega o 'staticfiles.json' (o mapa nome -> nome com hash).
+    staticfiles_storage.url('style.css')
+
+
+def _banco():
+    from colaboradores import contadores, shards
+    from colaboradores.models import Colaborador
+    from colaboradores.paginacao import paginar
+
+    shards.mapa()
+    for banco in shards.bancos():
+        connections[banco].ensure_connection()
+        contadores.totais(banco=banco)
+        paginar(Colaborador.objects.using(banco))
+
+
+ETAPAS = {
+    'rotas': _rotas,
+    'templates': _templates,
+    'estaticos': _estaticos,
+    'banco': _banco,
+}
+
+
+def aquecer():
+    # Executa as etapas e retorna {etapa: duração em ms} (também guardado em 'ultimo').
+    duracoes = {}
+    for nome, etapa in ETAPAS.items():
+        inicio = time.perf_counter()
+        try:
+            etapa()
+        except Exception:
+            logger.warning('Aquecimento: falha na etapa "%s".', nome, exc_info=True)
+        duracoes[nome] = round((time.perf_counter() - inicio) * 1000, 2)
+    ultimo.clear()
+    ultimo.update(duracoes)
+    logger.info('Aquecimento concluído: %s', ', '.join(f'{nome}={ms}ms' for nome, ms in duracoes.items()))
+    return duracoes
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from setup.aquecimento import aquecer
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "setup.settings")
+# Servido via ASGI: usa as views assíncronas nas rotas de leitura (ver colaboradores/views_async.py).
+os.environ.setdefault("COLABORADORES_ASYNC", "1")
 
 application = get_asgi_application()
+
+# Prepara rotas, templates e banco antes de o worker receber requisições.
+if settings.COLABORADORES_AQUECER:
+    aquecer()
@@ -0,0 +1,295 @@
+"""
+Arquivos estáticos para produção (style.css, script.js, ...).
+
+Dois componentes, ativados em setup/settings.py fora do modo de desenvolvimento:
+
+* ArmazenamentoEstaticos: o armazenamento do 'collectstatic'. Estende o
+  ManifestStaticFilesStorage do Django (nomes com hash do conteúdo, ex:
+  'style.3f2a9c1b7e4d.css', e o arquivo 'staticfiles.json' com o mapa
+  nome -> nome com hash, usado pela tag {% static %}) e, para cada arquivo com
+  hash, minifica CSS/JS e grava as versões pré-compactadas '.gz' e '.br'
+  (brotli só se o pacote 'brotli' estiver instalado).
+
+* EstaticosMiddleware: serve os arquivos de STATIC_ROOT sem passar pelas views.
+  Escolhe a versão '.br'/'.gz' conforme o cabeçalho Accept-Encoding e responde com
+  'Vary: Accept-Encoding'. Os arquivos com hash nunca mudam (um conteúdo novo gera
+  um nome novo), então recebem 'Cache-Control: public, max-age=31536000, immutable':
+  nas visitas seguintes o navegador nem pergunta ao servidor por eles.
+
+A lista de arquivos é lida uma vez, quando o servidor inicia: rode o
+'collectstatic' ANTES de iniciar (ou reiniciar) o servidor.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem o pacote, só a versão gzip é gerada.
+    brotli = None
+
+# Arquivos que valem a pena compactar (imagens e fontes já são compactadas).
+COMPACTAVEIS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+# Arquivos menores que isso são servidos sem compactar (o ganho não paga o cabeçalho).
+TAMANHO_MINIMO = 256
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+# Arquivos sem hash no nome (ex: /static/style.css) podem mudar a cada deploy.
+CACHE_CURTO = 'public, max-age=60'
+
+_PEDACOS_CSS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+# Depois de um destes caracteres, uma '/' no JavaScript começa uma expressão regular.
+_ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^') | {''}
+
+
+def minificar_css(texto):
+    # Remove comentários e espaços desnecessários, sem mexer no conteúdo das strings.
+    # É conservador: espaços que podem mudar o sentido (ex: 'div :hover') são mantidos.
+    partes = []
+    codigo = []  # trechos fora de strings, compactados juntos (os comentários viram espaço)
+    posicao = 0
+    for trecho in _PEDACOS_CSS.finditer(texto):
+        codigo.append(texto[posicao:trecho.start()])
+        if trecho.group(1):
+            partes.append(_compactar_css(''.join(codigo)))
+            partes.append(trecho.group(1))
+            codigo = []
+        else:
+            codigo.append(' ')
+        posicao = trecho.end()
+    codigo.append(texto[posicao:])
+    partes.append(_compactar_css(''.join(codigo)))
+    return ''.join(partes).strip()
+
+
+def _compactar_css(trecho):
+    trecho = re.sub(r'\s+', ' ', trecho)
+    trecho = re.sub(r' ?([{};,]) ?', r'\1', trecho)
+    return trecho.replace(';}', '}')
+
+
+def minificar_js(texto):
+    # Remove comentários, a indentação e as linhas em branco. As quebras de linha são
+    # mantidas (o JavaScript insere ';' automaticamente nelas), e strings, template
+    # strings e expressões regulares são copiadas sem alteração.
+    saida = []
+    i = 0
+    tamanho = len(texto)
+    while i < tamanho:
+        c = texto[i]
+        proximo = texto[i + 1] if i + 1 < tamanho else ''
+        if c in '"\'`':
+            fim = _fim_da_string(texto, i, c)
+            saida.append(texto[i:fim])
+            i = fim
+        elif c == '/' and proximo == '/':
+            i = texto.find('\n', i)
+            i = tamanho if i == -1 else i
+        elif c == '/' and proximo == '*':
+            fim = texto.find('*/', i + 2)
+            i = tamanho if fim == -1 else fim + 2
+        elif c == '/' and _ultimo_caractere(saida) in _ANTES_DE_REGEX:
+            fim = _fim_da_regex(texto, i)
+            saida.append(texto[i:fim])
+            i = fim
+        else:
+            saida.append(c)
+            i += 1
+    linhas = (linha.strip() for linha in ''.join(saida).splitlines())
+    return '\n'.join(linha for linha in linhas if linha) + '\n'
+
+
+def _fim_da_string(texto, inicio, aspas):
+    i = inicio + 1
+    while i < len(texto):
+        if texto[i] == '\\':
+            i += 2
+            continue
+        if texto[i] == aspas:
+            return i + 1
+        i += 1
+    return len(texto)
+
+
+def _fim_da_regex(texto, inicio):
+    i = inicio + 1
+    dentro_de_classe = False  # dentro de [...] a '/' não fecha a expressão
+    while i < len(texto) and texto[i] != '\n':
+        c = texto[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            dentro_de_classe = True
+        elif c == ']':
+            dentro_de_classe = False
+        elif c == '/' and not dentro_de_classe:
+            i += 1
+            while i < len(texto) and texto[i].isalpha():  # flags (g, i, m, ...)
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _ultimo_caractere(saida):
+    for pedaco in reversed(saida):
+        pedaco = pedaco.strip()
+        if pedaco:
+            return pedaco[-1]
+    return ''
+
+
+MINIFICADORES = {
+    '.css': minificar_css,
+    '.js': minificar_js,
+}
+
+
+class ArmazenamentoEstaticos(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        # O Django gera os arquivos com hash (e corrige as referências url(...) do CSS);
+        # depois, cada arquivo com hash é minificado e compactado.
+        for nome, nome_com_hash, processado in super().post_process(paths, dry_run, **options):
+            if not dry_run and nome_com_hash and not isinstance(processado, Exception):
+                self.otimizar(nome_com_hash)
+            yield nome, nome_com_hash, processado
+
+    def otimizar(self, nome):
+        extensao = os.path.splitext(nome)[1].lower()
+        if extensao not in COMPACTAVEIS:
+            return
+        with self.open(nome) as arquivo:
+            conteudo = arquivo.read()
+
+        minificar = MINIFICADORES.get(extensao)
+        if minificar and '.min.' not in nome:  # arquivos '.min.js' já vêm minificados
+            conteudo = minificar(conteudo.decode('utf-8')).encode('utf-8')
+            self.delete(nome)
+            self._save(nome, ContentFile(conteudo))
+
+        if len(conteudo) < TAMANHO_MINIMO:
+            return
+        # mtime=0: o mesmo conteúdo gera sempre o mesmo '.gz' (builds reproduzíveis).
+        self._gravar_variante(nome + '.gz', gzip.compress(conteudo, compresslevel=9, mtime=0), conteudo)
+        if brotli is not None:
+            self._gravar_variante(nome + '.br', brotli.compress(conteudo), conteudo)
+
+    def _gravar_variante(self, nome, compactado, original):
+        # Só vale a pena guardar a versão compactada se ela for menor.
+        if len(compactado) >= len(original):
+            return
+        if self.exists(nome):
+            self.delete(nome)
+        self._save(nome, ContentFile(compactado))
+
+
+# Codificação -> extensão da versão pré-compactada, na ordem de preferência.
+CODIFICACOES = [('br', '.br'), ('gzip', '.gz')]
+
+
+class EstaticosMiddleware:
+    # Funciona tanto com o servidor WSGI (síncrono) quanto com o ASGI (assíncrono).
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+        self.prefixo = '/' + settings.STATIC_URL.lstrip('/')
+        self.arquivos = self.listar(settings.STATIC_ROOT)
+
+    def listar(self, raiz):
+        # URL -> (caminho, variantes {codificação: caminho}, Cache-Control, Last-Modified).
+        arquivos = {}
+        if not raiz or not os.path.isdir(raiz):
+            return arquivos
+        # Nomes com hash, segundo o manifesto do 'collectstatic' (staticfiles.json).
+        com_hash = set(ArmazenamentoEstaticos(location=raiz).hashed_files.values())
+        for pasta, _, nomes in os.walk(raiz):
+            for nome_arquivo in nomes:
+                caminho = os.path.join(pasta, nome_arquivo)
+                relativo = os.path.relpath(caminho, raiz).replace(os.sep, '/')
+                if relativo.endswith(('.gz', '.br')):
+                    continue
+                variantes = {
+                    codificacao: caminho + extensao
+                    for codificacao, extensao in CODIFICACOES
+                    if os.path.exists(caminho + extensao)
+                }
+                arquivos[self.prefixo + relativo] = (
+                    caminho,
+                    variantes,
+                    CACHE_IMUTAVEL if relativo in com_hash else CACHE_CURTO,
+                    int(os.path.getmtime(caminho)),
+                )
+        return arquivos
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        return self.servir(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        # Abrir o arquivo é rápido o bastante para não precisar de uma thread.
+        return self.servir(request) or await self.get_response(request)
+
+    def servir(self, request):
+        # Retorna a resposta com o arquivo estático, ou None se não for um deles.
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        arquivo = self.arquivos.get(request.path_info)
+        if arquivo is None:
+            return None
+        caminho, variantes, cache_control, modificado = arquivo
+
+        desde = request.META.get('HTTP_IF_MODIFIED_SINCE')
+        if desde and not request.META.get('HTTP_IF_NONE_MATCH'):
+            try:
+                if int(parsedate_to_datetime(desde).timestamp()) >= modificado:
+                    resposta = HttpResponseNotModified()
+                    self.cabecalhos(resposta, cache_control, modificado, variantes)
+                    return resposta
+            except (TypeError, ValueError):
+                pass
+
+        aceitas = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        codificacao = next((c for c, _ in CODIFICACOES if c in variantes and c in aceitas), None)
+        resposta = FileResponse(
+            open(variantes[codificacao] if codificacao else caminho, 'rb'),
+            # O tipo (text/css, ...) vem sempre do arquivo original, não do '.gz'.
+            content_type=_tipo(caminho),
+            filename=os.path.basename(caminho),
+        )
+        if codificacao:
+            resposta['Content-Encoding'] = codificacao
+        self.cabecalhos(resposta, cache_control, modificado, variantes)
+        return resposta
+
+    def cabecalhos(self, resposta, cache_control, modificado, variantes):
+        resposta['Cache-Control'] = cache_control
+        resposta['Last-Modified'] = formatdate(modificado, usegmt=True)
+        if variantes:
+            # Caches intermediários (proxies, CDN) devem guardar uma cópia por codificação.
+            resposta['Vary'] = 'Accept-Encoding'
+
+
+def _tipo(caminho):
+    tipo, _ = mimetypes.guess_type(caminho)
+    tipo = tipo or 'application/octet-stream'
+    if tipo.startswith('text/') or tipo in ('application/javascript', 'image/svg+xml', 'application/json'):
+        tipo += '; charset=utf-8'
+    return tipo
@@ -45,21 +45,58 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # ADICIONADO: Métricas de desempenho por rota (colaboradores/middleware.py), expostas
+    # em /metrics. Fica em primeiro lugar para medir também os outros middlewares
+    # (em produção, só o EstaticosMiddleware vem antes; ver STATIC_ROOT abaixo).
+    "colaboradores.middleware.MetricasMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # ADICIONADO: Guarda a requisição atual para a auditoria saber quem alterou cada
+    # colaborador (colaboradores/auditoria.py). Precisa vir depois da autenticação.
+    "colaboradores.middleware.AuditoriaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "setup.urls"
 
+# ADICIONADO: Auditoria das alterações de colaboradores (colaboradores/auditoria.py).
+#   - COLABORADORES_AUDITORIA: 'fila' (padrão; grava em lotes por uma thread em segundo
+#     plano), 'sincrono' (grava logo após o commit) ou 'desligada'. Os testes que
+#     conferem os eventos usam 'sincrono' (override_settings): o banco de testes fica
+#     dentro de uma transação que a conexão da thread de gravação não enxerga.
+#   - COLABORADORES_AUDITORIA_FILA_CHEIA: o que fazer com a fila cheia — 'gravar'
+#     (na própria requisição), 'bloquear' (esperar espaço) ou 'descartar'.
+COLABORADORES_AUDITORIA = os.environ.get('COLABORADORES_AUDITORIA', 'fila')
+COLABORADORES_AUDITORIA_FILA_CHEIA = os.environ.get('COLABORADORES_AUDITORIA_FILA_CHEIA', 'gravar')
+COLABORADORES_AUDITORIA_TAMANHO_FILA = int(os.environ.get('COLABORADORES_AUDITORIA_TAMANHO_FILA', 10_000))
+COLABORADORES_AUDITORIA_LOTE = int(os.environ.get('COLABORADORES_AUDITORIA_LOTE', 500))
+
+# ADICIONADO: Log de requisições lentas (logger 'colaboradores.lentas'), com o SQL executado.
+# Ex: COLABORADORES_LENTO_MS=200 registra as requisições que passarem de 200ms.
+# Sem a variável, o log fica desligado (e o SQL das requisições nem é guardado).
+COLABORADORES_LENTO_MS = (
+    float(os.environ['COLABORADORES_LENTO_MS']) if os.environ.get('COLABORADORES_LENTO_MS') else None
+)
+
+# ADICIONADO: Usa as views assíncronas (colaboradores/views_async.py) nas rotas de leitura.
+# O setup/asgi.py liga esta opção por padrão; pode ser forçada com COLABORADORES_ASYNC=0/1.
+COLABORADORES_ASYNC = os.environ.get('COLABORADORES_ASYNC', '0') == '1'
+
+# ADICIONADO: Aquecimento do worker (setup/aquecimento.py): rotas, templates e conexão
+# com o banco são preparados ao iniciar o processo, e não na primeira requisição.
+# Desligue com COLABORADORES_AQUECER=0.
+COLABORADORES_AQUECER = os.environ.get('COLABORADORES_AQUECER', '1') == '1'
+
 # Configuração dos Templates
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # MODIFICADO: O mesmo backend do Django, mas cronometrando a renderização
+        # de cada template para as métricas de desempenho (colaboradores/metricas.py).
+        "BACKEND": "colaboradores.metricas.TemplatesComMedicao",
         # MODIFICADO: Diz ao Django para procurar templates na pasta 'templates' na raiz do projeto.
         "DIRS": [os.path.join(BASE_DIR, 'templates')],
         "APP_DIRS": True,
@@ -73,6 +110,20 @@ TEMPLATES = [
     },
 ]
 
+# ADICIONADO: Em produção (DEBUG=False ou COLABORADORES_DB=producao), o carregador de
+# templates com cache é configurado explicitamente: cada template é lido e compilado
+# uma única vez por processo (inclusive 'linha_colaborador.html', usado para cada
+# linha da tabela). 'APP_DIRS' precisa ser False quando 'loaders' é informado.
+# Em desenvolvimento fica o padrão do Django, que recarrega os templates alterados.
+if not DEBUG or os.environ.get('COLABORADORES_DB', 'padrao') == 'producao':
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        ("django.template.loaders.cached.Loader", [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ]),
+    ]
+
 WSGI_APPLICATION = "setup.wsgi.application"
 
 
@@ -88,6 +139,75 @@ DATABASES = {
     }
 }
 
+# ADICIONADO: Camada de conexão SQLite para produção (setup/sqlite_producao).
+# Com COLABORADORES_DB=producao: WAL, synchronous=NORMAL, mmap, cache maior,
+# busy_timeout, transações BEGIN IMMEDIATE, novas tentativas quando o banco está
+# ocupado e conexões persistentes (CONN_MAX_AGE). Sem a variável, fica o backend
+# padrão do Django — útil para comparar as duas configurações em testes de carga.
+if os.environ.get('COLABORADORES_DB', 'padrao') == 'producao':
+    DATABASES["default"].update({
+        "ENGINE": "setup.sqlite_producao",
+        # Reaproveita a conexão por até 10 minutos em vez de abrir uma por requisição.
+        "CONN_MAX_AGE": int(os.environ.get('CONN_MAX_AGE', 600)),
+        # Verifica se a conexão reaproveitada ainda funciona antes de usá-la.
+        "CONN_HEALTH_CHECKS": True,
+    })
+
+# ADICIONADO: Obras em bancos separados (colaboradores/shards.py).
+# COLABORADORES_SHARDS lista os bancos extras, separados por vírgula (ex:
+# "obras_1,obras_2"); cada um é um arquivo '<nome>.sqlite3' com a mesma configuração
+# do banco principal, criado com 'python manage.py migrate --database obras_1'.
+# [ATENÇÃO] Só acrescente nomes: um banco retirado da lista deixa as obras dele
+# inacessíveis. Para esvaziar um banco, use 'python manage.py rebalancear_obras'.
+# Os bancos extras usados nos testes ficam em setup/settings_testes.py.
+COLABORADORES_SHARDS = [
+    nome.strip() for nome in os.environ.get('COLABORADORES_SHARDS', '').split(',') if nome.strip()
+]
+for nome in COLABORADORES_SHARDS:
+    DATABASES[nome] = {**DATABASES["default"], "NAME": BASE_DIR / f"{nome}.sqlite3"}
+DATABASE_ROUTERS = ['colaboradores.shards.RoteadorObras']
+
+
+# ADICIONADO: Cache (usado para guardar a página de lista de colaboradores já renderizada).
+# O backend é escolhido pela variável de ambiente COLABORADORES_CACHE:
+#   - 'memoria' (padrão): memória local de cada processo (LocMemCache).
+#   - 'arquivo': arquivos em disco, compartilhado entre processos da mesma máquina.
+#   - 'redis': servidor Redis (ou compatível) em REDIS_URL; requer o pacote 'redis'.
+#   - 'nenhum': desliga o cache (útil para benchmarks).
+CACHES_DISPONIVEIS = {
+    'nenhum': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'memoria': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'colaboradores',
+    },
+    'arquivo': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('COLABORADORES_CACHE_DIR', BASE_DIR / '.django_cache'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379'),
+    },
+}
+CACHES = {
+    'default': CACHES_DISPONIVEIS[os.environ.get('COLABORADORES_CACHE', 'memoria')],
+}
+
+# Tempo (em segundos) que uma página de lista fica guardada no cache.
+COLABORADORES_CACHE_TIMEOUT = int(os.environ.get('COLABORADORES_CACHE_TIMEOUT', 300))
+
+# Requisições idênticas ao mesmo tempo montam a página de lista uma única vez
+# (colaboradores/voo_unico.py); o resultado fica mais este tempo (em segundos) na
+# memória do processo. 0 desliga essa memória (a espera compartilhada continua).
+COLABORADORES_VOO_UNICO_TTL = float(os.environ.get('COLABORADORES_VOO_UNICO_TTL', 1.0))
+
+# ADICIONADO: Tarefas em segundo plano (colaboradores/tarefas.py), executadas pelo
+# comando 'python manage.py executar_tarefas'. Os arquivos gerados (ex: o relatório
+# mensal) ficam nesta pasta, para download.
+COLABORADORES_TAREFAS_DIR = os.environ.get('COLABORADORES_TAREFAS_DIR', BASE_DIR / 'tarefas')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,6 +251,26 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# ADICIONADO: Pasta onde o 'python manage.py collectstatic' junta os arquivos estáticos.
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# ADICIONADO: Estáticos otimizados para produção (setup/estaticos.py). Ativados com
+# DEBUG=False ou com COLABORADORES_ESTATICOS=otimizados:
+#   - o 'collectstatic' gera nomes com hash do conteúdo (ex: style.3f2a9c1b7e4d.css),
+#     minifica CSS/JS e grava versões pré-compactadas (.gz e, com o pacote 'brotli', .br);
+#   - o EstaticosMiddleware serve esses arquivos com 'Cache-Control: immutable' e
+#     'Vary: Accept-Encoding': nas visitas seguintes o navegador não pede os arquivos.
+# [ATENÇÃO] Rode 'python manage.py collectstatic' antes de iniciar o servidor: sem o
+# manifesto (staticfiles.json), a tag {% static %} gera erro.
+ESTATICOS_OTIMIZADOS = not DEBUG or os.environ.get('COLABORADORES_ESTATICOS') == 'otimizados'
+if ESTATICOS_OTIMIZADOS:
+    STORAGES = {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "setup.estaticos.ArmazenamentoEstaticos"},
+    }
+    # Antes das métricas: os arquivos estáticos não entram nas métricas por rota.
+    MIDDLEWARE.insert(0, "setup.estaticos.EstaticosMiddleware")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
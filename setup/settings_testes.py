@@ -0,0 +1,12 @@
+# Configurações dos Testes
+# ========================
+# As mesmas de settings.py, mais dois bancos de obras vazios para os testes de
+# shards.py (ObrasShardsTests os ativa com override_settings(COLABORADORES_SHARDS=...);
+# para os outros testes, nada muda). O manage.py usa este módulo no comando 'test':
+#   python manage.py test colaboradores
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+for nome in ['obras_teste_1', 'obras_teste_2']:
+    DATABASES[nome] = {**DATABASES["default"], "NAME": BASE_DIR / f"{nome}.sqlite3"}
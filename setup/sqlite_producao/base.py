@@ -0,0 +1,106 @@
+"""
+Backend SQLite para produção.
+
+Estende o backend padrão do Django ('django.db.backends.sqlite3') com:
+
+* PRAGMAs aplicados em cada nova conexão: WAL (leitores não bloqueiam o
+  escritor), synchronous=NORMAL, mmap, cache maior e busy_timeout;
+* transações 'BEGIN IMMEDIATE' por padrão, para que a disputa pelo lock de
+  escrita aconteça no início da transação (onde é seguro esperar/repetir);
+* novas tentativas com espera crescente quando o banco está ocupado
+  ("database is locked"), apenas onde repetir é seguro.
+
+Ativado em setup/settings.py com a variável de ambiente COLABORADORES_DB=producao.
+Opções extras aceitas em DATABASES['default']['OPTIONS']:
+
+* 'pragmas': dicionário que sobrescreve/complementa PRAGMAS_PADRAO;
+* 'tentativas': quantas vezes repetir em caso de banco ocupado (padrão 5);
+* 'espera_inicial': espera, em segundos, antes da 1ª repetição (padrão 0.05).
+"""
+
+import time
+
+from django.db.backends.sqlite3 import base
+
+PRAGMAS_PADRAO = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    # 256 MB de arquivo mapeado em memória (leituras sem cópia extra).
+    "mmap_size": 256 * 1024 * 1024,
+    # Valor negativo = tamanho em KiB: 64 MB de cache de páginas por conexão.
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+    # Espera até 5 s pelo lock antes de devolver SQLITE_BUSY.
+    "busy_timeout": 5000,
+}
+
+
+def banco_ocupado(erro):
+    mensagem = str(erro).lower()
+    return "database is locked" in mensagem or "database is busy" in mensagem
+
+
+def com_novas_tentativas(operacao, tentativas, espera_inicial):
+    # Executa 'operacao', repetindo com espera exponencial (0.05s, 0.1s, 0.2s...)
+    # enquanto o SQLite responder que o banco está ocupado.
+    espera = espera_inicial
+    for tentativa in range(tentativas + 1):
+        try:
+            return operacao()
+        except base.Database.OperationalError as erro:
+            if tentativa == tentativas or not banco_ocupado(erro):
+                raise
+            time.sleep(espera)
+            espera *= 2
+
+
+class CursorComNovasTentativas(base.SQLiteCursorWrapper):
+    # Só repete comandos executados FORA de uma transação (autocommit): neles,
+    # uma falha por lock não deixa nenhum efeito parcial. Dentro de uma transação,
+    # o lock já foi obtido no 'BEGIN IMMEDIATE' (que também é repetido).
+    tentativas = 0
+    espera_inicial = 0.0
+
+    def execute(self, query, params=None):
+        if self.connection.in_transaction:
+            return super().execute(query, params)
+        return com_novas_tentativas(
+            lambda: super(CursorComNovasTentativas, self).execute(query, params),
+            self.tentativas, self.espera_inicial,
+        )
+
+    def executemany(self, query, param_list):
+        if self.connection.in_transaction:
+            return super().executemany(query, param_list)
+        # 'param_list' pode ser um gerador; materializa para poder repetir.
+        param_list = list(param_list)
+        return com_novas_tentativas(
+            lambda: super(CursorComNovasTentativas, self).executemany(query, param_list),
+            self.tentativas, self.espera_inicial,
+        )
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # Retira as opções próprias deste backend antes de repassar ao sqlite3.connect().
+        self.pragmas = {**PRAGMAS_PADRAO, **kwargs.pop("pragmas", {})}
+        self.tentativas = kwargs.pop("tentativas", 5)
+        self.espera_inicial = kwargs.pop("espera_inicial", 0.05)
+        if "transaction_mode" not in self.settings_dict["OPTIONS"]:
+            self.transaction_mode = "IMMEDIATE"
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conexao = super().get_new_connection(conn_params)
+        for nome, valor in self.pragmas.items():
+            conexao.execute(f"PRAGMA {nome} = {valor}")
+        return conexao
+
+    def create_cursor(self, name=None):
+        # O 'BEGIN IMMEDIATE' das transações também passa por este cursor (fora de
+        # transação), então a disputa pelo lock de escrita é repetida aqui.
+        cursor = self.connection.cursor(factory=CursorComNovasTentativas)
+        cursor.tentativas = self.tentativas
+        cursor.espera_inicial = self.espera_inicial
+        return cursor
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from setup.aquecimento import aquecer
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "setup.settings")
 
 application = get_wsgi_application()
+
+# Prepara rotas, templates e banco antes de o worker receber requisições.
+if settings.COLABORADORES_AQUECER:
+    aquecer()
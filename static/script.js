@@ -96,4 +96,137 @@ document.addEventListener("DOMContentLoaded", function() {
         }); 
         
     } 
+
+    // Ações em Massa (página 'index.html')
+    // ------------------------------------
+    // Só executa se o formulário de ações em massa existir na página atual.
+    const acoesForm = document.getElementById("acoes-em-massa");
+    if (acoesForm) {
+        // A caixa "selecionar todos" (no cabeçalho da tabela) marca ou desmarca
+        // todas as caixas 'ids' da página.
+        const selecionarTodos = document.getElementById("selecionar-todos");
+        selecionarTodos.addEventListener("change", function() {
+            acoesForm.querySelectorAll("input[name='ids']").forEach(function(caixa) {
+                caixa.checked = selecionarTodos.checked;
+            });
+        });
+
+        acoesForm.addEventListener("submit", function(e) {
+            // Impede o envio normal (que recarregaria a página); enviamos com 'fetch'.
+            e.preventDefault();
+
+            const acao = acoesForm.elements["acao"].value;
+            const todos = acoesForm.elements["todos_da_pesquisa"];
+            const marcados = acoesForm.querySelectorAll("input[name='ids']:checked").length;
+            if (!marcados && !(todos && todos.checked)) {
+                alert("Selecione pelo menos um colaborador.");
+                return;
+            }
+            if (!confirm("Confirma a ação '" + acao + "' para os colaboradores selecionados?")) {
+                return;
+            }
+
+            // 'FormData' leva todos os campos do formulário, inclusive o token CSRF.
+            // O cabeçalho 'Accept' pede a resposta em JSON (com o total de afetados).
+            fetch(acoesForm.action, {
+                method: "POST",
+                body: new FormData(acoesForm),
+                headers: { "Accept": "application/json" },
+            })
+                .then(function(resposta) {
+                    if (!resposta.ok) {
+                        return resposta.text().then(function(texto) { throw new Error(texto); });
+                    }
+                    return resposta.json();
+                })
+                .then(function(dados) {
+                    alert(dados.afetados + " colaborador(es) afetado(s).");
+                    // Recarrega a lista (e os cards) já com as alterações.
+                    window.location.reload();
+                })
+                .catch(function(erro) {
+                    alert("Não foi possível aplicar a ação: " + erro.message);
+                });
+        });
+    }
+
+    // Relatório Mensal em Segundo Plano (página 'index.html')
+    // -------------------------------------------------------
+    // O relatório percorre todos os colaboradores e pode levar minutos. Em vez de
+    // esperar pela resposta, a página cria uma TAREFA (POST) e consulta o progresso
+    // dela a cada 2 segundos, até o arquivo ficar pronto (ou a tarefa falhar).
+    const relatorioForm = document.getElementById("relatorio-mensal");
+    if (relatorioForm) {
+        const botao = relatorioForm.querySelector("button");
+        const barra = relatorioForm.querySelector("progress");
+        const situacao = relatorioForm.querySelector(".report-status");
+        const download = relatorioForm.querySelector(".report-download");
+        const mes = relatorioForm.elements["mes"];
+        if (!mes.value) {
+            // Sugere o mês atual, no formato AAAA-MM.
+            const hoje = new Date();
+            mes.value = hoje.getFullYear() + "-" + String(hoje.getMonth() + 1).padStart(2, "0");
+        }
+
+        function acompanhar(url) {
+            fetch(url, { headers: { "Accept": "application/json" } })
+                .then(function(resposta) {
+                    if (!resposta.ok) {
+                        throw new Error(resposta.status);
+                    }
+                    return resposta.json();
+                })
+                .then(function(tarefa) {
+                    barra.value = tarefa.percentual;
+                    if (tarefa.estado === "concluida") {
+                        situacao.textContent = "Pronto: " + tarefa.processados + " colaborador(es).";
+                        download.href = tarefa.arquivo_url;
+                        download.hidden = false;
+                        botao.disabled = false;
+                    } else if (tarefa.estado === "falhou") {
+                        situacao.textContent = "O relatório falhou: " + tarefa.erro;
+                        botao.disabled = false;
+                    } else {
+                        situacao.textContent = tarefa.estado === "pendente" ? "Na fila..." : tarefa.percentual + "%";
+                        setTimeout(function() { acompanhar(url); }, 2000);
+                    }
+                })
+                .catch(function() {
+                    // Falha de rede (ou servidor reiniciando): tenta de novo mais tarde.
+                    setTimeout(function() { acompanhar(url); }, 5000);
+                });
+        }
+
+        relatorioForm.addEventListener("submit", function(e) {
+            // Impede o envio normal; a tarefa é criada com 'fetch'.
+            e.preventDefault();
+            botao.disabled = true;
+            download.hidden = true;
+            barra.hidden = false;
+            barra.value = 0;
+            situacao.textContent = "Enviando...";
+
+            fetch(relatorioForm.action, {
+                method: "POST",
+                body: new FormData(relatorioForm),
+                headers: { "Accept": "application/json" },
+            })
+                .then(function(resposta) {
+                    return resposta.json().then(function(dados) {
+                        if (!resposta.ok) {
+                            throw new Error(dados.erro);
+                        }
+                        return dados;
+                    });
+                })
+                .then(function(tarefa) {
+                    // A resposta traz o endereço do progresso desta tarefa.
+                    acompanhar(tarefa.progresso_url);
+                })
+                .catch(function(erro) {
+                    situacao.textContent = "Não foi possível criar o relatório: " + erro.message;
+                    botao.disabled = false;
+                });
+        });
+    }
 }); 
\ No newline at end of file